@@ -5,10 +5,12 @@ import logging
 from datetime import datetime, timezone
 from dotenv import load_dotenv
 
-from neo4j import AsyncGraphDatabase
 from graphiti_core import Graphiti
 from graphiti_core.nodes import EpisodeType
 from graphiti_core.search.search_config_recipes import NODE_HYBRID_SEARCH_RRF
+from main.llm_metrics import llm_caller
+from main.llm_scheduler import Priority, llm_priority
+from main.neo4j_pool import Neo4jPoolConfig, drivers
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -41,23 +43,32 @@ class ChatMemory:
 
     async def connect(self):
         logger.info("Connecting to Neo4j...")
-        self.driver = AsyncGraphDatabase.driver(
-            self.uri, auth=(self.user, self.password)
+        # Chat queries and Graphiti share the process-wide connection pool
+        config = Neo4jPoolConfig.from_env(
+            uri=self.uri,
+            user=self.user,
+            password=self.password,
         )
+        self.driver = drivers.driver(config, user="chat_memory")
         logger.info("Neo4j connected.")
-        self.graphiti = Graphiti(self.uri, self.user, self.password)
+        self.graphiti = Graphiti(
+            graph_driver=drivers.graph_driver(config, user="chat_memory")
+        )
         logger.info("Initializing Graphiti indices and constraints...")
         await self.graphiti.build_indices_and_constraints()
         logger.info("Graphiti ready.")
 
     async def close(self):
-        if self.driver:
-            logger.info("Closing Neo4j driver...")
-            await self.driver.close()
-            logger.info("Neo4j driver closed.")
+        # Give back both holds on the shared pool; it closes once unused
         if self.graphiti:
+            graph_driver = self.graphiti.driver
             await self.graphiti.close()
+            await drivers.release(graph_driver, user="chat_memory")
+            self.graphiti = None
             logger.info("Graphiti connection closed.")
+        if self.driver:
+            await drivers.release(self.driver, user="chat_memory")
+            self.driver = None
 
     async def save_message_as_episode(self, user_id: str, text: str, sender: str):
         """
@@ -76,21 +87,24 @@ class ChatMemory:
             logger.info(f"Saved message from {sender} for user {user_id}")
 
         # Add message as an episode for semantic search (using Graphiti)
-        # Use 'text' EpisodeType for chat messages
-        await self.graphiti.add_episode(
-            name=f"Chat message from {sender} by {user_id} at {datetime.now(timezone.utc).isoformat()}",
-            episode_body=text,
-            source=EpisodeType.text,
-            source_description="chat message",
-            reference_time=datetime.now(timezone.utc),
-        )
+        # Use 'text' EpisodeType for chat messages. Extraction runs in the
+        # background lane so it never delays a user-facing search.
+        with llm_priority(Priority.BACKGROUND), llm_caller("chat_memory.ingest"):
+            await self.graphiti.add_episode(
+                name=f"Chat message from {sender} by {user_id} at {datetime.now(timezone.utc).isoformat()}",
+                episode_body=text,
+                source=EpisodeType.text,
+                source_description="chat message",
+                reference_time=datetime.now(timezone.utc),
+            )
         logger.info("Saved message as Graphiti episode.")
 
     async def search_knowledge(self, query: str, limit: int = 5):
         """
         Use Graphiti semantic + BM25 hybrid search to find relevant facts.
         """
-        results = await self.graphiti.search(query)
+        with llm_priority(Priority.INTERACTIVE), llm_caller("chat_memory.search"):
+            results = await self.graphiti.search(query)
         limited_results = results[:limit]
         logger.info(f"Found {len(limited_results)} search results for query: {query}")
         return limited_results
@@ -138,6 +152,7 @@ async def main():
         print(f"Fact: {res.fact}")
 
     await chat.close()
+    await drivers.close()
 
 
 if __name__ == "__main__":
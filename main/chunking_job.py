@@ -0,0 +1,212 @@
+import os
+import json
+import time
+import socket
+import sqlite3
+import hashlib
+import logging
+from dataclasses import asdict
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from main.llm_chunker import MistralChunker
+
+logger = logging.getLogger(__name__)
+
+
+class ChunkingJob:
+    """Resumable ``chunk_document`` runs over a document set.
+
+    Finished documents and their chunks are recorded in a local SQLite
+    checkpoint keyed by document id, content hash and chunking config, so a
+    restarted run skips completed documents. Workers sharing a checkpoint
+    claim documents with an expiring lease, so several can work through the
+    same manifest without chunking a document twice. A lease only stops
+    other workers from claiming the document: a slow worker still records its
+    result unless another worker took the document over in the meantime.
+
+    ``worker_id`` defaults to the host name, so a process restarted after a
+    crash reclaims the documents it had leased right away. Workers sharing a
+    checkpoint on one host need distinct ids.
+    """
+
+    def __init__(
+        self,
+        chunker: MistralChunker,
+        checkpoint_path: str,
+        lease_seconds: float = 600.0,
+        worker_id: Optional[str] = None,
+    ):
+        self.chunker = chunker
+        self.checkpoint_path = checkpoint_path
+        self.lease_seconds = lease_seconds
+        self.worker_id = worker_id if worker_id else socket.gethostname()
+        self.fingerprint = self.config_fingerprint()
+        directory = os.path.dirname(os.path.abspath(checkpoint_path))
+        os.makedirs(directory, exist_ok=True)
+        self._conn = sqlite3.connect(
+            checkpoint_path, timeout=30, isolation_level=None, check_same_thread=False
+        )
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS documents (
+                key TEXT PRIMARY KEY,
+                doc_id TEXT NOT NULL,
+                status TEXT NOT NULL,
+                worker TEXT,
+                leased_until REAL,
+                error TEXT,
+                updated_at REAL NOT NULL
+            )
+            """)
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS chunks (
+                key TEXT NOT NULL,
+                chunk_id INTEGER NOT NULL,
+                record TEXT NOT NULL,
+                PRIMARY KEY (key, chunk_id)
+            )
+            """)
+
+    def config_fingerprint(self) -> str:
+        """Hash of everything that changes the chunks produced for a document"""
+        config = {
+            "chunking": asdict(self.chunker.config),
+            "model": self.chunker.llm_config.model,
+            "temperature": self.chunker.llm_config.temperature,
+            "embedding_model": self.chunker.llm_config.embedding_model,
+        }
+        encoded = json.dumps(config, sort_keys=True, default=str)
+        return hashlib.sha256(encoded.encode("utf-8")).hexdigest()[:16]
+
+    def document_key(self, doc_id: str, text: str) -> str:
+        # Identical texts under different ids get their own checkpoint rows
+        digest = hashlib.sha256(f"{doc_id}\0{text}".encode("utf-8")).hexdigest()
+        return f"{digest}:{self.fingerprint}"
+
+    def _claim(self, key: str, doc_id: str) -> str:
+        """Try to lease a document; returns "claimed", "done" or "busy" """
+        now = time.time()
+        self._conn.execute("BEGIN IMMEDIATE")
+        try:
+            row = self._conn.execute(
+                "SELECT status, worker, leased_until FROM documents WHERE key = ?",
+                (key,),
+            ).fetchone()
+            if row is not None:
+                status, worker, leased_until = row
+                if status == "done":
+                    self._conn.execute("COMMIT")
+                    return "done"
+                if (
+                    status == "running"
+                    and worker != self.worker_id
+                    and leased_until > now
+                ):
+                    self._conn.execute("COMMIT")
+                    return "busy"
+            self._conn.execute(
+                "INSERT OR REPLACE INTO documents"
+                " (key, doc_id, status, worker, leased_until, error, updated_at)"
+                " VALUES (?, ?, 'running', ?, ?, NULL, ?)",
+                (key, doc_id, self.worker_id, now + self.lease_seconds, now),
+            )
+            self._conn.execute("COMMIT")
+            return "claimed"
+        except Exception:
+            self._conn.execute("ROLLBACK")
+            raise
+
+    def _complete(self, key: str, records: List[dict]) -> bool:
+        """Record the chunks unless another worker took the document over"""
+        self._conn.execute("BEGIN IMMEDIATE")
+        try:
+            updated = self._conn.execute(
+                "UPDATE documents SET status = 'done', leased_until = NULL,"
+                " updated_at = ? WHERE key = ? AND status = 'running'"
+                " AND worker = ?",
+                (time.time(), key, self.worker_id),
+            ).rowcount
+            if not updated:
+                self._conn.execute("ROLLBACK")
+                return False
+            self._conn.execute("DELETE FROM chunks WHERE key = ?", (key,))
+            self._conn.executemany(
+                "INSERT INTO chunks (key, chunk_id, record) VALUES (?, ?, ?)",
+                [(key, r["chunk_id"], json.dumps(r)) for r in records],
+            )
+            self._conn.execute("COMMIT")
+            return True
+        except Exception:
+            self._conn.execute("ROLLBACK")
+            raise
+
+    def _fail(self, key: str, error: Exception):
+        self._conn.execute(
+            "UPDATE documents SET status = 'failed', leased_until = NULL,"
+            " error = ?, updated_at = ? WHERE key = ? AND worker = ?",
+            (str(error), time.time(), key, self.worker_id),
+        )
+
+    def run(self, documents: Iterable[Tuple[str, str]]) -> Dict[str, int]:
+        """Chunk ``(doc_id, text)`` pairs, skipping finished or leased ones"""
+        summary = {"done": 0, "skipped": 0, "busy": 0, "failed": 0, "lost": 0}
+        for doc_id, text in documents:
+            key = self.document_key(doc_id, text)
+            claim = self._claim(key, doc_id)
+            if claim == "done":
+                summary["skipped"] += 1
+                continue
+            if claim == "busy":
+                summary["busy"] += 1
+                continue
+            try:
+                records = self.chunker.chunk_document(text)
+            except Exception as e:
+                logger.warning("Chunking %s failed: %s", doc_id, e)
+                self._fail(key, e)
+                summary["failed"] += 1
+                continue
+            for record in records:
+                record["doc_id"] = doc_id
+            if not self._complete(key, records):
+                # The lease expired and another worker claimed the document
+                logger.warning("Lost the lease on %s; discarding its chunks", doc_id)
+                summary["lost"] += 1
+                continue
+            summary["done"] += 1
+        logger.info("Chunking job worker %s finished: %s", self.worker_id, summary)
+        return summary
+
+    def run_manifest(self, manifest_path: str) -> Dict[str, int]:
+        """Run over a manifest file listing one document path per line"""
+        with open(manifest_path, "r", encoding="utf-8") as f:
+            paths = [line.strip() for line in f if line.strip()]
+        return self.run((path, self._read(path)) for path in paths)
+
+    @staticmethod
+    def _read(path: str) -> str:
+        with open(path, "r", encoding="utf-8") as f:
+            return f.read()
+
+    def chunks_for(self, doc_id: str, text: str) -> Optional[List[dict]]:
+        """Checkpointed chunks for a document, or None if it is not finished"""
+        key = self.document_key(doc_id, text)
+        row = self._conn.execute(
+            "SELECT status FROM documents WHERE key = ?", (key,)
+        ).fetchone()
+        if row is None or row[0] != "done":
+            return None
+        rows = self._conn.execute(
+            "SELECT record FROM chunks WHERE key = ? ORDER BY chunk_id", (key,)
+        ).fetchall()
+        return [json.loads(record) for (record,) in rows]
+
+    def progress(self) -> Dict[str, int]:
+        rows = self._conn.execute(
+            "SELECT status, COUNT(*) FROM documents WHERE key LIKE ? GROUP BY status",
+            (f"%:{self.fingerprint}",),
+        ).fetchall()
+        return dict(rows)
+
+    def close(self):
+        self._conn.close()
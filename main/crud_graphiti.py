@@ -1,62 +1,1242 @@
-import uuid
-import datetime
+import re
+import time
 import asyncio
 import logging
-from graphiti.graph.node import EntityNode  # Updated import path
-from graphiti.driver.neo4j_driver import AsyncNeo4jDriver  # Updated import path
-from mistral_client import LocalAiClient  # Local Mistral client
-from graphiti_core.prompts import Message
-from graphiti_core.llm_client.client import LLMClient
-from graphiti_core.llm_client.config import LLMConfig
-from graphiti_core.llm_client.errors import RateLimitError
-
-# Setup logging
-logging.basicConfig(level=logging.INFO)
+from contextlib import asynccontextmanager
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import (
+    Any,
+    AsyncIterator,
+    Callable,
+    Dict,
+    Iterable,
+    List,
+    Mapping,
+    NamedTuple,
+    Optional,
+    Sequence,
+    Tuple,
+    Union,
+)
+
+from graphiti_core.driver.driver import GraphDriver
+from graphiti_core.edges import EntityEdge, EpisodicEdge
+from graphiti_core.embedder.client import EmbedderClient
+from graphiti_core.helpers import parse_db_date
+from graphiti_core.nodes import EntityNode, EpisodeType, EpisodicNode
+from graphiti_core.utils.datetime_utils import utc_now
+
+from main.entity_cache import EntityCache
+from main.neo4j_pool import drivers
+
 logger = logging.getLogger(__name__)
 
-# Setup Neo4j driver
-neo4j_driver = AsyncNeo4jDriver(
-    uri="bolt://localhost:7687", username="neo4j", password="test"
+# Property layout follows graphiti_core so nodes written here are visible to
+# Graphiti search and ingestion
+ENTITY_NODE_SAVE = """
+MERGE (n:Entity {uuid: $node.uuid})
+SET n += $node
+RETURN n.uuid AS uuid
+"""
+
+ENTITY_NODES_BULK_SAVE = """
+UNWIND $rows AS node
+MERGE (n:Entity {uuid: node.uuid})
+SET n += node
+RETURN n.uuid AS uuid
+"""
+
+ENTITY_NODE_RETURN = (
+    "n.uuid AS uuid, n.name AS name, n.group_id AS group_id, "
+    "n.summary AS summary, n.created_at AS created_at, "
+    "n.name_embedding AS name_embedding, n.version AS version"
+)
+
+ENTITY_NODE_GET = f"""
+MATCH (n:Entity {{uuid: $uuid}})
+RETURN {ENTITY_NODE_RETURN}
+"""
+
+ENTITY_NODES_GET_MANY = f"""
+MATCH (n:Entity) WHERE n.uuid IN $uuids
+RETURN {ENTITY_NODE_RETURN}
+"""
+
+# Partial update in one round trip. Every update bumps ``version`` (absent
+# counts as 0); when an expected version is given the properties are only set
+# if it still matches, and ``previous_version`` lets the caller tell a
+# conflict (version unchanged) from a successful write. Neo4j reads at read
+# committed, so the node's write lock is taken (``SET n._lock``) before the
+# version is read: a concurrent update then waits and sees the new version
+# instead of both passing the check and writing the same increment
+ENTITY_NODE_UPDATE = f"""
+MATCH (n:Entity {{uuid: $uuid}})
+SET n._lock = true
+WITH n, coalesce(n.version, 0) AS previous_version
+FOREACH (_ IN CASE WHEN $expected_version IS NULL
+                    OR previous_version = $expected_version THEN [1] ELSE [] END |
+    SET n += $props, n.version = coalesce(n.version, 0) + 1)
+REMOVE n._lock
+RETURN {ENTITY_NODE_RETURN}, previous_version
+"""
+
+ENTITY_NODES_BULK_UPDATE = """
+UNWIND $rows AS row
+OPTIONAL MATCH (n:Entity {uuid: row.uuid})
+SET n._lock = true
+WITH row, n, coalesce(n.version, 0) AS previous_version
+FOREACH (_ IN CASE WHEN n IS NOT NULL AND (row.expected_version IS NULL
+                    OR previous_version = row.expected_version) THEN [1] ELSE [] END |
+    SET n += row.props, n.version = coalesce(n.version, 0) + 1)
+REMOVE n._lock
+RETURN row.uuid AS uuid, n IS NOT NULL AS found, n.version AS version,
+       previous_version
+"""
+
+ENTITY_NODE_DELETE = """
+MATCH (n:Entity {uuid: $uuid})
+DETACH DELETE n
+RETURN count(n) AS deleted
+"""
+
+# Bulk deletes run as many small statements. A batch of nodes first loses
+# its relationships ``$limit`` at a time, so a heavily connected node never
+# needs one huge transaction, and then the nodes themselves are deleted
+NODES_RELATIONSHIPS_DELETE = """
+MATCH (n{label}) WHERE n.uuid IN $uuids
+MATCH (n)-[r]-()
+WITH DISTINCT r LIMIT $limit
+DELETE r
+RETURN count(r) AS deleted
+"""
+
+NODES_DELETE = """
+MATCH (n{label}) WHERE n.uuid IN $uuids
+DETACH DELETE n
+RETURN count(n) AS deleted
+"""
+
+NODES_MATCHING = """
+MATCH (n{label})
+WHERE n.uuid IS NOT NULL AND ($group_id IS NULL OR n.group_id = $group_id)
+RETURN n.uuid AS uuid
+LIMIT $limit
+"""
+
+EPISODIC_NODE_SAVE = """
+MERGE (n:Episodic {uuid: $node.uuid})
+SET n += $node
+RETURN n.uuid AS uuid
+"""
+
+EPISODIC_NODES_BULK_SAVE = """
+UNWIND $rows AS node
+MERGE (n:Episodic {uuid: node.uuid})
+SET n += node
+RETURN n.uuid AS uuid
+"""
+
+# Edges are created in one round trip: both endpoints are matched optionally,
+# the edge is only merged when both exist, and the flags say which was missing
+ENTITY_EDGE_SAVE = """
+OPTIONAL MATCH (source:Entity {uuid: $source_uuid})
+OPTIONAL MATCH (target:Entity {uuid: $target_uuid})
+FOREACH (_ IN CASE WHEN source IS NOT NULL AND target IS NOT NULL THEN [1] ELSE [] END |
+    MERGE (source)-[e:RELATES_TO {uuid: $edge.uuid}]->(target)
+    SET e += $edge)
+RETURN source IS NOT NULL AS source_found, target IS NOT NULL AS target_found
+"""
+
+ENTITY_EDGES_BULK_SAVE = """
+UNWIND $rows AS row
+OPTIONAL MATCH (source:Entity {uuid: row.source_uuid})
+OPTIONAL MATCH (target:Entity {uuid: row.target_uuid})
+FOREACH (_ IN CASE WHEN source IS NOT NULL AND target IS NOT NULL THEN [1] ELSE [] END |
+    MERGE (source)-[e:RELATES_TO {uuid: row.edge.uuid}]->(target)
+    SET e += row.edge)
+RETURN row.edge.uuid AS uuid, source IS NOT NULL AS source_found,
+       target IS NOT NULL AS target_found
+"""
+
+EPISODIC_EDGE_SAVE = """
+OPTIONAL MATCH (source:Episodic {{uuid: $source_uuid}})
+OPTIONAL MATCH (target:Entity {{uuid: $target_uuid}})
+FOREACH (_ IN CASE WHEN source IS NOT NULL AND target IS NOT NULL THEN [1] ELSE [] END |
+    MERGE (source)-[e:{relationship_type} {{uuid: $edge.uuid}}]->(target)
+    SET e += $edge)
+RETURN source IS NOT NULL AS source_found, target IS NOT NULL AS target_found
+"""
+
+# Vector index lookups with per-query filters, one UNWIND row per query
+# vector. The index returns ``candidates`` nearest nodes, filters are applied
+# to those and the best ``k`` survivors are kept
+ENTITY_SIMILAR_SEARCH = f"""
+UNWIND range(0, size($vectors) - 1) AS i
+CALL {{
+    WITH i
+    CALL db.index.vector.queryNodes($index, $candidates, $vectors[i])
+    YIELD node AS n, score
+    WITH n, score
+    WHERE all(key IN keys($filters) WHERE n[key] = $filters[key])
+    RETURN n, score
+    ORDER BY score DESC
+    LIMIT $k
+}}
+RETURN i, {ENTITY_NODE_RETURN}, score
+"""
+
+VECTOR_INDEX_CREATE = """
+CREATE VECTOR INDEX {name} IF NOT EXISTS
+FOR (n:{label}) ON (n.{property})
+OPTIONS {{indexConfig: {{
+    `vector.dimensions`: {dimensions},
+    `vector.similarity_function`: '{similarity}'
+}}}}
+"""
+
+VECTOR_INDEX_DROP = "DROP INDEX {name} IF EXISTS"
+
+VECTOR_INDEX_AWAIT = "CALL db.awaitIndex($name, $timeout)"
+
+VECTOR_INDEX_SHOW = """
+SHOW INDEXES YIELD name, type, state, populationPercent, options
+WHERE name = $name
+RETURN name, type, state, populationPercent AS population_percent, options
+"""
+
+_IDENTIFIER = re.compile(r"^[A-Za-z_][A-Za-z0-9_]*$")
+
+SIMILARITY_FUNCTIONS = ("cosine", "euclidean")
+
+
+def _records(result: Any) -> list:
+    """Records of an execute_query result (neo4j EagerResult or a plain list)"""
+    return list(getattr(result, "records", result) or [])
+
+
+def _identifier(name: str, kind: str) -> str:
+    # Relationship types, labels and index names cannot be query parameters,
+    # so they are validated before being interpolated
+    if not _IDENTIFIER.match(name):
+        raise ValueError(f"Invalid {kind}: {name!r}")
+    return name
+
+
+def _relationship_type(name: str) -> str:
+    return _identifier(name, "relationship type")
+
+
+@dataclass
+class VectorIndexConfig:
+    name: str = "entity_name_embedding"
+    label: str = "Entity"
+    property: str = "name_embedding"
+    # mxbai-embed-large vectors; must match the embedder in use
+    dimensions: int = 1024
+    similarity: str = "cosine"
+    # Index hits fetched per requested result, so that results dropped by
+    # filters still leave k matches in most cases
+    oversample: int = 4
+
+    def create_query(self) -> str:
+        if self.similarity not in SIMILARITY_FUNCTIONS:
+            raise ValueError(f"Invalid similarity function: {self.similarity!r}")
+        return VECTOR_INDEX_CREATE.format(
+            name=_identifier(self.name, "index name"),
+            label=_identifier(self.label, "label"),
+            property=_identifier(self.property, "property"),
+            dimensions=int(self.dimensions),
+            similarity=self.similarity,
+        )
+
+
+def _missing_endpoints(
+    record: Any, source: str, target: str, labels=("Entity", "Entity")
+) -> List[str]:
+    """Endpoints a create-edge result reports as not found"""
+    ends = (("source", source, labels[0]), ("target", target, labels[1]))
+    return [
+        f"{end} {label} node {uuid}"
+        for end, uuid, label in ends
+        if not record[f"{end}_found"]
+    ]
+
+
+def entity_properties(node: EntityNode) -> dict:
+    properties = {
+        "uuid": node.uuid,
+        "name": node.name,
+        "group_id": node.group_id,
+        "summary": node.summary,
+        "created_at": node.created_at,
+        **node.attributes,
+    }
+    if node.name_embedding is not None:
+        properties["name_embedding"] = node.name_embedding
+    return properties
+
+
+def episodic_properties(node: EpisodicNode) -> dict:
+    return {
+        "uuid": node.uuid,
+        "name": node.name,
+        "group_id": node.group_id,
+        "source": node.source.value,
+        "source_description": node.source_description,
+        "content": node.content,
+        "entity_edges": node.entity_edges,
+        "created_at": node.created_at,
+        "valid_at": node.valid_at,
+    }
+
+
+def entity_edge_properties(edge: EntityEdge) -> dict:
+    properties = {
+        "uuid": edge.uuid,
+        "name": edge.name,
+        "fact": edge.fact,
+        "group_id": edge.group_id,
+        "episodes": edge.episodes,
+        "created_at": edge.created_at,
+        "valid_at": edge.valid_at,
+        "invalid_at": edge.invalid_at,
+        "expired_at": edge.expired_at,
+        **edge.attributes,
+    }
+    if edge.fact_embedding is not None:
+        properties["fact_embedding"] = edge.fact_embedding
+    return properties
+
+
+class VersionConflictError(RuntimeError):
+    """An update's expected version no longer matches the stored node"""
+
+    def __init__(self, uuid: str, expected: int, actual: int):
+        super().__init__(
+            f"Entity node {uuid} is at version {actual}, expected {expected}"
+        )
+        self.uuid = uuid
+        self.expected = expected
+        self.actual = actual
+
+
+def _update_properties(changes: dict) -> dict:
+    for key in ("uuid", "version"):
+        if key in changes:
+            raise ValueError(f"{key} cannot be updated")
+    return changes
+
+
+@dataclass
+class BulkResult:
+    """Outcome of a bulk write: the items written and the achieved rate"""
+
+    items: list = field(default_factory=list)
+    # (item, reason) pairs for items the database did not write
+    failed: list = field(default_factory=list)
+    batches: int = 0
+    elapsed: float = 0.0
+
+    @property
+    def count(self) -> int:
+        return len(self.items)
+
+    @property
+    def per_second(self) -> float:
+        return self.count / self.elapsed if self.elapsed > 0 else 0.0
+
+    def as_dict(self) -> dict:
+        return {
+            "count": self.count,
+            "failed": len(self.failed),
+            "batches": self.batches,
+            "elapsed": self.elapsed,
+            "per_second": self.per_second,
+        }
+
+
+@dataclass
+class BulkDeleteConfig:
+    # Nodes per batch, and relationships per statement when detaching them
+    batch_size: int = 1000
+    relationship_batch_size: int = 10000
+    # Ceiling on deleted nodes plus relationships per second, so cleanup
+    # jobs leave room for live traffic; None deletes as fast as possible
+    max_per_second: Optional[float] = None
+
+
+@dataclass
+class DeleteResult:
+    """Running totals of a bulk delete, passed to progress callbacks"""
+
+    nodes: int = 0
+    relationships: int = 0
+    batches: int = 0
+    statements: int = 0
+    elapsed: float = 0.0
+
+    @property
+    def per_second(self) -> float:
+        return self.nodes / self.elapsed if self.elapsed > 0 else 0.0
+
+    def as_dict(self) -> dict:
+        return {
+            "nodes": self.nodes,
+            "relationships": self.relationships,
+            "batches": self.batches,
+            "statements": self.statements,
+            "elapsed": self.elapsed,
+            "per_second": self.per_second,
+        }
+
+
+class _NodeUpdate(NamedTuple):
+    uuid: str
+    props: dict
+    expected_version: Optional[int] = None
+
+
+def _entity_edge_row(edge: EntityEdge) -> dict:
+    return {
+        "source_uuid": edge.source_node_uuid,
+        "target_uuid": edge.target_node_uuid,
+        "edge": entity_edge_properties(edge),
+    }
+
+
+def _failed_edges(batch: list, rows: list) -> list:
+    found = {row["uuid"]: row for row in rows}
+    failed = []
+    for edge in batch:
+        missing = _missing_endpoints(
+            found[edge.uuid], edge.source_node_uuid, edge.target_node_uuid
+        )
+        if missing:
+            failed.append((edge, f"missing {', '.join(missing)}"))
+    return failed
+
+
+def _update_row(update: _NodeUpdate) -> dict:
+    return update._asdict()
+
+
+def _failed_updates(batch: list, rows: list) -> list:
+    found = {row["uuid"]: row for row in rows}
+    failed = []
+    for update in batch:
+        row = found[update.uuid]
+        if not row["found"]:
+            failed.append((update, "not found"))
+        elif row["version"] == row["previous_version"]:
+            reason = (
+                f"version conflict: expected {update.expected_version}, "
+                f"found {row['version']}"
+            )
+            failed.append((update, reason))
+    return failed
+
+
+@dataclass(frozen=True)
+class _Writer:
+    """One kind of batched write: its UNWIND query and how rows are built.
+
+    ``failures(batch, rows)`` picks the ``(item, reason)`` pairs a batch's
+    result rows report as not written.
+    """
+
+    kind: str
+    query: str
+    to_row: Callable[[Any], dict]
+    failures: Optional[Callable[[list, list], list]] = None
+
+
+ENTITY_NODE_WRITER = _Writer("entity nodes", ENTITY_NODES_BULK_SAVE, entity_properties)
+EPISODIC_NODE_WRITER = _Writer(
+    "episodic nodes", EPISODIC_NODES_BULK_SAVE, episodic_properties
+)
+ENTITY_UPDATE_WRITER = _Writer(
+    "entity node updates", ENTITY_NODES_BULK_UPDATE, _update_row, _failed_updates
 )
+ENTITY_EDGE_WRITER = _Writer(
+    "entity edges", ENTITY_EDGES_BULK_SAVE, _entity_edge_row, _failed_edges
+)
+
+
+class UnitOfWork:
+    """Writes buffered inside ``GraphitiCRUD.transaction(buffered=True)``.
+
+    Its methods mirror the single-item GraphitiCRUD writes but only queue the
+    operation and return the model straight away. Queued writes are grouped
+    by kind and sent as UNWIND batches on the surrounding transaction, entity
+    and episodic nodes first, then updates, then edges, so edges can point at
+    nodes created in the same unit. Reaching ``max_pending`` queued writes
+    flushes early, still inside the transaction.
+
+    Rows a batch reports as not written (edges with missing endpoints, updates
+    of missing nodes or version conflicts) are collected in ``failed``
+    instead of raising, as with the ``*_bulk`` methods.
+    """
 
-# Setup Mistral client
-llm_client = LocalAiClient(base_url="http://localhost:11434")
-
-
-async def create_entity(name: str, summary: str):
-    embedding = llm_client.generate_embedding(
-        name
-    )  # Assuming this is synchronous; adjust if async
-    entity = EntityNode(
-        uuid=str(uuid.uuid4()),
-        name=name,
-        summary=summary,
-        name_embedding=embedding,
-        created_at=datetime.datetime.utcnow(),
-        labels=["Entity"],
+    ORDER = (
+        ENTITY_NODE_WRITER,
+        EPISODIC_NODE_WRITER,
+        ENTITY_UPDATE_WRITER,
+        ENTITY_EDGE_WRITER,
     )
-    await entity.save(neo4j_driver)
-    return entity
 
+    def __init__(self, crud: "GraphitiCRUD", tx: Any, max_pending: int):
+        self.crud = crud
+        self.tx = tx
+        self.max_pending = max_pending
+        self._pending: Dict[str, list] = {writer.kind: [] for writer in self.ORDER}
+        self.written: Dict[str, int] = {writer.kind: 0 for writer in self.ORDER}
+        self.failed: list = []
+        self.flushes = 0
+        self.statements = 0
+
+    def __len__(self) -> int:
+        return sum(len(items) for items in self._pending.values())
+
+    async def _queue(self, writer: _Writer, item: Any) -> Any:
+        self._pending[writer.kind].append(item)
+        if self.max_pending and len(self) >= self.max_pending:
+            await self.flush()
+        return item
+
+    async def create_entity_node(
+        self,
+        name: str,
+        summary: str = "",
+        name_embedding: Optional[List[float]] = None,
+    ) -> EntityNode:
+        node = self.crud._entity_node(
+            {"name": name, "summary": summary, "name_embedding": name_embedding}
+        )
+        return await self._queue(ENTITY_NODE_WRITER, node)
+
+    async def create_episodic_node(
+        self, name: str, timestamp: datetime, content: str
+    ) -> EpisodicNode:
+        node = self.crud._episodic_node(
+            {"name": name, "content": content, "valid_at": timestamp}
+        )
+        return await self._queue(EPISODIC_NODE_WRITER, node)
+
+    async def create_entity_edge(
+        self,
+        source_uuid: str,
+        target_uuid: str,
+        relationship_type: str,
+        fact: str = "",
+    ) -> EntityEdge:
+        edge = self.crud._entity_edge(
+            {
+                "source_node_uuid": source_uuid,
+                "target_node_uuid": target_uuid,
+                "name": relationship_type,
+                "fact": fact,
+            }
+        )
+        return await self._queue(ENTITY_EDGE_WRITER, edge)
+
+    async def update_entity_node(
+        self, uuid: str, expected_version: Optional[int] = None, **changes
+    ):
+        update = _NodeUpdate(uuid, _update_properties(changes), expected_version)
+        await self._queue(ENTITY_UPDATE_WRITER, update)
+
+    async def flush(self):
+        """Send every queued write on the transaction, grouped by kind"""
+        if not len(self):
+            return
+        batch_size = self.crud.batch_size
+        for writer in self.ORDER:
+            items, self._pending[writer.kind] = self._pending[writer.kind], []
+            if writer in (ENTITY_NODE_WRITER, ENTITY_UPDATE_WRITER):
+                self.crud._cache_invalidate(item.uuid for item in items)
+            for i in range(0, len(items), batch_size):
+                batch = items[i : i + batch_size]
+                failed = await self.crud._run_batch(self.tx, writer, batch)
+                self.failed.extend(failed)
+                self.written[writer.kind] += len(batch) - len(failed)
+                self.statements += 1
+        self.flushes += 1
+        logger.debug(
+            "Flushed unit of work: %d statements so far, %d failed",
+            self.statements,
+            len(self.failed),
+        )
+
+
+class GraphitiCRUD:
+    """Create, read, update and delete Graphiti nodes and edges directly.
+
+    Single-item methods issue one query per call; the ``*_bulk`` methods send
+    parameter lists through ``UNWIND`` in batches of ``batch_size``, each batch
+    in its own transaction. ``transaction(buffered=True)`` instead yields a
+    UnitOfWork that queues writes and sends them grouped by kind in one
+    transaction.
+
+    ``delete_nodes_bulk`` and ``delete_nodes_matching`` remove nodes in
+    bounded, optionally rate-limited batches for cleanup jobs.
+
+    ``find_similar_entities`` looks entities up by name embedding through a
+    Neo4j vector index managed with ``create_vector_index``.
+
+    With an EntityCache, entity reads are served from it when possible. Writes
+    that return the full node (create, update) are written through; bulk
+    writes, deletes and failed updates invalidate the affected entries.
+    """
+
+    def __init__(
+        self,
+        driver: Optional[GraphDriver] = None,
+        embedder: Optional[EmbedderClient] = None,
+        group_id: str = "",
+        batch_size: int = 1000,
+        cache: Optional[EntityCache] = None,
+        embedding_batch_size: int = 128,
+        embedding_concurrency: int = 2,
+        max_pending: int = 10000,
+        vector_index: Optional[VectorIndexConfig] = None,
+    ):
+        # Defaults to the process-wide shared Neo4j pool, released by close()
+        self._shared_driver = driver is None
+        self.driver = driver if driver else drivers.graph_driver(user="crud_graphiti")
+        # A graphiti EmbedderClient, or any object with a blocking
+        # ``embed(texts)`` method (e.g. MxbaiEmbedder)
+        self.embedder = embedder
+        self.group_id = group_id
+        self.batch_size = batch_size
+        self.cache = cache
+        self.embedding_batch_size = embedding_batch_size
+        self.embedding_concurrency = embedding_concurrency
+        # Queued writes after which a UnitOfWork flushes early
+        self.max_pending = max_pending
+        self.vector_index = vector_index if vector_index else VectorIndexConfig()
+
+    async def close(self):
+        """Release the shared pool when the driver came from the registry.
+
+        A driver passed in by the caller is left open for the caller to close.
+        """
+        if self._shared_driver:
+            await self.driver.close()
+            await drivers.release(self.driver, user="crud_graphiti")
+            self._shared_driver = False
+
+    def _cache_put(self, node: EntityNode):
+        if self.cache is not None:
+            self.cache.put(node)
+
+    def _cache_invalidate(self, uuids: Iterable[str]):
+        if self.cache is not None:
+            self.cache.invalidate(uuids)
+
+    @asynccontextmanager
+    async def transaction(
+        self, buffered: bool = False, max_pending: Optional[int] = None
+    ) -> AsyncIterator[Any]:
+        """Explicit transaction, committed on exit and rolled back on error.
+
+        Yields the driver transaction, or with ``buffered`` a UnitOfWork whose
+        queued writes are flushed before the commit.
+        """
+        async with self.driver.session() as session:
+            tx = await session.begin_transaction()
+            try:
+                if buffered:
+                    unit = UnitOfWork(self, tx, max_pending or self.max_pending)
+                    yield unit
+                    await unit.flush()
+                else:
+                    yield tx
+                await tx.commit()
+            except BaseException:
+                await tx.rollback()
+                raise
+
+    async def _embed_batch(self, texts: List[str]) -> List[List[float]]:
+        if hasattr(self.embedder, "embed"):
+            # Blocking model calls run in a worker thread, off the event loop
+            vectors = await asyncio.to_thread(self.embedder.embed, texts)
+        else:
+            try:
+                vectors = await self.embedder.create_batch(texts)
+            except NotImplementedError:
+                # create() embeds a single input into a single vector
+                vectors = await asyncio.gather(
+                    *(self.embedder.create(text) for text in texts)
+                )
+        return [[float(x) for x in vector] for vector in vectors]
+
+    async def generate_embeddings(self, texts: List[str]) -> List[List[float]]:
+        """Embed texts in batches of ``embedding_batch_size``, keeping order"""
+        if self.embedder is None:
+            raise RuntimeError("GraphitiCRUD needs an embedder to embed text")
+        size = self.embedding_batch_size
+        semaphore = asyncio.Semaphore(self.embedding_concurrency)
+
+        async def embed(batch: List[str]) -> List[List[float]]:
+            async with semaphore:
+                return await self._embed_batch(batch)
+
+        batches = await asyncio.gather(
+            *(embed(texts[i : i + size]) for i in range(0, len(texts), size))
+        )
+        return [vector for batch in batches for vector in batch]
+
+    async def generate_embedding(self, text: str) -> List[float]:
+        return (await self.generate_embeddings([text]))[0]
+
+    def _entity_node(self, item: Union[EntityNode, dict]) -> EntityNode:
+        if isinstance(item, EntityNode):
+            return item
+        return EntityNode(**{"group_id": self.group_id, "labels": ["Entity"], **item})
+
+    def _episodic_node(self, item: Union[EpisodicNode, dict]) -> EpisodicNode:
+        if isinstance(item, EpisodicNode):
+            return item
+        return EpisodicNode(
+            **{
+                "group_id": self.group_id,
+                "labels": ["Episodic"],
+                "source": EpisodeType.text,
+                "source_description": "",
+                "valid_at": utc_now(),
+                **item,
+            }
+        )
+
+    async def create_entity_node(
+        self,
+        name: str,
+        summary: str = "",
+        name_embedding: Optional[List[float]] = None,
+    ) -> EntityNode:
+        node = self._entity_node(
+            {"name": name, "summary": summary, "name_embedding": name_embedding}
+        )
+        try:
+            await self.driver.execute_query(
+                ENTITY_NODE_SAVE, node=entity_properties(node)
+            )
+        except Exception as e:
+            raise RuntimeError(f"Failed to create entity node: {e}") from e
+        self._cache_put(node)
+        return node
+
+    async def create_node_with_embedding(
+        self, name: str, summary: str = ""
+    ) -> EntityNode:
+        embedding = await self.generate_embedding(name)
+        return await self.create_entity_node(name, summary, name_embedding=embedding)
+
+    def _entity_from_record(self, record: Any) -> EntityNode:
+        version = record.get("version")
+        return EntityNode(
+            uuid=record["uuid"],
+            name=record["name"],
+            group_id=record.get("group_id") or self.group_id,
+            summary=record.get("summary") or "",
+            created_at=parse_db_date(record["created_at"]),
+            name_embedding=record.get("name_embedding"),
+            labels=["Entity"],
+            attributes={} if version is None else {"version": version},
+        )
+
+    async def get_entity_node(self, uuid: str) -> Optional[EntityNode]:
+        if self.cache is not None:
+            node = self.cache.get(uuid)
+            if node is not None:
+                return node
+        records = _records(await self.driver.execute_query(ENTITY_NODE_GET, uuid=uuid))
+        if not records:
+            return None
+        node = self._entity_from_record(records[0])
+        self._cache_put(node)
+        return node
+
+    async def get_many(self, uuids: Iterable[str]) -> Dict[str, EntityNode]:
+        """Entity nodes by uuid, fetching all cache misses in one query.
+
+        Missing uuids are left out of the result.
+        """
+        uuids = list(dict.fromkeys(uuids))
+        found = self.cache.get_many(uuids) if self.cache is not None else {}
+        misses = [uuid for uuid in uuids if uuid not in found]
+        if misses:
+            records = _records(
+                await self.driver.execute_query(ENTITY_NODES_GET_MANY, uuids=misses)
+            )
+            for record in records:
+                node = self._entity_from_record(record)
+                self._cache_put(node)
+                found[node.uuid] = node
+        return {uuid: found[uuid] for uuid in uuids if uuid in found}
+
+    async def create_vector_index(self, wait: bool = True, timeout: float = 300.0):
+        """Create the entity embedding vector index if it does not exist.
+
+        With ``wait``, blocks until the index has been populated so that
+        searches right after a bulk load see every node.
+        """
+        config = self.vector_index
+        await self.driver.execute_query(config.create_query())
+        if wait:
+            await self.driver.execute_query(
+                VECTOR_INDEX_AWAIT, name=config.name, timeout=int(timeout)
+            )
+        logger.info(
+            "Vector index %s on :%s(%s), %d dimensions, %s",
+            config.name,
+            config.label,
+            config.property,
+            config.dimensions,
+            config.similarity,
+        )
+
+    async def drop_vector_index(self):
+        name = _identifier(self.vector_index.name, "index name")
+        await self.driver.execute_query(VECTOR_INDEX_DROP.format(name=name))
+
+    async def vector_index_status(self) -> Optional[dict]:
+        """State, population and options of the vector index; None if absent"""
+        records = _records(
+            await self.driver.execute_query(
+                VECTOR_INDEX_SHOW, name=self.vector_index.name
+            )
+        )
+        return dict(records[0]) if records else None
+
+    async def find_similar_entities(
+        self,
+        query: Union[str, Sequence[float]],
+        k: int = 10,
+        filters: Optional[Mapping[str, Any]] = None,
+    ) -> List[Tuple[EntityNode, float]]:
+        """Nearest entities to a vector, or to a text embedded first.
+
+        ``filters`` are property equalities (e.g. ``{"group_id": "docs"}``)
+        applied to the index hits. Returns ``(node, score)`` pairs, best first.
+        """
+        return (await self.find_similar_entities_batch([query], k, filters))[0]
+
+    async def find_similar_entities_batch(
+        self,
+        queries: Sequence[Union[str, Sequence[float]]],
+        k: int = 10,
+        filters: Optional[Mapping[str, Any]] = None,
+    ) -> List[List[Tuple[EntityNode, float]]]:
+        """find_similar_entities for many queries, ``batch_size`` per statement.
+
+        Text queries are embedded together in batches; results are in query
+        order.
+        """
+        texts = [query for query in queries if isinstance(query, str)]
+        embedded = iter(await self.generate_embeddings(texts) if texts else [])
+        vectors = [
+            next(embedded) if isinstance(query, str) else [float(x) for x in query]
+            for query in queries
+        ]
+        config = self.vector_index
+        for vector in vectors:
+            if len(vector) != config.dimensions:
+                raise ValueError(
+                    f"Query vector has {len(vector)} dimensions, index "
+                    f"{config.name} expects {config.dimensions}"
+                )
+        results: List[List[Tuple[EntityNode, float]]] = [[] for _ in vectors]
+        for start in range(0, len(vectors), self.batch_size):
+            records = _records(
+                await self.driver.execute_query(
+                    ENTITY_SIMILAR_SEARCH,
+                    index=config.name,
+                    vectors=vectors[start : start + self.batch_size],
+                    candidates=k * config.oversample,
+                    k=k,
+                    filters=dict(filters) if filters else {},
+                )
+            )
+            for record in records:
+                node = self._entity_from_record(record)
+                self._cache_put(node)
+                results[start + record["i"]].append((node, record["score"]))
+        for matches in results:
+            matches.sort(key=lambda match: match[1], reverse=True)
+        return results
+
+    async def update_entity_node(
+        self, uuid: str, expected_version: Optional[int] = None, **changes
+    ) -> Optional[EntityNode]:
+        """Set the given properties in one round trip and return the new state.
+
+        With ``expected_version`` the update is a compare-and-set on the node's
+        ``version`` (found in ``node.attributes``) and raises
+        VersionConflictError if another writer got there first. Returns None
+        when the node does not exist.
+        """
+        records = _records(
+            await self.driver.execute_query(
+                ENTITY_NODE_UPDATE,
+                uuid=uuid,
+                props=_update_properties(changes),
+                expected_version=expected_version,
+            )
+        )
+        if not records:
+            self._cache_invalidate([uuid])
+            return None
+        record = records[0]
+        if record["version"] == record["previous_version"]:
+            self._cache_invalidate([uuid])
+            raise VersionConflictError(uuid, expected_version, record["version"])
+        node = self._entity_from_record(record)
+        self._cache_put(node)
+        return node
+
+    async def delete_entity_node(self, uuid: str) -> bool:
+        """Delete one entity in a single statement.
+
+        For nodes with very many relationships use ``delete_nodes_bulk``,
+        which detaches them in bounded batches. Returns whether a node was
+        deleted.
+        """
+        records = _records(
+            await self.driver.execute_query(ENTITY_NODE_DELETE, uuid=uuid)
+        )
+        self._cache_invalidate([uuid])
+        return bool(records) and records[0]["deleted"] > 0
+
+    def _entity_edge(self, item: Union[EntityEdge, dict]) -> EntityEdge:
+        if isinstance(item, EntityEdge):
+            return item
+        return EntityEdge(
+            **{"group_id": self.group_id, "fact": "", "created_at": utc_now(), **item}
+        )
+
+    async def create_entity_edge(
+        self,
+        source_uuid: str,
+        target_uuid: str,
+        relationship_type: str,
+        fact: str = "",
+    ) -> EntityEdge:
+        edge = self._entity_edge(
+            {
+                "source_node_uuid": source_uuid,
+                "target_node_uuid": target_uuid,
+                "name": relationship_type,
+                "fact": fact,
+            }
+        )
+        records = _records(
+            await self.driver.execute_query(
+                ENTITY_EDGE_SAVE,
+                source_uuid=source_uuid,
+                target_uuid=target_uuid,
+                edge=entity_edge_properties(edge),
+            )
+        )
+        missing = _missing_endpoints(records[0], source_uuid, target_uuid)
+        if missing:
+            raise ValueError(f"Cannot create edge, missing {', '.join(missing)}")
+        return edge
+
+    async def create_episodic_node(
+        self, name: str, timestamp: datetime, content: str
+    ) -> EpisodicNode:
+        node = self._episodic_node(
+            {"name": name, "content": content, "valid_at": timestamp}
+        )
+        try:
+            await self.driver.execute_query(
+                EPISODIC_NODE_SAVE, node=episodic_properties(node)
+            )
+        except Exception as e:
+            raise RuntimeError(f"Failed to create episodic node: {e}") from e
+        return node
+
+    async def create_episodic_edge(
+        self,
+        source_uuid: str,
+        target_uuid: str,
+        relationship_type: str = "MENTIONS",
+        timestamp: Optional[datetime] = None,
+    ) -> EpisodicEdge:
+        edge = EpisodicEdge(
+            source_node_uuid=source_uuid,
+            target_node_uuid=target_uuid,
+            group_id=self.group_id,
+            created_at=timestamp or utc_now(),
+        )
+        query = EPISODIC_EDGE_SAVE.format(
+            relationship_type=_relationship_type(relationship_type)
+        )
+        records = _records(
+            await self.driver.execute_query(
+                query,
+                source_uuid=source_uuid,
+                target_uuid=target_uuid,
+                edge={
+                    "uuid": edge.uuid,
+                    "group_id": edge.group_id,
+                    "created_at": edge.created_at,
+                },
+            )
+        )
+        missing = _missing_endpoints(
+            records[0], source_uuid, target_uuid, labels=("Episodic", "Entity")
+        )
+        if missing:
+            raise ValueError(f"Cannot create edge, missing {', '.join(missing)}")
+        return edge
+
+    async def _run_batch(self, tx: Any, writer: _Writer, batch: list) -> list:
+        """Send one UNWIND batch on ``tx``; returns the failed items"""
+        response = await tx.run(
+            writer.query, rows=[writer.to_row(item) for item in batch]
+        )
+        rows = await response.data()
+        return writer.failures(batch, rows) if writer.failures else []
+
+    async def _write_batches(
+        self, writer: _Writer, items: list, batch_size: Optional[int]
+    ) -> BulkResult:
+        """Write ``items`` in UNWIND batches, one transaction each.
+
+        Batches committed before an error stay committed; the raised error
+        reports how many items were written.
+        """
+        batch_size = batch_size if batch_size else self.batch_size
+        result = BulkResult()
+        start = time.perf_counter()
+        for i in range(0, len(items), batch_size):
+            batch = items[i : i + batch_size]
+            try:
+                async with self.transaction() as tx:
+                    failed = await self._run_batch(tx, writer, batch)
+            except Exception as e:
+                raise RuntimeError(
+                    f"Failed to write {writer.kind} after {result.count} of "
+                    f"{len(items)}: {e}"
+                ) from e
+            skipped = {id(item) for item, _ in failed}
+            result.items.extend(item for item in batch if id(item) not in skipped)
+            result.failed.extend(failed)
+            result.batches += 1
+        result.elapsed = time.perf_counter() - start
+        logger.info(
+            "Wrote %d %s in %d batches (%.0f/s), %d failed",
+            result.count,
+            writer.kind,
+            result.batches,
+            result.per_second,
+            len(result.failed),
+        )
+        return result
+
+    async def create_entity_nodes_bulk(
+        self,
+        nodes: Iterable[Union[EntityNode, dict]],
+        batch_size: Optional[int] = None,
+        embed: bool = False,
+    ) -> BulkResult:
+        """Create many entity nodes; dicts are EntityNode fields (name, summary, ...).
+
+        With ``embed``, names of nodes without a ``name_embedding`` are embedded
+        in batches up front and the vectors are written with the nodes.
+        """
+        items = [self._entity_node(node) for node in nodes]
+        if embed:
+            pending = [node for node in items if node.name_embedding is None]
+            vectors = await self.generate_embeddings([node.name for node in pending])
+            for node, vector in zip(pending, vectors):
+                node.name_embedding = vector
+        self._cache_invalidate(node.uuid for node in items)
+        return await self._write_batches(ENTITY_NODE_WRITER, items, batch_size)
+
+    async def create_episodic_nodes_bulk(
+        self,
+        nodes: Iterable[Union[EpisodicNode, dict]],
+        batch_size: Optional[int] = None,
+    ) -> BulkResult:
+        """Create many episodic nodes; dicts are EpisodicNode fields"""
+        items = [self._episodic_node(node) for node in nodes]
+        return await self._write_batches(EPISODIC_NODE_WRITER, items, batch_size)
+
+    async def create_entity_edges_bulk(
+        self,
+        edges: Iterable[Union[EntityEdge, dict]],
+        batch_size: Optional[int] = None,
+    ) -> BulkResult:
+        """Create many RELATES_TO edges in UNWIND batches.
+
+        Dicts are EntityEdge fields (source_node_uuid, target_node_uuid, name,
+        fact, ...). Edges whose endpoints do not exist are skipped and listed in
+        ``BulkResult.failed`` with the missing endpoints.
+        """
+        items = [self._entity_edge(edge) for edge in edges]
+        return await self._write_batches(ENTITY_EDGE_WRITER, items, batch_size)
+
+    async def update_entity_nodes_bulk(
+        self,
+        updates: Mapping[str, dict],
+        expected_versions: Optional[Mapping[str, int]] = None,
+        batch_size: Optional[int] = None,
+    ) -> BulkResult:
+        """Apply ``{uuid: {property: value}}`` partial updates in UNWIND batches.
+
+        ``BulkResult.items`` holds the updated uuids; missing nodes and version
+        conflicts (for uuids in ``expected_versions``) are listed in ``failed``.
+        """
+        expected_versions = expected_versions if expected_versions else {}
+        items = [
+            _NodeUpdate(uuid, _update_properties(changes), expected_versions.get(uuid))
+            for uuid, changes in updates.items()
+        ]
+        self._cache_invalidate(updates)
+        result = await self._write_batches(ENTITY_UPDATE_WRITER, items, batch_size)
+        result.items = [update.uuid for update in result.items]
+        result.failed = [(update.uuid, reason) for update, reason in result.failed]
+        return result
+
+    async def _deleted(self, query: str, **params) -> int:
+        records = _records(await self.driver.execute_query(query, **params))
+        return records[0]["deleted"] if records else 0
+
+    async def _throttle(self, result: DeleteResult, config: BulkDeleteConfig):
+        if config.max_per_second:
+            ahead = (
+                result.nodes + result.relationships
+            ) / config.max_per_second - result.elapsed
+            if ahead > 0:
+                await asyncio.sleep(ahead)
+
+    async def _delete_batch(
+        self,
+        uuids: List[str],
+        label: str,
+        config: BulkDeleteConfig,
+        result: DeleteResult,
+        start: float,
+    ):
+        self._cache_invalidate(uuids)
+        while True:
+            deleted = await self._deleted(
+                NODES_RELATIONSHIPS_DELETE.format(label=label),
+                uuids=uuids,
+                limit=config.relationship_batch_size,
+            )
+            result.relationships += deleted
+            result.statements += 1
+            result.elapsed = time.perf_counter() - start
+            await self._throttle(result, config)
+            if deleted < config.relationship_batch_size:
+                break
+        result.nodes += await self._deleted(
+            NODES_DELETE.format(label=label), uuids=uuids
+        )
+        result.statements += 1
+        result.batches += 1
+        result.elapsed = time.perf_counter() - start
+        await self._throttle(result, config)
+        result.elapsed = time.perf_counter() - start
+
+    def _report(
+        self, result: DeleteResult, progress: Optional[Callable[[DeleteResult], Any]]
+    ):
+        logger.info(
+            "Deleted %d nodes and %d relationships in %d batches (%.0f nodes/s)",
+            result.nodes,
+            result.relationships,
+            result.batches,
+            result.per_second,
+        )
+        if progress is not None:
+            progress(result)
+
+    async def delete_nodes_bulk(
+        self,
+        uuids: Iterable[str],
+        label: Optional[str] = "Entity",
+        config: Optional[BulkDeleteConfig] = None,
+        progress: Optional[Callable[[DeleteResult], Any]] = None,
+    ) -> DeleteResult:
+        """Delete nodes by uuid in bounded batches, detaching them first.
 
-async def get_entity_by_uuid(entity_uuid: str):
-    return await EntityNode.get_by_uuid(neo4j_driver, entity_uuid)
+        ``progress`` is called with the running DeleteResult after each batch.
+        Batches already deleted stay deleted if a later one fails.
+        """
+        config = config if config else BulkDeleteConfig()
+        label = f":{_identifier(label, 'label')}" if label else ""
+        uuids = list(dict.fromkeys(uuids))
+        result = DeleteResult()
+        start = time.perf_counter()
+        for i in range(0, len(uuids), config.batch_size):
+            batch = uuids[i : i + config.batch_size]
+            await self._delete_batch(batch, label, config, result, start)
+            self._report(result, progress)
+        return result
 
+    async def delete_nodes_matching(
+        self,
+        label: Optional[str] = None,
+        group_id: Optional[str] = None,
+        config: Optional[BulkDeleteConfig] = None,
+        progress: Optional[Callable[[DeleteResult], Any]] = None,
+    ) -> DeleteResult:
+        """Delete every node with ``label`` and/or in ``group_id``, in batches.
 
-async def delete_entity(entity: EntityNode):
-    await entity.delete(neo4j_driver)
+        Purging a group across labels (``label=None``) cannot use a label
+        index, so each batch scans; prefer one call per label on big graphs.
+        """
+        if label is None and group_id is None:
+            raise ValueError("Give a label or a group_id to delete by")
+        config = config if config else BulkDeleteConfig()
+        label = f":{_identifier(label, 'label')}" if label else ""
+        result = DeleteResult()
+        start = time.perf_counter()
+        while True:
+            records = _records(
+                await self.driver.execute_query(
+                    NODES_MATCHING.format(label=label),
+                    group_id=group_id,
+                    limit=config.batch_size,
+                )
+            )
+            result.statements += 1
+            if not records:
+                break
+            batch = [record["uuid"] for record in records]
+            deleted = result.nodes
+            await self._delete_batch(batch, label, config, result, start)
+            self._report(result, progress)
+            if len(batch) < config.batch_size or result.nodes == deleted:
+                break
+        result.elapsed = time.perf_counter() - start
+        return result
 
 
 async def main():
-    logger.info("Creating entity...")
-    new_entity = await create_entity("ChatGPT", "An AI language model by OpenAI.")
+    logging.basicConfig(level=logging.INFO)
+    crud = GraphitiCRUD()
+    try:
+        logger.info("Creating entity...")
+        new_entity = await crud.create_entity_node(
+            "ChatGPT", "An AI language model by OpenAI."
+        )
 
-    logger.info("Retrieving entity...")
-    fetched_entity = await get_entity_by_uuid(new_entity.uuid)
-    print("Fetched entity:", fetched_entity)
+        logger.info("Retrieving entity...")
+        fetched_entity = await crud.get_entity_node(new_entity.uuid)
+        print("Fetched entity:", fetched_entity)
 
-    logger.info("Deleting entity...")
-    await delete_entity(fetched_entity)
+        logger.info("Deleting entity...")
+        await crud.delete_entity_node(fetched_entity.uuid)
+        print("Pool:", drivers.stats())
+    finally:
+        await crud.close()
 
 
 if __name__ == "__main__":
@@ -0,0 +1,284 @@
+import os
+import time
+import asyncio
+import logging
+import threading
+from collections import deque
+from contextlib import contextmanager
+from dataclasses import dataclass
+from typing import Awaitable, Callable, Iterator, List, Optional, Sequence, TypeVar
+from urllib.parse import urlsplit, urlunsplit
+
+import httpx
+import requests
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+
+@dataclass
+class PoolConfig:
+    # Cheap Ollama endpoint used for active health checks
+    health_path: str = "/api/version"
+    health_interval: float = 10.0
+    health_timeout: float = 2.0
+    # Consecutive failures before a node is ejected, and for how long
+    failure_threshold: int = 3
+    eject_seconds: float = 30.0
+    # Send a duplicate to a second node once a call outlives this latency
+    # percentile (e.g. 0.95); None disables hedging
+    hedge_percentile: Optional[float] = None
+    hedge_min_samples: int = 20
+    latency_window: int = 500
+
+
+def is_endpoint_failure(error: BaseException) -> bool:
+    """Whether a failed call points at the node itself rather than the request"""
+    if isinstance(
+        error, (httpx.TransportError, requests.ConnectionError, requests.Timeout)
+    ):
+        return True
+    if isinstance(error, httpx.HTTPStatusError):
+        return error.response.status_code >= 500
+    if isinstance(error, requests.HTTPError) and error.response is not None:
+        return error.response.status_code >= 500
+    return False
+
+
+class Endpoint:
+    """One Ollama server and its routing state"""
+
+    def __init__(self, url: str):
+        self.url = url.rstrip("/")
+        self.outstanding = 0
+        self.requests = 0
+        self.failures = 0
+        self.consecutive_failures = 0
+        self.ejections = 0
+        self.ejected_until = 0.0
+
+    @property
+    def available(self) -> bool:
+        return time.monotonic() >= self.ejected_until
+
+    def resolve(self, url: str) -> str:
+        """Point a configured Ollama URL (e.g. .../api/chat) at this server"""
+        base, parts = urlsplit(self.url), urlsplit(url)
+        return urlunsplit(
+            (base.scheme, base.netloc, parts.path, parts.query, parts.fragment)
+        )
+
+    def stats(self) -> dict:
+        return {
+            "outstanding": self.outstanding,
+            "requests": self.requests,
+            "failures": self.failures,
+            "ejections": self.ejections,
+            "available": self.available,
+        }
+
+
+class EndpointPool:
+    """Spreads LLM calls over several Ollama servers.
+
+    Each call goes to the available node with the fewest outstanding requests.
+    Nodes failing ``failure_threshold`` times in a row, or failing an active
+    health check, are ejected for ``eject_seconds`` and re-admitted when the
+    time passes or a health check succeeds. Async calls can be hedged to a
+    second node once they outlive a latency percentile.
+    """
+
+    def __init__(self, urls: Sequence[str], config: Optional[PoolConfig] = None):
+        if not urls:
+            raise ValueError("EndpointPool needs at least one URL")
+        self.config = config if config else PoolConfig()
+        self.endpoints: List[Endpoint] = [Endpoint(url) for url in urls]
+        self.latencies: deque = deque(maxlen=self.config.latency_window)
+        self.hedges = 0
+        self.hedge_wins = 0
+        self._next = 0
+        self._lock = threading.RLock()
+        self._health_task: Optional[asyncio.Task] = None
+
+    @classmethod
+    def from_env(
+        cls,
+        var: str = "OLLAMA_URLS",
+        default: str = "http://localhost:11434",
+        config: Optional[PoolConfig] = None,
+    ) -> "EndpointPool":
+        """Build a pool from a comma-separated list of server URLs"""
+        urls = [u.strip() for u in os.getenv(var, default).split(",") if u.strip()]
+        return cls(urls, config)
+
+    def choose(self, exclude: Sequence[Endpoint] = ()) -> Optional[Endpoint]:
+        """Least-outstanding available node; None only if all are excluded"""
+        with self._lock:
+            candidates = [e for e in self.endpoints if e not in exclude]
+            if not candidates:
+                return None
+            # Rotate the start so ties are spread round-robin
+            self._next = (self._next + 1) % len(candidates)
+            candidates = candidates[self._next :] + candidates[: self._next]
+            available = [e for e in candidates if e.available]
+            if not available:
+                # Fail open to the node that is due back first
+                logger.warning("All LLM endpoints are ejected; using the next due")
+                return min(candidates, key=lambda e: e.ejected_until)
+            return min(available, key=lambda e: e.outstanding)
+
+    def _eject(self, endpoint: Endpoint, reason: str):
+        endpoint.ejected_until = time.monotonic() + self.config.eject_seconds
+        endpoint.ejections += 1
+        logger.warning("Ejecting LLM endpoint %s: %s", endpoint.url, reason)
+
+    def _admit(self, endpoint: Endpoint):
+        if endpoint.ejected_until:
+            logger.info("Re-admitting LLM endpoint %s", endpoint.url)
+        endpoint.ejected_until = 0.0
+        endpoint.consecutive_failures = 0
+
+    def _release(
+        self, endpoint: Endpoint, latency: float, error: Optional[BaseException]
+    ):
+        with self._lock:
+            endpoint.outstanding -= 1
+            if error is None:
+                endpoint.consecutive_failures = 0
+                self.latencies.append(latency)
+            elif is_endpoint_failure(error):
+                endpoint.failures += 1
+                endpoint.consecutive_failures += 1
+                if endpoint.consecutive_failures >= self.config.failure_threshold:
+                    self._eject(endpoint, repr(error))
+
+    @contextmanager
+    def lease(self, endpoint: Optional[Endpoint] = None) -> Iterator[Endpoint]:
+        """Route one call: yields the chosen node and records the outcome"""
+        with self._lock:
+            # Choose and count under one lock so concurrent callers spread out
+            endpoint = endpoint if endpoint else self.choose()
+            endpoint.outstanding += 1
+            endpoint.requests += 1
+        start = time.perf_counter()
+        try:
+            yield endpoint
+        except BaseException as e:
+            self._release(endpoint, time.perf_counter() - start, e)
+            raise
+        self._release(endpoint, time.perf_counter() - start, None)
+
+    def hedge_delay(self) -> Optional[float]:
+        if self.config.hedge_percentile is None or len(self.endpoints) < 2:
+            return None
+        if len(self.latencies) < self.config.hedge_min_samples:
+            return None
+        ordered = sorted(self.latencies)
+        return ordered[int(self.config.hedge_percentile * (len(ordered) - 1))]
+
+    async def _attempt(
+        self, endpoint: Endpoint, call: Callable[[Endpoint], Awaitable[T]]
+    ) -> T:
+        with self.lease(endpoint):
+            return await call(endpoint)
+
+    async def arequest(self, call: Callable[[Endpoint], Awaitable[T]]) -> T:
+        """Run ``call`` on a routed node, hedging to a second one if it is slow"""
+        first = self.choose()
+        primary = asyncio.ensure_future(self._attempt(first, call))
+        tasks = [primary]
+        try:
+            delay = self.hedge_delay()
+            if delay is not None:
+                done, _ = await asyncio.wait(tasks, timeout=delay)
+                second = None if done else self.choose(exclude=[first])
+                if second is not None:
+                    self.hedges += 1
+                    tasks.append(asyncio.ensure_future(self._attempt(second, call)))
+
+            pending, error = set(tasks), None
+            while pending:
+                done, pending = await asyncio.wait(
+                    pending, return_when=asyncio.FIRST_COMPLETED
+                )
+                for task in done:
+                    if task.exception() is None:
+                        self.hedge_wins += task is not primary
+                        return task.result()
+                    error = task.exception()
+            raise error
+        finally:
+            # The losing (or abandoned) attempt is cancelled, closing its request
+            for task in tasks:
+                if not task.done():
+                    task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+
+    def _record_health(self, endpoint: Endpoint, ok: bool, reason: str = ""):
+        with self._lock:
+            if ok:
+                self._admit(endpoint)
+            elif endpoint.available:
+                self._eject(endpoint, f"health check failed: {reason}")
+
+    async def _probe(self, client: httpx.AsyncClient, endpoint: Endpoint):
+        try:
+            response = await client.get(endpoint.url + self.config.health_path)
+            response.raise_for_status()
+        except httpx.HTTPError as e:
+            self._record_health(endpoint, False, repr(e))
+        else:
+            self._record_health(endpoint, True)
+
+    async def acheck_health(self, client: Optional[httpx.AsyncClient] = None):
+        """Probe every node once, ejecting failures and re-admitting recoveries"""
+        owned = client is None
+        if owned:
+            client = httpx.AsyncClient(timeout=self.config.health_timeout)
+        try:
+            await asyncio.gather(*(self._probe(client, e) for e in self.endpoints))
+        finally:
+            if owned:
+                await client.aclose()
+
+    def check_health(self, session: Optional[requests.Session] = None):
+        """Blocking variant of acheck_health"""
+        session = session if session else requests
+        for endpoint in self.endpoints:
+            try:
+                response = session.get(
+                    endpoint.url + self.config.health_path,
+                    timeout=self.config.health_timeout,
+                )
+                response.raise_for_status()
+            except requests.RequestException as e:
+                self._record_health(endpoint, False, repr(e))
+            else:
+                self._record_health(endpoint, True)
+
+    async def _health_loop(self):
+        async with httpx.AsyncClient(timeout=self.config.health_timeout) as client:
+            while True:
+                await self.acheck_health(client)
+                await asyncio.sleep(self.config.health_interval)
+
+    def start_health_checks(self) -> asyncio.Task:
+        """Run active health checks every ``health_interval`` in the background"""
+        if self._health_task is None or self._health_task.done():
+            self._health_task = asyncio.ensure_future(self._health_loop())
+        return self._health_task
+
+    async def aclose(self):
+        if self._health_task is not None:
+            self._health_task.cancel()
+            await asyncio.gather(self._health_task, return_exceptions=True)
+            self._health_task = None
+
+    def stats(self) -> dict:
+        return {
+            "endpoints": {e.url: e.stats() for e in self.endpoints},
+            "hedges": self.hedges,
+            "hedge_wins": self.hedge_wins,
+            "hedge_delay": self.hedge_delay(),
+        }
@@ -0,0 +1,110 @@
+import time
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Callable, Dict, Iterable, Optional, Tuple
+
+from graphiti_core.nodes import EntityNode
+
+
+@dataclass
+class EntityCacheConfig:
+    max_entries: int = 10000
+    # Bounds staleness from writers that bypass this process; None keeps
+    # entries until they are evicted or invalidated
+    ttl_seconds: Optional[float] = 300.0
+
+
+class EntityCache:
+    """In-memory read-through cache of entity nodes keyed by uuid.
+
+    Entries expire after ``ttl_seconds`` and the least recently used ones are
+    evicted once the cache holds more than ``max_entries``.
+    """
+
+    def __init__(
+        self,
+        config: Optional[EntityCacheConfig] = None,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.config = config if config else EntityCacheConfig()
+        self._clock = clock
+        self._entries: "OrderedDict[str, Tuple[float, EntityNode]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.expirations = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    def _lookup(self, uuid: str, now: float) -> Optional[EntityNode]:
+        entry = self._entries.get(uuid)
+        if entry is None:
+            return None
+        stored_at, node = entry
+        if self.config.ttl_seconds is not None and (
+            now - stored_at > self.config.ttl_seconds
+        ):
+            del self._entries[uuid]
+            self.expirations += 1
+            return None
+        self._entries.move_to_end(uuid)
+        # Callers get their own copy, so editing a fetched node never changes
+        # what later reads see without a write to the database
+        return node.model_copy(deep=True)
+
+    def get(self, uuid: str) -> Optional[EntityNode]:
+        with self._lock:
+            node = self._lookup(uuid, self._clock())
+            if node is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+            return node
+
+    def get_many(self, uuids: Iterable[str]) -> Dict[str, EntityNode]:
+        """Cached nodes among ``uuids``; the rest count as misses"""
+        found = {}
+        with self._lock:
+            now = self._clock()
+            for uuid in uuids:
+                node = self._lookup(uuid, now)
+                if node is None:
+                    self.misses += 1
+                else:
+                    self.hits += 1
+                    found[uuid] = node
+        return found
+
+    def put(self, node: EntityNode):
+        with self._lock:
+            self._entries[node.uuid] = (self._clock(), node.model_copy(deep=True))
+            self._entries.move_to_end(node.uuid)
+            while len(self._entries) > self.config.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def invalidate(self, uuids: Iterable[str]):
+        with self._lock:
+            for uuid in uuids:
+                if self._entries.pop(uuid, None) is not None:
+                    self.invalidations += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "expirations": self.expirations,
+            "evictions": self.evictions,
+            "invalidations": self.invalidations,
+            "entries": len(self),
+        }
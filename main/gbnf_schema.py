@@ -0,0 +1,158 @@
+import re
+import json
+import typing
+from functools import lru_cache
+
+from pydantic import BaseModel, TypeAdapter
+
+# Generic JSON rules, following main/json.gbnf: every value consumes its
+# trailing whitespace
+PRIMITIVE_RULES = {
+    "value": "object | array | string | number | boolean | null",
+    "object": (
+        '"{" ws ( string ":" ws value ( "," ws string ":" ws value )* )? "}" ws'
+    ),
+    "array": '"[" ws ( value ( "," ws value )* )? "]" ws',
+    "string": (
+        '"\\"" ( [^"\\\\\\x7F\\x00-\\x1F] | '
+        '"\\\\" (["\\\\/bfnrt] | "u" [0-9a-fA-F]{4}) )* "\\"" ws'
+    ),
+    "number": (
+        '("-"? ([0-9] | [1-9] [0-9]{0,15})) ("." [0-9]+)? '
+        "([eE] [-+]? [0-9]{1,15})? ws"
+    ),
+    "integer": '("-"? ([0-9] | [1-9] [0-9]{0,15})) ws',
+    "boolean": '("true" | "false") ws',
+    "null": '"null" ws',
+    "ws": '| " " | "\\n" [ \\t]{0,20}',
+}
+
+_TYPE_RULES = {
+    "string": "string",
+    "number": "number",
+    "integer": "integer",
+    "boolean": "boolean",
+    "null": "null",
+}
+
+
+def gbnf_literal(value: typing.Any) -> str:
+    """GBNF literal matching the JSON encoding of a value"""
+    text = json.dumps(value)
+    return '"' + text.replace("\\", "\\\\").replace('"', '\\"') + '"'
+
+
+class GrammarBuilder:
+    """Converts a JSON schema into a GBNF grammar.
+
+    Supports objects (keys in schema order), arrays, enums, consts, unions and
+    ``$ref`` definitions. Every declared property is emitted, so optional
+    fields are always present in the output rather than omitted.
+    """
+
+    def __init__(self, schema: dict):
+        self.schema = schema
+        self.defs = schema.get("$defs", schema.get("definitions", {}))
+        self.rules: typing.Dict[str, str] = {}
+        self._refs: typing.Dict[str, str] = {}
+
+    def _rule_name(self, name: str) -> str:
+        base = re.sub(r"[^a-zA-Z0-9-]+", "-", name).strip("-") or "rule"
+        if base in PRIMITIVE_RULES:
+            base = f"{base}-def"
+        candidate, i = base, 1
+        while candidate in self.rules:
+            i += 1
+            candidate = f"{base}-{i}"
+        return candidate
+
+    def _add_rule(self, name: str, body: str) -> str:
+        name = self._rule_name(name)
+        self.rules[name] = body
+        return name
+
+    def _ref(self, ref: str) -> str:
+        if ref not in self._refs:
+            key = ref.rsplit("/", 1)[-1]
+            name = self._rule_name(key)
+            # Reserve the name first so recursive models terminate
+            self._refs[ref] = name
+            self.rules[name] = ""
+            self.rules[name] = self.visit(self.defs[key], name, inline=True)
+        return self._refs[ref]
+
+    def _object(self, schema: dict, name: str) -> str:
+        properties = schema.get("properties")
+        if not properties:
+            return "object"
+        members = [
+            f"{gbnf_literal(key)} ws \":\" ws {self.visit(value, f'{name}-{key}')}"
+            for key, value in properties.items()
+        ]
+        return '"{" ws ' + ' "," ws '.join(members) + ' "}" ws'
+
+    def _array(self, schema: dict, name: str) -> str:
+        item = self.visit(schema.get("items", {}), f"{name}-item")
+        repeated = f'{item} ( "," ws {item} )*'
+        if schema.get("minItems", 0) < 1:
+            repeated = f"( {repeated} )?"
+        return f'"[" ws {repeated} "]" ws'
+
+    def visit(self, schema: dict, name: str, inline: bool = False) -> str:
+        """Return a rule expression for the schema, adding named rules as needed"""
+        if "$ref" in schema:
+            return self._ref(schema["$ref"])
+        if "const" in schema:
+            return f"{gbnf_literal(schema['const'])} ws"
+        if "enum" in schema:
+            return "(" + " | ".join(gbnf_literal(v) for v in schema["enum"]) + ") ws"
+        for key in ("anyOf", "oneOf", "allOf"):
+            if key in schema:
+                options = [
+                    self.visit(sub, f"{name}-{i}") for i, sub in enumerate(schema[key])
+                ]
+                if key == "allOf" and len(options) > 1:
+                    # Intersections are not expressible; accept any value
+                    return "value"
+                return options[0] if len(options) == 1 else f"( {' | '.join(options)} )"
+
+        schema_type = schema.get("type")
+        if isinstance(schema_type, list):
+            return self.visit(
+                {"anyOf": [{**schema, "type": t} for t in schema_type]}, name
+            )
+        if schema_type in _TYPE_RULES:
+            return _TYPE_RULES[schema_type]
+        if schema_type == "object" or "properties" in schema:
+            body = self._object(schema, name)
+        elif schema_type == "array":
+            body = self._array(schema, name)
+        else:
+            return "value"
+        if inline or body == "object":
+            return body
+        return self._add_rule(name, body)
+
+    def build(self) -> str:
+        root = self.visit(self.schema, "root", inline=True)
+        lines = [f"root ::= {root}"]
+        lines += [f"{name} ::= {body}" for name, body in self.rules.items()]
+        lines += [f"{name} ::= {body}" for name, body in PRIMITIVE_RULES.items()]
+        return "\n".join(lines) + "\n"
+
+
+def schema_to_gbnf(schema: dict) -> str:
+    """Build a GBNF grammar that only admits JSON matching the schema"""
+    return GrammarBuilder(schema).build()
+
+
+@lru_cache(maxsize=256)
+def grammar_for_model(model: typing.Type[BaseModel]) -> str:
+    """GBNF grammar for a pydantic model, built once per class"""
+    return schema_to_gbnf(model.model_json_schema())
+
+
+@lru_cache(maxsize=256)
+def type_adapter(model: typing.Type[typing.Any]) -> TypeAdapter:
+    """Validation adapter for a response model, built once per class"""
+    return TypeAdapter(model)
@@ -0,0 +1,464 @@
+import json
+import time
+import asyncio
+import logging
+import argparse
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple, Union
+
+import pyarrow as pa
+import pyarrow.parquet as pq
+from graphiti_core.helpers import parse_db_date
+
+from main.crud_graphiti import (
+    ENTITY_EDGES_BULK_SAVE,
+    ENTITY_NODES_BULK_SAVE,
+    EPISODIC_NODES_BULK_SAVE,
+    GraphitiCRUD,
+    _identifier,
+    _missing_endpoints,
+    _records,
+    _Writer,
+)
+from main.neo4j_pool import drivers
+
+logger = logging.getLogger(__name__)
+
+# Keyset pagination on uuid: every page is one query whose cost does not
+# grow with the offset, and memory is bounded by the page size
+ENTITY_NODES_PAGE = """
+MATCH (n:Entity)
+WHERE n.uuid > $after AND ($group_ids IS NULL OR n.group_id IN $group_ids)
+RETURN properties(n) AS props, labels(n) AS labels
+ORDER BY n.uuid
+LIMIT $limit
+"""
+
+EPISODIC_NODES_PAGE = """
+MATCH (n:Episodic)
+WHERE n.uuid > $after AND ($group_ids IS NULL OR n.group_id IN $group_ids)
+RETURN properties(n) AS props
+ORDER BY n.uuid
+LIMIT $limit
+"""
+
+ENTITY_EDGES_PAGE = """
+MATCH (source:Entity)-[e:RELATES_TO]->(target:Entity)
+WHERE e.uuid > $after AND ($group_ids IS NULL OR e.group_id IN $group_ids)
+RETURN properties(e) AS props, source.uuid AS source_node_uuid,
+       target.uuid AS target_node_uuid
+ORDER BY e.uuid
+LIMIT $limit
+"""
+
+EPISODIC_EDGES_PAGE = """
+MATCH (source:Episodic)-[e:MENTIONS]->(target:Entity)
+WHERE e.uuid > $after AND ($group_ids IS NULL OR e.group_id IN $group_ids)
+RETURN properties(e) AS props, source.uuid AS source_node_uuid,
+       target.uuid AS target_node_uuid
+ORDER BY e.uuid
+LIMIT $limit
+"""
+
+ENTITY_EMBEDDING_SIZE = """
+MATCH (n:Entity)
+WHERE n.name_embedding IS NOT NULL
+  AND ($group_ids IS NULL OR n.group_id IN $group_ids)
+RETURN size(n.name_embedding) AS dimensions
+LIMIT 1
+"""
+
+EDGE_EMBEDDING_SIZE = """
+MATCH ()-[e:RELATES_TO]->()
+WHERE e.fact_embedding IS NOT NULL
+  AND ($group_ids IS NULL OR e.group_id IN $group_ids)
+RETURN size(e.fact_embedding) AS dimensions
+LIMIT 1
+"""
+
+# Entity nodes carrying extra labels (graphiti custom entity types); labels
+# cannot be parameters, so rows are grouped by label set
+ENTITY_NODES_LABELED_SAVE = """
+UNWIND $rows AS node
+MERGE (n:Entity {{uuid: node.uuid}})
+SET n += node
+SET n:{labels}
+RETURN n.uuid AS uuid
+"""
+
+EPISODIC_EDGES_BULK_SAVE = """
+UNWIND $rows AS row
+OPTIONAL MATCH (source:Episodic {uuid: row.source_uuid})
+OPTIONAL MATCH (target:Entity {uuid: row.target_uuid})
+FOREACH (_ IN CASE WHEN source IS NOT NULL AND target IS NOT NULL THEN [1] ELSE [] END |
+    MERGE (source)-[e:MENTIONS {uuid: row.edge.uuid}]->(target)
+    SET e += row.edge)
+RETURN row.edge.uuid AS uuid, source IS NOT NULL AS source_found,
+       target IS NOT NULL AS target_found
+"""
+
+TIMESTAMP = pa.timestamp("us", tz="UTC")
+
+# Columns that are not node or edge properties on import
+_STRUCTURAL = ("attributes", "labels", "source_node_uuid", "target_node_uuid")
+
+
+@dataclass(frozen=True)
+class _Table:
+    name: str
+    page_query: str
+    columns: Tuple[Tuple[str, pa.DataType], ...]
+    embedding: Optional[str] = None
+    embedding_size_query: Optional[str] = None
+    label: Optional[str] = None
+
+    def schema(self, dimensions: Optional[int]) -> pa.Schema:
+        fields = [pa.field(name, type_) for name, type_ in self.columns]
+        if self.embedding:
+            fields.append(pa.field(self.embedding, pa.list_(pa.float32(), dimensions)))
+        return pa.schema(fields)
+
+
+ENTITY_NODES = _Table(
+    "entity_nodes",
+    ENTITY_NODES_PAGE,
+    (
+        ("uuid", pa.string()),
+        ("name", pa.string()),
+        ("group_id", pa.string()),
+        ("summary", pa.string()),
+        ("created_at", TIMESTAMP),
+        ("labels", pa.list_(pa.string())),
+        ("attributes", pa.string()),
+    ),
+    embedding="name_embedding",
+    embedding_size_query=ENTITY_EMBEDDING_SIZE,
+    label="Entity",
+)
+
+EPISODIC_NODES = _Table(
+    "episodic_nodes",
+    EPISODIC_NODES_PAGE,
+    (
+        ("uuid", pa.string()),
+        ("name", pa.string()),
+        ("group_id", pa.string()),
+        ("source", pa.string()),
+        ("source_description", pa.string()),
+        ("content", pa.string()),
+        ("entity_edges", pa.list_(pa.string())),
+        ("created_at", TIMESTAMP),
+        ("valid_at", TIMESTAMP),
+        ("attributes", pa.string()),
+    ),
+)
+
+ENTITY_EDGES = _Table(
+    "entity_edges",
+    ENTITY_EDGES_PAGE,
+    (
+        ("uuid", pa.string()),
+        ("source_node_uuid", pa.string()),
+        ("target_node_uuid", pa.string()),
+        ("name", pa.string()),
+        ("fact", pa.string()),
+        ("group_id", pa.string()),
+        ("episodes", pa.list_(pa.string())),
+        ("created_at", TIMESTAMP),
+        ("valid_at", TIMESTAMP),
+        ("invalid_at", TIMESTAMP),
+        ("expired_at", TIMESTAMP),
+        ("attributes", pa.string()),
+    ),
+    embedding="fact_embedding",
+    embedding_size_query=EDGE_EMBEDDING_SIZE,
+)
+
+EPISODIC_EDGES = _Table(
+    "episodic_edges",
+    EPISODIC_EDGES_PAGE,
+    (
+        ("uuid", pa.string()),
+        ("source_node_uuid", pa.string()),
+        ("target_node_uuid", pa.string()),
+        ("group_id", pa.string()),
+        ("created_at", TIMESTAMP),
+        ("attributes", pa.string()),
+    ),
+)
+
+# Nodes before edges, so imported edges find their endpoints
+TABLES = (ENTITY_NODES, EPISODIC_NODES, ENTITY_EDGES, EPISODIC_EDGES)
+
+
+@dataclass
+class TransferConfig:
+    # Rows per query on export, and per row group / write batch on import
+    page_size: int = 10000
+    # Only export these groups; None exports the whole graph
+    group_ids: Optional[List[str]] = None
+    compression: str = "zstd"
+
+
+@dataclass
+class TransferResult:
+    table: str
+    rows: int = 0
+    failed: int = 0
+    pages: int = 0
+    elapsed: float = 0.0
+
+    @property
+    def per_second(self) -> float:
+        return self.rows / self.elapsed if self.elapsed else 0.0
+
+    def as_dict(self) -> dict:
+        return {
+            "table": self.table,
+            "rows": self.rows,
+            "failed": self.failed,
+            "pages": self.pages,
+            "elapsed": self.elapsed,
+            "per_second": self.per_second,
+        }
+
+
+def _row(table: _Table, record: Any) -> dict:
+    """One Parquet row from a page record; unknown properties go to attributes"""
+    values = dict(record)
+    values.update(values.pop("props"))
+    row = {}
+    for name, type_ in table.columns:
+        if name == "attributes":
+            continue
+        value = values.pop(name, None)
+        if value is not None and type_ == TIMESTAMP:
+            value = parse_db_date(value)
+        row[name] = value
+    if table.embedding:
+        row[table.embedding] = values.pop(table.embedding, None)
+    if "labels" in row:
+        row["labels"] = [label for label in row["labels"] or [] if label != table.label]
+    # Temporal attribute values are stored as ISO strings
+    row["attributes"] = json.dumps(values, default=str) if values else None
+    return row
+
+
+def _properties(row: dict) -> dict:
+    """Node or edge properties from a Parquet row"""
+    properties = {
+        key: value
+        for key, value in row.items()
+        if value is not None and key not in _STRUCTURAL
+    }
+    if row.get("attributes"):
+        properties.update(json.loads(row["attributes"]))
+    return properties
+
+
+def _edge_row(row: dict) -> dict:
+    return {
+        "source_uuid": row["source_node_uuid"],
+        "target_uuid": row["target_node_uuid"],
+        "edge": _properties(row),
+    }
+
+
+def _failed_edge_rows(labels: Tuple[str, str]):
+    def failures(batch: list, rows: list) -> list:
+        found = {row["uuid"]: row for row in rows}
+        failed = []
+        for edge in batch:
+            missing = _missing_endpoints(
+                found[edge["uuid"]],
+                edge["source_node_uuid"],
+                edge["target_node_uuid"],
+                labels,
+            )
+            if missing:
+                failed.append((edge, f"missing {', '.join(missing)}"))
+        return failed
+
+    return failures
+
+
+ENTITY_EDGE_ROWS = _Writer(
+    "entity edges",
+    ENTITY_EDGES_BULK_SAVE,
+    _edge_row,
+    _failed_edge_rows(("Entity", "Entity")),
+)
+
+EPISODIC_EDGE_ROWS = _Writer(
+    "episodic edges",
+    EPISODIC_EDGES_BULK_SAVE,
+    _edge_row,
+    _failed_edge_rows(("Episodic", "Entity")),
+)
+
+
+class GraphTransfer:
+    """Moves a Graphiti graph between Neo4j instances through Parquet files.
+
+    ``export_graph`` pages Entity and Episodic nodes, RELATES_TO and MENTIONS
+    edges out by uuid into one Parquet file per table, one row group per
+    page, with embeddings as fixed-size float32 lists. ``import_graph``
+    streams the files back a row group at a time through batched UNWIND
+    writes. Both hold one page in memory at a time.
+    """
+
+    def __init__(self, crud: GraphitiCRUD, config: Optional[TransferConfig] = None):
+        self.crud = crud
+        self.config = config if config else TransferConfig()
+
+    async def _dimensions(self, table: _Table) -> int:
+        records = _records(
+            await self.crud.driver.execute_query(
+                table.embedding_size_query, group_ids=self.config.group_ids
+            )
+        )
+        if records:
+            return int(records[0]["dimensions"])
+        # No embeddings to export; keep the column typed for the importer
+        return self.crud.vector_index.dimensions
+
+    async def export_table(self, table: _Table, path: Path) -> TransferResult:
+        dimensions = await self._dimensions(table) if table.embedding else None
+        schema = table.schema(dimensions)
+        result = TransferResult(table.name)
+        start = time.perf_counter()
+        after = ""
+        with pq.ParquetWriter(
+            path, schema, compression=self.config.compression
+        ) as writer:
+            while True:
+                records = _records(
+                    await self.crud.driver.execute_query(
+                        table.page_query,
+                        after=after,
+                        limit=self.config.page_size,
+                        group_ids=self.config.group_ids,
+                    )
+                )
+                if not records:
+                    break
+                rows = [_row(table, record) for record in records]
+                writer.write_batch(pa.RecordBatch.from_pylist(rows, schema=schema))
+                result.rows += len(rows)
+                result.pages += 1
+                after = rows[-1]["uuid"]
+                logger.debug("Exported %d %s", result.rows, table.name)
+                if len(records) < self.config.page_size:
+                    break
+        result.elapsed = time.perf_counter() - start
+        logger.info(
+            "Exported %d %s in %d pages (%.0f/s)",
+            result.rows,
+            table.name,
+            result.pages,
+            result.per_second,
+        )
+        return result
+
+    async def export_graph(self, directory: Union[str, Path]) -> Dict[str, dict]:
+        """Write ``<table>.parquet`` files into ``directory``"""
+        directory = Path(directory)
+        directory.mkdir(parents=True, exist_ok=True)
+        results = {}
+        for table in TABLES:
+            result = await self.export_table(table, directory / f"{table.name}.parquet")
+            results[table.name] = result.as_dict()
+        return results
+
+    async def _write_entity_rows(self, rows: List[dict]):
+        by_labels: Dict[Tuple[str, ...], List[dict]] = {}
+        for row in rows:
+            labels = tuple(sorted(row.get("labels") or []))
+            by_labels.setdefault(labels, []).append(row)
+        failed = 0
+        for labels, group in by_labels.items():
+            query = ENTITY_NODES_BULK_SAVE
+            if labels:
+                query = ENTITY_NODES_LABELED_SAVE.format(
+                    labels=":".join(_identifier(label, "label") for label in labels)
+                )
+            writer = _Writer("entity nodes", query, _properties)
+            result = await self.crud._write_batches(writer, group, len(group))
+            failed += len(result.failed)
+        return failed
+
+    async def _write_rows(self, table: _Table, rows: List[dict]) -> int:
+        """Write one page of rows; returns how many were not written"""
+        if table is ENTITY_NODES:
+            self.crud._cache_invalidate(row["uuid"] for row in rows)
+            return await self._write_entity_rows(rows)
+        writer = {
+            EPISODIC_NODES.name: _Writer(
+                "episodic nodes", EPISODIC_NODES_BULK_SAVE, _properties
+            ),
+            ENTITY_EDGES.name: ENTITY_EDGE_ROWS,
+            EPISODIC_EDGES.name: EPISODIC_EDGE_ROWS,
+        }[table.name]
+        result = await self.crud._write_batches(writer, rows, len(rows))
+        for row, reason in result.failed[:5]:
+            logger.warning("Skipped %s %s: %s", table.name, row["uuid"], reason)
+        return len(result.failed)
+
+    async def import_table(self, table: _Table, path: Path) -> TransferResult:
+        result = TransferResult(table.name)
+        start = time.perf_counter()
+        parquet = pq.ParquetFile(path)
+        for batch in parquet.iter_batches(batch_size=self.config.page_size):
+            rows = batch.to_pylist()
+            result.failed += await self._write_rows(table, rows)
+            result.rows += len(rows)
+            result.pages += 1
+            logger.debug("Imported %d %s", result.rows, table.name)
+        result.elapsed = time.perf_counter() - start
+        logger.info(
+            "Imported %d %s in %d pages (%.0f/s), %d failed",
+            result.rows,
+            table.name,
+            result.pages,
+            result.per_second,
+            result.failed,
+        )
+        return result
+
+    async def import_graph(self, directory: Union[str, Path]) -> Dict[str, dict]:
+        """Load the ``<table>.parquet`` files found in ``directory``"""
+        directory = Path(directory)
+        results = {}
+        for table in TABLES:
+            path = directory / f"{table.name}.parquet"
+            if path.exists():
+                result = await self.import_table(table, path)
+                results[table.name] = result.as_dict()
+        return results
+
+
+async def main():
+    logging.basicConfig(level=logging.INFO)
+    parser = argparse.ArgumentParser()
+    parser.add_argument("direction", choices=["export", "import"])
+    parser.add_argument("directory")
+    parser.add_argument("--page-size", type=int, default=10000)
+    parser.add_argument("--group-id", action="append", dest="group_ids")
+    args = parser.parse_args()
+    transfer = GraphTransfer(
+        GraphitiCRUD(),
+        TransferConfig(page_size=args.page_size, group_ids=args.group_ids),
+    )
+    try:
+        if args.direction == "export":
+            results = await transfer.export_graph(args.directory)
+        else:
+            results = await transfer.import_graph(args.directory)
+        print(json.dumps(results, indent=2))
+    finally:
+        await drivers.close()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
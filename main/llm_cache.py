@@ -0,0 +1,154 @@
+import os
+import json
+import time
+import sqlite3
+import hashlib
+import threading
+from dataclasses import dataclass
+from typing import Optional
+
+# Request fields that determine the model output
+KEY_FIELDS = ("model", "prompt", "messages", "temperature", "grammar", "max_tokens")
+
+
+@dataclass
+class CacheConfig:
+    path: str = "./llm_cache.sqlite"
+    ttl_seconds: Optional[float] = 7 * 24 * 3600
+    max_entries: int = 10000
+    # Sampling above temperature 0 is not reproducible, so such requests
+    # bypass the cache unless this is set
+    allow_nondeterministic: bool = False
+
+
+class LLMResponseCache:
+    """Opt-in on-disk cache for LLM responses backed by SQLite.
+
+    Entries expire after ``ttl_seconds`` and the least recently used ones are
+    evicted once the cache holds more than ``max_entries``.
+    """
+
+    def __init__(self, config: Optional[CacheConfig] = None):
+        self.config = config if config else CacheConfig()
+        directory = os.path.dirname(os.path.abspath(self.config.path))
+        os.makedirs(directory, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.config.path, check_same_thread=False)
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS llm_cache (
+                key TEXT PRIMARY KEY,
+                value TEXT NOT NULL,
+                created_at REAL NOT NULL,
+                accessed_at REAL NOT NULL
+            )
+            """)
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS llm_cache_accessed ON llm_cache (accessed_at)"
+        )
+        self._conn.commit()
+        self.hits = 0
+        self.misses = 0
+        self.bypassed = 0
+
+    @staticmethod
+    def make_key(request_body: dict) -> str:
+        """Hash the output-determining fields of an LLM request body"""
+        key_data = {field: request_body.get(field) for field in KEY_FIELDS}
+        options = request_body.get("options") or {}
+        for field in ("temperature", "num_predict"):
+            if field in options:
+                key_data[field] = options[field]
+        encoded = json.dumps(key_data, sort_keys=True, ensure_ascii=False)
+        return hashlib.sha256(encoded.encode("utf-8")).hexdigest()
+
+    def is_cacheable(self, request_body: dict) -> bool:
+        temperature = request_body.get("temperature")
+        if temperature is None:
+            temperature = (request_body.get("options") or {}).get("temperature", 0)
+        return self.config.allow_nondeterministic or not temperature
+
+    def lookup(self, request_body: dict) -> Optional[str]:
+        """Return the cached response for a request, or None on miss/bypass"""
+        if not self.is_cacheable(request_body):
+            self.bypassed += 1
+            return None
+        value = self.get(self.make_key(request_body))
+        if value is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return value
+
+    def store(self, request_body: dict, value: str):
+        if self.is_cacheable(request_body):
+            self.set(self.make_key(request_body), value)
+
+    def get(self, key: str) -> Optional[str]:
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT value, created_at FROM llm_cache WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                return None
+            value, created_at = row
+            if self.config.ttl_seconds is not None and (
+                now - created_at > self.config.ttl_seconds
+            ):
+                self._conn.execute("DELETE FROM llm_cache WHERE key = ?", (key,))
+                self._conn.commit()
+                return None
+            self._conn.execute(
+                "UPDATE llm_cache SET accessed_at = ? WHERE key = ?", (now, key)
+            )
+            self._conn.commit()
+            return value
+
+    def set(self, key: str, value: str):
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO llm_cache (key, value, created_at, accessed_at)"
+                " VALUES (?, ?, ?, ?)",
+                (key, value, now, now),
+            )
+            self._evict()
+            self._conn.commit()
+
+    def _evict(self):
+        if self.config.ttl_seconds is not None:
+            self._conn.execute(
+                "DELETE FROM llm_cache WHERE created_at < ?",
+                (time.time() - self.config.ttl_seconds,),
+            )
+        (count,) = self._conn.execute("SELECT COUNT(*) FROM llm_cache").fetchone()
+        excess = count - self.config.max_entries
+        if excess > 0:
+            self._conn.execute(
+                "DELETE FROM llm_cache WHERE key IN ("
+                "SELECT key FROM llm_cache ORDER BY accessed_at ASC LIMIT ?)",
+                (excess,),
+            )
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM llm_cache").fetchone()[0]
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "bypassed": self.bypassed,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "entries": len(self),
+        }
+
+    def clear(self):
+        with self._lock:
+            self._conn.execute("DELETE FROM llm_cache")
+            self._conn.commit()
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
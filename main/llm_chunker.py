@@ -1,8 +1,29 @@
+import os
 import re
+import math
+import time
+import asyncio
+import logging
 import requests
-from typing import List, Generator, Optional
+from contextlib import nullcontext
+from functools import lru_cache
+from typing import List, Generator, Optional, Any, Callable, Tuple, Dict
+from typing import ContextManager
 from dataclasses import dataclass
 import json
+import httpx
+
+from main.endpoint_pool import Endpoint, EndpointPool
+from main.ollama_http import HttpConfig, AsyncOllamaHttp, build_session
+from main.llm_cache import LLMResponseCache
+from main.ollama_stream import (
+    StreamMetrics,
+    generate_text,
+    iter_stream_text,
+    split_stream,
+)
+
+logger = logging.getLogger(__name__)
 
 
 @dataclass
@@ -10,6 +31,10 @@ class LLMConfig:
     base_url: str = "http://127.0.0.1:11434/api/generate"
     temperature: float = 0.5
     model: str = "mistral"
+    embed_url: str = "http://127.0.0.1:11434/api/embed"
+    embedding_model: str = "mxbai-embed-large"
+    # Consume Ollama's token stream so chunks are emitted as ||| arrives
+    stream: bool = False
 
 
 @dataclass
@@ -18,90 +43,387 @@ class ChunkingConfig:
     min_tokens: int = 50
     stride: int = 50
     clean_text: bool = True
+    # "llm" asks the model for split points, "embedding" places breakpoints
+    # where the similarity between neighbouring sentence windows drops
+    semantic_mode: str = "llm"
+    window_size: int = 2
+    breakpoint_percentile: float = 90.0
+    # Mistral tokenizer file: tokenizer.json (HF tokenizers) or tokenizer.model
+    # (sentencepiece); word counts are used when unset or unavailable
+    tokenizer_path: Optional[str] = None
+    token_cache_size: int = 4096
+    # Maximum concurrent semantic_split calls in the async path
+    max_concurrency: int = 4
+
+
+def _mean_vector(vectors: List[List[float]]) -> List[float]:
+    dim = len(vectors[0])
+    return [sum(v[i] for v in vectors) / len(vectors) for i in range(dim)]
+
+
+def _cosine(a: List[float], b: List[float]) -> float:
+    dot = sum(x * y for x, y in zip(a, b))
+    norm = math.sqrt(sum(x * x for x in a)) * math.sqrt(sum(y * y for y in b))
+    return dot / norm if norm else 0.0
+
+
+def _percentile(values: List[float], pct: float) -> float:
+    ordered = sorted(values)
+    rank = (len(ordered) - 1) * pct / 100.0
+    low, high = math.floor(rank), math.ceil(rank)
+    return ordered[low] + (ordered[high] - ordered[low]) * (rank - low)
+
+
+class LocalTokenCounter:
+    """Count tokens with a local Mistral-compatible vocabulary file"""
+
+    def __init__(self, tokenizer_path: Optional[str] = None, cache_size: int = 4096):
+        self.tokenizer_path = tokenizer_path
+        self._encode = self._load_encoder(tokenizer_path)
+        self.count = lru_cache(maxsize=cache_size)(self._count)
+
+    @staticmethod
+    def _load_encoder(tokenizer_path: Optional[str]) -> Optional[Callable]:
+        if not tokenizer_path or not os.path.exists(tokenizer_path):
+            return None
+        try:
+            if tokenizer_path.endswith(".json"):
+                from tokenizers import Tokenizer
+
+                tokenizer = Tokenizer.from_file(tokenizer_path)
+                return lambda text: tokenizer.encode(text, add_special_tokens=False).ids
+            import sentencepiece as spm
+
+            processor = spm.SentencePieceProcessor(model_file=tokenizer_path)
+            return processor.encode
+        except Exception as e:
+            logger.warning(f"Could not load tokenizer {tokenizer_path}: {e}")
+            return None
+
+    @property
+    def is_exact(self) -> bool:
+        return self._encode is not None
+
+    def _count(self, text: str) -> int:
+        if self._encode is None:
+            return len(text.split())  # Fallback
+        return len(self._encode(text))
 
 
 class MistralChunker:
     def __init__(
-        self, llm_config: LLMConfig, chunk_config: Optional[ChunkingConfig] = None
+        self,
+        llm_config: LLMConfig,
+        chunk_config: Optional[ChunkingConfig] = None,
+        embedder: Optional[Any] = None,
+        http_config: Optional[HttpConfig] = None,
+        cache: Optional[LLMResponseCache] = None,
+        endpoint_pool: Optional[EndpointPool] = None,
     ):
         self.llm_config = llm_config
         self.config = chunk_config if chunk_config else ChunkingConfig()
-
-    def _call_mistral(self, prompt: str) -> str:
-        """Call the local Mistral model through Ollama API"""
-        headers = {"Content-Type": "application/json"}
-        data = {
+        self.http_config = http_config if http_config else HttpConfig()
+        self.session = build_session(self.http_config)
+        self.async_http = AsyncOllamaHttp(self.http_config)
+        # Any object with an ``embed(texts)`` method (e.g. MxbaiEmbedder);
+        # falls back to the Ollama embed endpoint when not given
+        self.embedder = embedder
+        # Opt-in persistent cache for repeated prompts
+        self.cache = cache
+        # Spreads calls over several Ollama servers; configured URLs supply paths
+        self.endpoint_pool = endpoint_pool
+        self.token_counter = LocalTokenCounter(
+            self.config.tokenizer_path, self.config.token_cache_size
+        )
+        self.stats = {"llm_calls": 0, "embed_calls": 0}
+        self.last_stream_metrics: Optional[StreamMetrics] = None
+
+    def _request_body(self, prompt: str, stream: bool = False) -> dict:
+        return {
             "model": self.llm_config.model,
             "prompt": prompt,
             "temperature": self.llm_config.temperature,
-            "stream": False,
+            "stream": stream,
         }
 
+    def _lease(self) -> ContextManager[Optional[Endpoint]]:
+        if self.endpoint_pool is None:
+            return nullcontext()
+        return self.endpoint_pool.lease()
+
+    @staticmethod
+    def _resolve(url: str, endpoint: Optional[Endpoint]) -> str:
+        return endpoint.resolve(url) if endpoint is not None else url
+
+    def _call_mistral(self, prompt: str) -> str:
+        """Call the local Mistral model through Ollama API"""
+        headers = {"Content-Type": "application/json"}
+        data = self._request_body(prompt)
+        cached = self.cache.lookup(data) if self.cache is not None else None
+        if cached is not None:
+            return cached
+        self.stats["llm_calls"] += 1
+
         try:
-            response = requests.post(
-                self.llm_config.base_url, headers=headers, data=json.dumps(data)
-            )
-            response.raise_for_status()
-            return response.json().get("response", "")
+            with self._lease() as endpoint:
+                response = self.session.post(
+                    self._resolve(self.llm_config.base_url, endpoint),
+                    headers=headers,
+                    data=json.dumps(data),
+                    timeout=(
+                        self.http_config.connect_timeout,
+                        self.http_config.read_timeout,
+                    ),
+                )
+                response.raise_for_status()
+            text = response.json().get("response", "")
+        except requests.exceptions.RequestException as e:
+            raise RuntimeError(f"Failed to call Mistral model: {e}")
+        if self.cache is not None:
+            self.cache.store(data, text)
+        return text
+
+    def _stream_mistral(self, prompt: str) -> Generator[str, None, None]:
+        """Yield response fragments from the Ollama token stream"""
+        data = self._request_body(prompt, stream=True)
+        cached = self.cache.lookup(data) if self.cache is not None else None
+        if cached is not None:
+            yield cached
+            return
+        self.stats["llm_calls"] += 1
+        self.last_stream_metrics = StreamMetrics()
+        fragments = []
+        try:
+            with self._lease() as endpoint, self.session.post(
+                self._resolve(self.llm_config.base_url, endpoint),
+                json=data,
+                timeout=(
+                    self.http_config.connect_timeout,
+                    self.http_config.read_timeout,
+                ),
+                stream=True,
+            ) as response:
+                response.raise_for_status()
+                for fragment in iter_stream_text(
+                    response.iter_lines(), generate_text, self.last_stream_metrics
+                ):
+                    fragments.append(fragment)
+                    yield fragment
         except requests.exceptions.RequestException as e:
             raise RuntimeError(f"Failed to call Mistral model: {e}")
+        if self.cache is not None:
+            self.cache.store(data, "".join(fragments))
+
+    async def _acall_mistral(self, prompt: str) -> str:
+        """Call the local Mistral model over the pooled async client"""
+        data = self._request_body(prompt)
+        cached = self.cache.lookup(data) if self.cache is not None else None
+        if cached is not None:
+            return cached
+        self.stats["llm_calls"] += 1
+        try:
+            if self.endpoint_pool is None:
+                resp_json = await self.async_http.post_json(
+                    self.llm_config.base_url, data
+                )
+            else:
+                resp_json = await self.endpoint_pool.arequest(
+                    lambda endpoint: self.async_http.post_json(
+                        endpoint.resolve(self.llm_config.base_url), data
+                    )
+                )
+            text = resp_json.get("response", "")
+        except httpx.HTTPError as e:
+            raise RuntimeError(f"Failed to call Mistral model: {e}")
+        if self.cache is not None:
+            self.cache.store(data, text)
+        return text
 
     def clean_text(self, text: str) -> str:
         """Enhanced text cleaning pipeline"""
         # Remove citations and references
         text = re.sub(r"\[[\d,]+\]|\([^)]*?\d{4}[^)]*?\)", "", text)
-        # Normalize whitespace and clean special chars
-        text = re.sub(r"\s+", " ", text).strip()
+        # Normalize whitespace but keep line breaks, which delimit paragraphs
+        text = re.sub(r"[^\S\n]+", " ", text)
+        text = re.sub(r" *\n[\s]*", "\n", text).strip()
         return text
 
     def get_token_count(self, text: str) -> int:
-        """Estimate token count using Mistral"""
-        prompt = f"Estimate token count for this text (number only): {text}"
-        response = self._call_mistral(prompt)
-        try:
-            return int(re.search(r"\d+", response).group())
-        except (AttributeError, ValueError):
-            return len(text.split())  # Fallback
+        """Count tokens locally with the Mistral vocabulary (memoized)"""
+        return self.token_counter.count(text)
 
-    def semantic_split(self, text: str) -> List[str]:
-        """Use Mistral to find semantically meaningful split points"""
-        prompt = f"""
+    def _split_prompt(self, text: str) -> str:
+        return f"""
         You are a document chunking assistant. Your goal is to split the given technical documentation into semantically meaningful, LLM-friendly chunks.
 
 **Requirements:**
 - Break the document into coherent chunks, each containing approximately 300–500 tokens.
 - Avoid cutting off in the middle of paragraphs or bullet points.
 - Preserve formatting such as lists, code blocks, markdown titles, and image captions where useful.
+- Return only the chunks, separated by the delimiter |||
 **Input Document:**
 
         
         Text: {text}
         """
 
-        response = self._call_mistral(prompt)
+    def semantic_split(self, text: str) -> List[str]:
+        """Use Mistral to find semantically meaningful split points"""
+        response = self._call_mistral(self._split_prompt(text))
+        return [s.strip() for s in response.split("|||") if s.strip()]
+
+    def semantic_split_stream(self, text: str) -> Generator[str, None, None]:
+        """Yield each semantic segment as soon as its ||| delimiter arrives"""
+        yield from split_stream(self._stream_mistral(self._split_prompt(text)))
+
+    async def asemantic_split(self, text: str) -> List[str]:
+        """Async variant of semantic_split using the pooled client"""
+        response = await self._acall_mistral(self._split_prompt(text))
         return [s.strip() for s in response.split("|||") if s.strip()]
 
-    def chunk_text(self, text: str) -> Generator[str, None, None]:
-        """Generate semantically coherent chunks"""
+    def split_sentences(self, text: str) -> List[str]:
+        """Split text into sentences on terminal punctuation and line breaks"""
+        parts = re.split(r"(?<=[.!?])\s+|\n+", text)
+        return [p.strip() for p in parts if p.strip()]
+
+    def embed_sentences(self, sentences: List[str]) -> List[List[float]]:
+        """Embed all sentences in a single batched call"""
+        self.stats["embed_calls"] += 1
+        if self.embedder is not None:
+            vectors = self.embedder.embed(sentences)
+        else:
+            data = {"model": self.llm_config.embedding_model, "input": sentences}
+            try:
+                with self._lease() as endpoint:
+                    response = self.session.post(
+                        self._resolve(self.llm_config.embed_url, endpoint),
+                        json=data,
+                        timeout=(
+                            self.http_config.connect_timeout,
+                            self.http_config.read_timeout,
+                        ),
+                    )
+                    response.raise_for_status()
+                vectors = response.json().get("embeddings", [])
+            except requests.exceptions.RequestException as e:
+                raise RuntimeError(f"Failed to call embedding model: {e}")
+        return [[float(x) for x in v] for v in vectors]
+
+    def find_breakpoints(self, vectors: List[List[float]]) -> List[int]:
+        """Return sentence indices that should start a new chunk.
+
+        The similarity across each gap is measured between the mean of the
+        ``window_size`` sentences before it and the ``window_size`` after it;
+        gaps whose distance reaches ``breakpoint_percentile`` become breakpoints.
+        """
+        if len(vectors) < 2:
+            return []
+        w = max(1, self.config.window_size)
+        distances = []
+        for i in range(1, len(vectors)):
+            left = _mean_vector(vectors[max(0, i - w) : i])
+            right = _mean_vector(vectors[i : i + w])
+            distances.append(1.0 - _cosine(left, right))
+        threshold = _percentile(distances, self.config.breakpoint_percentile)
+        return [i + 1 for i, d in enumerate(distances) if d >= threshold and d > 0]
+
+    def embedding_split(self, text: str) -> Generator[Tuple[str, int], None, None]:
+        """Chunk text at embedding similarity drops within token budgets"""
+        sentences = self.split_sentences(text)
+        if not sentences:
+            return
+        breakpoints = set(self.find_breakpoints(self.embed_sentences(sentences)))
+
+        current_chunk = []
+        current_token_count = 0
+        for i, sentence in enumerate(sentences):
+            tokens = self.get_token_count(sentence)
+
+            # A single sentence over budget is cut into word windows
+            if tokens > self.config.max_tokens:
+                if current_chunk:
+                    yield " ".join(current_chunk), current_token_count
+                    current_chunk = []
+                    current_token_count = 0
+                yield from self._token_windows(sentence)
+                continue
+
+            at_breakpoint = i in breakpoints and (
+                current_token_count >= self.config.min_tokens
+            )
+            over_budget = current_token_count + tokens > self.config.max_tokens
+            if current_chunk and (at_breakpoint or over_budget):
+                yield " ".join(current_chunk), current_token_count
+                current_chunk = []
+                current_token_count = 0
+            current_chunk.append(sentence)
+            current_token_count += tokens
+
+        if current_chunk and current_token_count >= self.config.min_tokens:
+            yield " ".join(current_chunk), current_token_count
+
+    def _token_windows(self, sentence: str) -> Generator[Tuple[str, int], None, None]:
+        """Cut an oversized sentence into word windows within ``max_tokens``.
+
+        Words can encode to several tokens, so each window starts at
+        ``max_tokens`` words and is narrowed by binary search until the
+        counter agrees it fits. A single word over budget is its own window.
+        """
+        words = sentence.split()
+        limit = self.config.max_tokens
+        start = 0
+        while start < len(words):
+            low, high = 1, min(limit, len(words) - start)
+            if self.get_token_count(" ".join(words[start : start + high])) <= limit:
+                low = high
+            while low < high:
+                mid = (low + high) // 2 + 1
+                if self.get_token_count(" ".join(words[start : start + mid])) <= limit:
+                    low = mid
+                else:
+                    high = mid - 1
+            window = " ".join(words[start : start + low])
+            yield window, self.get_token_count(window)
+            start += low
+
+    def chunk_text_with_counts(
+        self, text: str
+    ) -> Generator[Tuple[str, int], None, None]:
+        """Generate semantically coherent chunks with their token counts"""
         if self.config.clean_text:
             text = self.clean_text(text)
 
+        if self.config.semantic_mode == "embedding":
+            yield from self.embedding_split(text)
+            return
+
         paragraphs = [p.strip() for p in text.split("\n") if p.strip()]
+        split = (
+            self.semantic_split_stream
+            if self.llm_config.stream
+            else self.semantic_split
+        )
+        yield from self._build_chunks(paragraphs, lambda i, para: split(para))
+
+    def _build_chunks(
+        self, paragraphs: List[str], split: Callable[[int, str], List[str]]
+    ) -> Generator[Tuple[str, int], None, None]:
+        """Pack paragraphs into chunks, splitting oversized ones with ``split``"""
         current_chunk = []
         current_token_count = 0
 
-        for para in paragraphs:
+        for i, para in enumerate(paragraphs):
             para_tokens = self.get_token_count(para)
 
             # Handle oversized paragraphs
             if para_tokens > self.config.max_tokens:
                 if current_chunk:
-                    yield " ".join(current_chunk)
+                    yield " ".join(current_chunk), current_token_count
                     current_chunk = []
                     current_token_count = 0
 
                 # Split large paragraph semantically
-                segments = self.semantic_split(para)
+                segments = split(i, para)
                 for seg in segments:
                     seg_tokens = self.get_token_count(seg)
                     if current_token_count + seg_tokens <= self.config.max_tokens:
@@ -109,7 +431,7 @@ class MistralChunker:
                         current_token_count += seg_tokens
                     else:
                         if current_chunk:
-                            yield " ".join(current_chunk)
+                            yield " ".join(current_chunk), current_token_count
                         current_chunk = [seg]
                         current_token_count = seg_tokens
                 continue
@@ -120,25 +442,72 @@ class MistralChunker:
                 current_token_count += para_tokens
             else:
                 if current_chunk:
-                    yield " ".join(current_chunk)
+                    yield " ".join(current_chunk), current_token_count
                 current_chunk = [para]
                 current_token_count = para_tokens
 
         # Final chunk
         if current_chunk and current_token_count >= self.config.min_tokens:
-            yield " ".join(current_chunk)
+            yield " ".join(current_chunk), current_token_count
 
-    def chunk_document(self, text: str) -> List[dict]:
-        """Process document into chunks with metadata"""
+    def chunk_text(self, text: str) -> Generator[str, None, None]:
+        """Generate semantically coherent chunks"""
+        for chunk, _ in self.chunk_text_with_counts(text):
+            yield chunk
+
+    def _chunk_records(self, chunks: List[Tuple[str, int]]) -> List[dict]:
         return [
             {
                 "text": chunk,
                 "chunk_id": i,
-                "token_count": self.get_token_count(chunk),
+                "token_count": token_count,
                 "model": self.llm_config.model,
             }
-            for i, chunk in enumerate(self.chunk_text(text))
+            for i, (chunk, token_count) in enumerate(chunks)
+        ]
+
+    def chunk_document(self, text: str) -> List[dict]:
+        """Process document into chunks with metadata"""
+        return self._chunk_records(self.chunk_text_with_counts(text))
+
+    async def achunk_text_with_counts(self, text: str) -> List[Tuple[str, int]]:
+        """Chunk text, splitting oversized paragraphs concurrently.
+
+        All ``semantic_split`` calls are issued up front (at most
+        ``max_concurrency`` in flight) and the chunks are then assembled in
+        document order exactly as the synchronous path would.
+        """
+        if self.config.clean_text:
+            text = self.clean_text(text)
+
+        if self.config.semantic_mode == "embedding":
+            # The embedding call blocks; keep it off the event loop
+            return await asyncio.to_thread(lambda: list(self.embedding_split(text)))
+
+        paragraphs = [p.strip() for p in text.split("\n") if p.strip()]
+        oversized = [
+            i
+            for i, para in enumerate(paragraphs)
+            if self.get_token_count(para) > self.config.max_tokens
         ]
+        semaphore = asyncio.Semaphore(max(1, self.config.max_concurrency))
+
+        async def split(i: int) -> List[str]:
+            async with semaphore:
+                return await self.asemantic_split(paragraphs[i])
+
+        results = await asyncio.gather(*(split(i) for i in oversized))
+        segments: Dict[int, List[str]] = dict(zip(oversized, results))
+        return list(self._build_chunks(paragraphs, lambda i, para: segments[i]))
+
+    async def achunk_document(self, text: str) -> List[dict]:
+        """Async variant of chunk_document"""
+        return self._chunk_records(await self.achunk_text_with_counts(text))
+
+    async def aclose(self):
+        """Close the pooled HTTP clients"""
+        await self.async_http.aclose()
+        self.session.close()
 
 
 # Example Usage
@@ -214,3 +583,17 @@ In 1915, Albert Einstein developed his theory of general relativity, having earl
     for chunk in chunker.chunk_document(document):
         print(chunk["text"])
         print()
+
+    # Compare the LLM split path with the embedding breakpoint path
+    for mode in ("llm", "embedding"):
+        chunk_config.semantic_mode = mode
+        chunker = MistralChunker(llm_config, chunk_config)
+        start = time.perf_counter()
+        chunks = list(chunker.chunk_text(document))
+        elapsed = time.perf_counter() - start
+        print(
+            f"[{mode}] {len(chunks)} chunks in {elapsed:.2f}s "
+            f"({len(chunks) / elapsed:.2f} chunks/s), "
+            f"llm_calls={chunker.stats['llm_calls']}, "
+            f"embed_calls={chunker.stats['embed_calls']}"
+        )
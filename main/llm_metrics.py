@@ -0,0 +1,244 @@
+import json
+import bisect
+import threading
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import asdict, dataclass
+from typing import Dict, Iterator, Optional, Sequence, Tuple
+
+TIME_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0)
+TOKEN_BUCKETS = (16, 32, 64, 128, 256, 512, 1024, 2048, 4096, 8192)
+RATE_BUCKETS = (1, 2, 5, 10, 20, 50, 100, 200, 500)
+
+_current_caller: ContextVar[str] = ContextVar("llm_caller", default="unknown")
+
+
+@contextmanager
+def llm_caller(name: str) -> Iterator[None]:
+    """Tag the metrics of every LLM call made in this context with a caller"""
+    token = _current_caller.set(name)
+    try:
+        yield
+    finally:
+        _current_caller.reset(token)
+
+
+def current_caller() -> str:
+    return _current_caller.get()
+
+
+@dataclass
+class LLMCallRecord:
+    """Measurements of one LLM call, filled in as the call progresses"""
+
+    caller: str
+    model: str
+    # graphiti model size tier ("small" or "medium")
+    tier: str = "medium"
+    wall_time: float = 0.0
+    queue_time: float = 0.0
+    prompt_tokens: Optional[int] = None
+    completion_tokens: Optional[int] = None
+    eval_duration_ns: Optional[int] = None
+    status: str = "ok"
+
+    def update_usage(self, response: dict):
+        """Read token usage from an Ollama or OpenAI-style response body"""
+        usage = response.get("usage") or {}
+        self.prompt_tokens = response.get(
+            "prompt_eval_count", usage.get("prompt_tokens", self.prompt_tokens)
+        )
+        self.completion_tokens = response.get(
+            "eval_count", usage.get("completion_tokens", self.completion_tokens)
+        )
+        self.eval_duration_ns = response.get("eval_duration", self.eval_duration_ns)
+
+    @property
+    def tokens_per_second(self) -> Optional[float]:
+        if not self.completion_tokens:
+            return None
+        if self.eval_duration_ns:
+            return self.completion_tokens / (self.eval_duration_ns / 1e9)
+        elapsed = self.wall_time - self.queue_time
+        return self.completion_tokens / elapsed if elapsed > 0 else None
+
+    def as_dict(self) -> dict:
+        return {**asdict(self), "tokens_per_second": self.tokens_per_second}
+
+
+class Histogram:
+    """Cumulative-bucket histogram in the Prometheus layout"""
+
+    def __init__(self, buckets: Sequence[float]):
+        self.buckets = tuple(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, value: float):
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.count += 1
+        self.sum += value
+
+    def merge(self, other: "Histogram"):
+        self.counts = [a + b for a, b in zip(self.counts, other.counts)]
+        self.count += other.count
+        self.sum += other.sum
+
+    def cumulative(self) -> list:
+        total, result = 0, []
+        for bound, count in zip(self.buckets + (float("inf"),), self.counts):
+            total += count
+            result.append((bound, total))
+        return result
+
+    def as_dict(self) -> dict:
+        return {
+            "count": self.count,
+            "sum": self.sum,
+            "mean": self.sum / self.count if self.count else 0.0,
+            "buckets": {
+                "+Inf" if bound == float("inf") else str(bound): count
+                for bound, count in self.cumulative()
+            },
+        }
+
+
+Labels = Tuple[Tuple[str, str], ...]
+
+
+class LLMMetrics:
+    """Per-caller LLM latency, token and throughput metrics.
+
+    Histograms and counters are keyed by metric name and labels (caller, model
+    and tier) and can be exported as Prometheus text or JSON.
+    """
+
+    HISTOGRAMS = {
+        "llm_wall_time_seconds": (TIME_BUCKETS, "Wall time of LLM calls"),
+        "llm_queue_time_seconds": (TIME_BUCKETS, "Time LLM calls waited for a slot"),
+        "llm_prompt_tokens": (TOKEN_BUCKETS, "Prompt tokens evaluated per call"),
+        "llm_completion_tokens": (TOKEN_BUCKETS, "Completion tokens generated"),
+        "llm_tokens_per_second": (RATE_BUCKETS, "Completion tokens per second"),
+    }
+    COUNTERS = {"llm_calls_total": "LLM calls by outcome"}
+
+    def __init__(self):
+        self._histograms: Dict[Tuple[str, Labels], Histogram] = {}
+        self._counters: Dict[Tuple[str, Labels], int] = {}
+        self._lock = threading.Lock()
+
+    def _observe(self, name: str, labels: Labels, value: Optional[float]):
+        if value is None:
+            return
+        key = (name, labels)
+        if key not in self._histograms:
+            self._histograms[key] = Histogram(self.HISTOGRAMS[name][0])
+        self._histograms[key].observe(value)
+
+    def _increment(self, name: str, labels: Labels):
+        self._counters[(name, labels)] = self._counters.get((name, labels), 0) + 1
+
+    def record(self, call: LLMCallRecord):
+        labels = (("caller", call.caller), ("model", call.model), ("tier", call.tier))
+        with self._lock:
+            self._increment(
+                "llm_calls_total", tuple(sorted(labels + (("status", call.status),)))
+            )
+            if call.status != "ok":
+                return
+            self._observe("llm_wall_time_seconds", labels, call.wall_time)
+            self._observe("llm_queue_time_seconds", labels, call.queue_time)
+            self._observe("llm_prompt_tokens", labels, call.prompt_tokens)
+            self._observe("llm_completion_tokens", labels, call.completion_tokens)
+            self._observe("llm_tokens_per_second", labels, call.tokens_per_second)
+
+    @staticmethod
+    def _matches(labels: Labels, wanted: dict) -> bool:
+        present = dict(labels)
+        return all(present.get(k) == v for k, v in wanted.items())
+
+    def histogram(self, name: str, **labels) -> Optional[Histogram]:
+        """Histogram aggregated over every series matching the given labels"""
+        merged = None
+        with self._lock:
+            for (metric, series), hist in self._histograms.items():
+                if metric == name and self._matches(series, labels):
+                    if merged is None:
+                        merged = Histogram(hist.buckets)
+                    merged.merge(hist)
+        return merged
+
+    def counter(self, name: str, **labels) -> int:
+        """Counter summed over every series matching the given labels"""
+        with self._lock:
+            return sum(
+                value
+                for (metric, series), value in self._counters.items()
+                if metric == name and self._matches(series, labels)
+            )
+
+    def summary(self, name: str, by: str) -> Dict[str, dict]:
+        """Count and mean of a histogram per value of one label"""
+        values = {
+            dict(series).get(by)
+            for metric, series in self._histograms
+            if metric == name
+        }
+        result = {}
+        for value in sorted(v for v in values if v is not None):
+            hist = self.histogram(name, **{by: value})
+            result[value] = {"count": hist.count, "mean": hist.sum / hist.count}
+        return result
+
+    @staticmethod
+    def _format_labels(labels: Labels, **extra) -> str:
+        pairs = list(labels) + list(extra.items())
+        escaped = (
+            (k, str(v).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n"))
+            for k, v in pairs
+        )
+        return "{" + ",".join(f'{k}="{v}"' for k, v in escaped) + "}"
+
+    def to_prometheus(self) -> str:
+        """Render all metrics in the Prometheus text exposition format"""
+        lines = []
+        with self._lock:
+            for name, help_text in self.COUNTERS.items():
+                lines += [f"# HELP {name} {help_text}", f"# TYPE {name} counter"]
+                for (metric, labels), value in sorted(self._counters.items()):
+                    if metric == name:
+                        lines.append(f"{name}{self._format_labels(labels)} {value}")
+            for name, (_, help_text) in self.HISTOGRAMS.items():
+                lines += [f"# HELP {name} {help_text}", f"# TYPE {name} histogram"]
+                for (metric, labels), hist in sorted(
+                    self._histograms.items(), key=lambda item: item[0]
+                ):
+                    if metric != name:
+                        continue
+                    for bound, count in hist.cumulative():
+                        le = "+Inf" if bound == float("inf") else repr(float(bound))
+                        lines.append(
+                            f"{name}_bucket{self._format_labels(labels, le=le)} {count}"
+                        )
+                    lines.append(f"{name}_sum{self._format_labels(labels)} {hist.sum}")
+                    lines.append(
+                        f"{name}_count{self._format_labels(labels)} {hist.count}"
+                    )
+        return "\n".join(lines) + "\n"
+
+    def as_dict(self) -> dict:
+        with self._lock:
+            return {
+                "counters": [
+                    {"name": name, "labels": dict(labels), "value": value}
+                    for (name, labels), value in self._counters.items()
+                ],
+                "histograms": [
+                    {"name": name, "labels": dict(labels), **hist.as_dict()}
+                    for (name, labels), hist in self._histograms.items()
+                ],
+            }
+
+    def to_json(self) -> str:
+        return json.dumps(self.as_dict(), indent=2)
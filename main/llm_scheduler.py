@@ -0,0 +1,256 @@
+import time
+import asyncio
+import logging
+from enum import Enum
+from collections import deque
+from contextvars import ContextVar
+from contextlib import asynccontextmanager, contextmanager
+from dataclasses import dataclass, field
+from typing import AsyncIterator, Dict, Iterator, Optional, Tuple
+
+import httpx
+from graphiti_core.llm_client.errors import RateLimitError
+
+logger = logging.getLogger(__name__)
+
+
+class Priority(str, Enum):
+    """Request lanes: interactive calls are dispatched before background ones"""
+
+    INTERACTIVE = "interactive"
+    BACKGROUND = "background"
+
+
+_current_priority: ContextVar[Priority] = ContextVar(
+    "llm_priority", default=Priority.INTERACTIVE
+)
+
+
+@contextmanager
+def llm_priority(priority: Priority) -> Iterator[None]:
+    """Tag every LLM call made in this context (and tasks it spawns)"""
+    token = _current_priority.set(Priority(priority))
+    try:
+        yield
+    finally:
+        _current_priority.reset(token)
+
+
+def current_priority() -> Priority:
+    return _current_priority.get()
+
+
+@dataclass
+class LimiterConfig:
+    initial_limit: float = 2.0
+    min_limit: int = 1
+    max_limit: int = 8
+    # Requests waiting for a slot beyond this are rejected with RateLimitError
+    max_queue: int = 64
+    queue_timeout: Optional[float] = None
+    # Calls slower than this count as congestion and shrink the limit
+    latency_target: float = 30.0
+    # AIMD: +increase_step per limit's worth of successes, *decrease_factor on congestion
+    increase_step: float = 1.0
+    decrease_factor: float = 0.5
+    # Background requests waiting longer than this are served ahead of
+    # interactive ones so bulk ingestion is never starved
+    starvation_after: float = 30.0
+
+
+def is_overload_error(error: BaseException) -> bool:
+    """Whether a failed call signals an overloaded or unhealthy model server"""
+    if isinstance(
+        error, (RateLimitError, httpx.TimeoutException, httpx.TransportError)
+    ):
+        return True
+    if isinstance(error, httpx.HTTPStatusError):
+        status = error.response.status_code
+        return status == 429 or status >= 500
+    return False
+
+
+class AdaptiveLimiter:
+    """Caps in-flight requests and adapts the cap with AIMD.
+
+    The limit grows additively while calls finish under ``latency_target`` and
+    is cut multiplicatively when a call is slow or fails with an overload
+    error. Callers beyond the limit wait in a bounded queue with one FIFO lane
+    per priority; interactive waiters go first unless the oldest background
+    waiter has waited longer than ``starvation_after``.
+    """
+
+    def __init__(self, config: Optional[LimiterConfig] = None):
+        self.config = config if config else LimiterConfig()
+        self.limit = float(
+            min(
+                max(self.config.initial_limit, self.config.min_limit),
+                self.config.max_limit,
+            )
+        )
+        self.in_flight = 0
+        self._waiters: Dict[Priority, deque] = {lane: deque() for lane in Priority}
+        self.completed = 0
+        self.errors = 0
+        self.rejected = 0
+        self.queue_times: Dict[Priority, deque] = {
+            lane: deque(maxlen=1000) for lane in Priority
+        }
+
+    @property
+    def capacity(self) -> int:
+        return max(self.config.min_limit, int(self.limit))
+
+    @property
+    def queued(self) -> int:
+        return sum(len(lane) for lane in self._waiters.values())
+
+    async def acquire(self, priority: Optional[Priority] = None) -> float:
+        """Wait for a slot and return the time spent queued"""
+        lane = Priority(priority) if priority else current_priority()
+        start = time.perf_counter()
+        if self.in_flight < self.capacity and not self.queued:
+            self.in_flight += 1
+            self.queue_times[lane].append(0.0)
+            return 0.0
+        if self.queued >= self.config.max_queue:
+            self.rejected += 1
+            raise RateLimitError("LLM request queue is full")
+
+        waiter = asyncio.get_running_loop().create_future()
+        entry = (start, waiter)
+        self._waiters[lane].append(entry)
+        try:
+            await asyncio.wait_for(waiter, self.config.queue_timeout)
+        except (asyncio.TimeoutError, asyncio.CancelledError) as e:
+            if waiter.done() and not waiter.cancelled():
+                # The slot was granted as we gave up; hand it on
+                self.in_flight -= 1
+                self._wake()
+            elif entry in self._waiters[lane]:
+                self._waiters[lane].remove(entry)
+            if isinstance(e, asyncio.TimeoutError):
+                self.rejected += 1
+                raise RateLimitError("Timed out waiting for an LLM slot") from e
+            raise
+        queue_time = time.perf_counter() - start
+        self.queue_times[lane].append(queue_time)
+        return queue_time
+
+    def release(self, latency: float, overloaded: bool = False, adapt: bool = True):
+        """Return a slot and adapt the limit from the call outcome"""
+        self.in_flight -= 1
+        if adapt:
+            self._adapt(latency, overloaded)
+        self._wake()
+
+    def _adapt(self, latency: float, overloaded: bool):
+        if overloaded or latency > self.config.latency_target:
+            self.errors += overloaded
+            self.limit = max(
+                float(self.config.min_limit), self.limit * self.config.decrease_factor
+            )
+            logger.debug("Limiter decreased to %.2f", self.limit)
+        else:
+            self.completed += 1
+            self.limit = min(
+                float(self.config.max_limit),
+                self.limit + self.config.increase_step / self.limit,
+            )
+
+    def _next_waiter(self) -> Optional[asyncio.Future]:
+        interactive = self._waiters[Priority.INTERACTIVE]
+        background = self._waiters[Priority.BACKGROUND]
+        if background and (
+            not interactive
+            or time.perf_counter() - background[0][0] >= self.config.starvation_after
+        ):
+            return background.popleft()[1]
+        if interactive:
+            return interactive.popleft()[1]
+        return None
+
+    def _wake(self):
+        while self.in_flight < self.capacity:
+            waiter = self._next_waiter()
+            if waiter is None:
+                break
+            if waiter.done():
+                continue
+            self.in_flight += 1
+            waiter.set_result(None)
+
+    @asynccontextmanager
+    async def slot(self, priority: Optional[Priority] = None) -> AsyncIterator[float]:
+        """Hold a slot for the duration of one LLM call; yields the queue time"""
+        queue_time = await self.acquire(priority)
+        start = time.perf_counter()
+        try:
+            yield queue_time
+        except BaseException as e:
+            # Failures unrelated to server load leave the limit unchanged
+            overloaded = is_overload_error(e)
+            self.release(
+                time.perf_counter() - start, overloaded=overloaded, adapt=overloaded
+            )
+            raise
+        self.release(time.perf_counter() - start)
+
+    @staticmethod
+    def _wait_stats(queue_times) -> dict:
+        waits = sorted(queue_times)
+        return {
+            "queue_time_avg": sum(waits) / len(waits) if waits else 0.0,
+            "queue_time_p95": waits[int(0.95 * (len(waits) - 1))] if waits else 0.0,
+            "queue_time_max": waits[-1] if waits else 0.0,
+        }
+
+    def stats(self) -> dict:
+        all_waits = [w for lane in self.queue_times.values() for w in lane]
+        return {
+            "limit": round(self.limit, 2),
+            "in_flight": self.in_flight,
+            "queued": self.queued,
+            "completed": self.completed,
+            "errors": self.errors,
+            "rejected": self.rejected,
+            **self._wait_stats(all_waits),
+            "lanes": {
+                lane.value: {
+                    "queued": len(self._waiters[lane]),
+                    **self._wait_stats(self.queue_times[lane]),
+                }
+                for lane in Priority
+            },
+        }
+
+
+@dataclass
+class SchedulerConfig:
+    default: LimiterConfig = field(default_factory=LimiterConfig)
+    # Per-endpoint overrides keyed by base URL
+    endpoints: Dict[str, LimiterConfig] = field(default_factory=dict)
+
+
+class LLMScheduler:
+    """Keeps one adaptive limiter per (endpoint, model)"""
+
+    def __init__(self, config: Optional[SchedulerConfig] = None):
+        self.config = config if config else SchedulerConfig()
+        self._limiters: Dict[Tuple[str, str], AdaptiveLimiter] = {}
+
+    def limiter(self, endpoint: str, model: str) -> AdaptiveLimiter:
+        key = (endpoint, model)
+        if key not in self._limiters:
+            limiter_config = self.config.endpoints.get(endpoint, self.config.default)
+            self._limiters[key] = AdaptiveLimiter(limiter_config)
+        return self._limiters[key]
+
+    def slot(self, endpoint: str, model: str, priority: Optional[Priority] = None):
+        return self.limiter(endpoint, model).slot(priority)
+
+    def stats(self) -> Dict[str, dict]:
+        return {
+            f"{endpoint}#{model}": limiter.stats()
+            for (endpoint, model), limiter in self._limiters.items()
+        }
@@ -1,9 +1,35 @@
 import json
+import time
 import typing
+import logging
+from contextlib import aclosing
+import httpx
 import requests
+from pydantic import ValidationError
 from graphiti_core.prompts import Message
 from graphiti_core.llm_client.client import LLMClient
-from graphiti_core.llm_client.config import LLMConfig
+from graphiti_core.llm_client.config import LLMConfig, ModelSize
+from graphiti_core.llm_client.errors import RateLimitError
+from main.endpoint_pool import EndpointPool
+from main.gbnf_schema import grammar_for_model, type_adapter
+from main.llm_cache import LLMResponseCache
+from main.llm_metrics import LLMCallRecord, LLMMetrics, current_caller
+from main.llm_scheduler import LLMScheduler
+from main.ollama_http import AsyncOllamaHttp, HttpConfig
+from main.ollama_stream import (
+    JsonObjectScanner,
+    StreamMetrics,
+    aiter_stream_text,
+    chat_text,
+    iter_stream_text,
+)
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MODEL = "mistral"
+
+# Statuses Ollama and OpenAI-compatible servers return when overloaded
+OVERLOAD_STATUS_CODES = (429, 503)
 
 
 def extract_json_from_string(input_string: str) -> str:
@@ -14,9 +40,29 @@ def extract_json_from_string(input_string: str) -> str:
     return input_string[start_index : end_index + 1]
 
 
+def extract_message_content(resp_json: dict) -> str:
+    """Message content from an Ollama /api/chat or OpenAI-style response"""
+    if "message" in resp_json:
+        return resp_json["message"].get("content", "")
+    return resp_json.get("choices", [{}])[0].get("message", {}).get("content", "")
+
+
 class LocalAiClient(LLMClient):
+    # Re-prompts after a response that fails to parse or validate
+    MAX_RETRIES = 2
+
     def __init__(
-        self, config: LLMConfig | None = None, grammar_file: str | None = None
+        self,
+        config: LLMConfig | None = None,
+        grammar_file: str | None = None,
+        stream: bool = False,
+        response_cache: LLMResponseCache | None = None,
+        http_config: HttpConfig | None = None,
+        scheduler: LLMScheduler | None = None,
+        stop_at_json: bool = True,
+        schema_grammars: bool = True,
+        metrics: LLMMetrics | None = None,
+        endpoint_pool: EndpointPool | None = None,
     ):
         if config is None:
             config = LLMConfig()
@@ -24,6 +70,30 @@ class LocalAiClient(LLMClient):
         super().__init__(config)
         self.base_url = config.base_url
         self.grammar_content = ""
+        self.stream = stream
+        # When streaming, cancel generation once the JSON object is complete
+        self.stop_at_json = stop_at_json
+        # Opt-in persistent cache keyed on the full request body
+        self.response_cache = response_cache
+        # Metrics of the most recently finished stream; each call tracks its
+        # own StreamMetrics, so concurrent calls never share one
+        self.last_stream_metrics: StreamMetrics | None = None
+        # Shared keep-alive pool with timeouts and jittered retries
+        self.http = AsyncOllamaHttp(http_config)
+        # Caps in-flight requests per endpoint and model, adapting with AIMD
+        self.scheduler = scheduler if scheduler else LLMScheduler()
+        # Constrain output with a grammar derived from each response_model
+        self.schema_grammars = schema_grammars
+        self.validation_stats = {
+            "calls": 0,
+            "responses": 0,
+            "validation_failures": 0,
+            "retries": 0,
+        }
+        # Per-caller latency, token and throughput histograms
+        self.metrics = metrics if metrics else LLMMetrics()
+        # Spreads calls over several Ollama servers; base_url supplies the path
+        self.endpoint_pool = endpoint_pool
 
         if grammar_file:
             with open(grammar_file, "r") as f:
@@ -34,48 +104,361 @@ class LocalAiClient(LLMClient):
         messages: list[Message],
         response_model: typing.Optional[typing.Type[typing.Any]] = None,
         max_tokens: typing.Optional[int] = None,
-        model_size: typing.Optional[int] = None,
+        model_size: typing.Optional[ModelSize] = None,
     ) -> typing.Any:
         """Implement the abstract method from LLMClient"""
-        response_json_str = self.execute_llm_query(messages)
-        print(f"Raw response JSON string:\n{response_json_str}")
+        grammar = self._grammar_for(response_model)
+        self.validation_stats["calls"] += 1
 
-        try:
-            llm_response_json = json.loads(response_json_str)
-        except json.JSONDecodeError as e:
-            print(f"JSON decode error: {e}")
-            raise e
+        def parse(response: str) -> typing.Any:
+            value = json.loads(response)
+            if response_model is not None:
+                type_adapter(response_model).validate_python(value)
+            return value
+
+        for attempt in range(self.MAX_RETRIES + 1):
+            # Only responses matching the schema are cached, so a retry with
+            # the same messages samples again instead of replaying bad output
+            response_json_str = await self.aexecute_llm_query(
+                messages, grammar, model_size, validate=parse
+            )
+            logger.debug("Raw response JSON string: %s", response_json_str)
+            self.validation_stats["responses"] += 1
+            try:
+                llm_response_json = parse(response_json_str)
+            except (json.JSONDecodeError, ValidationError) as e:
+                logger.warning(
+                    "Invalid LLM response (attempt %d/%d): %s",
+                    attempt + 1,
+                    self.MAX_RETRIES + 1,
+                    e,
+                )
+                self.validation_stats["validation_failures"] += 1
+                if attempt == self.MAX_RETRIES:
+                    raise e
+                self.validation_stats["retries"] += 1
+                messages = messages + [
+                    Message(
+                        role="user",
+                        content=f"The previous response was invalid: {e}\n"
+                        "Respond again with only a JSON object matching the schema.",
+                    )
+                ]
+                continue
+            return llm_response_json
+
+    def model_for(self, model_size: typing.Optional[ModelSize] = None) -> str:
+        """Local model serving a graphiti size tier.
+
+        Small-tier prompts (dedup, classification) go to ``config.small_model``
+        when set; everything else uses ``config.model``.
+        """
+        model = self.model or DEFAULT_MODEL
+        if model_size == ModelSize.small:
+            return self.small_model or model
+        return model
 
-        print(f"Parsed LLM response JSON:\n{json.dumps(llm_response_json, indent=2)}")
-        return llm_response_json
+    @staticmethod
+    def _tier(model_size: typing.Optional[ModelSize]) -> str:
+        return model_size.value if model_size else ModelSize.medium.value
 
-    def execute_llm_query(self, messages: list[Message]) -> str:
+    def _grammar_for(
+        self, response_model: typing.Optional[typing.Type[typing.Any]]
+    ) -> str | None:
+        """Schema grammar for the response model; None uses the static grammar"""
+        if response_model is None or not self.schema_grammars:
+            return None
+        return grammar_for_model(response_model)
+
+    def validation_rates(self) -> dict:
+        """Share of responses failing validation and of calls needing a retry"""
+        stats = self.validation_stats
+        return {
+            **stats,
+            "failure_rate": stats["validation_failures"] / max(stats["responses"], 1),
+            "retry_rate": stats["retries"] / max(stats["calls"], 1),
+        }
+
+    def _request_body(
+        self,
+        messages: list[Message],
+        stream: bool = False,
+        grammar: str | None = None,
+        model: str | None = None,
+    ) -> dict:
         # Convert Message objects to dicts Ollama expects
         messages_payload = [{"role": m.role, "content": m.content} for m in messages]
-        print(f"Sending messages payload:\n{messages_payload}")
 
         request_body = {
-            "model": "mistral",
+            "model": model or self.model_for(),
             "messages": messages_payload,
             "temperature": self.temperature,
             "max_tokens": self.max_tokens or 2000,
+            "stream": stream,
         }
 
-        if self.grammar_content:
-            request_body["grammar"] = self.grammar_content
+        grammar = grammar if grammar is not None else self.grammar_content
+        if grammar:
+            request_body["grammar"] = grammar
+        return request_body
 
-        response = requests.post(self.base_url, json=request_body)
-        response.raise_for_status()
+    def stream_llm_query(
+        self,
+        messages: list[Message],
+        grammar: str | None = None,
+        url: str | None = None,
+        model: str | None = None,
+        metrics: StreamMetrics | None = None,
+    ) -> typing.Generator[str, None, None]:
+        """Yield content fragments from the newline-delimited JSON stream"""
+        if metrics is None:
+            metrics = StreamMetrics()
+        try:
+            with requests.post(
+                url or self.base_url,
+                json=self._request_body(messages, True, grammar, model),
+                stream=True,
+            ) as response:
+                response.raise_for_status()
+                yield from iter_stream_text(response.iter_lines(), chat_text, metrics)
+        finally:
+            self.last_stream_metrics = metrics
+
+    def execute_llm_query(
+        self,
+        messages: list[Message],
+        grammar: str | None = None,
+        model_size: ModelSize | None = None,
+        validate: typing.Callable[[str], typing.Any] | None = None,
+    ) -> str:
+        """Query the model; ``validate`` raises for responses not to be cached"""
+        model = self.model_for(model_size)
+        tier = self._tier(model_size)
+        cache_body = self._request_body(messages, grammar=grammar, model=model)
+        if self.response_cache is not None:
+            cached = self.response_cache.lookup(cache_body)
+            if cached is not None:
+                self._record(LLMCallRecord(current_caller(), model, tier), "cached")
+                return cached
 
-        print("Raw response text from Ollama Mistral API:")
-        print(response.text)
+        record = LLMCallRecord(current_caller(), model, tier)
+        start = time.perf_counter()
+        try:
+            if self.endpoint_pool is None:
+                extracted_json_str = self._query_llm(
+                    messages, grammar, record, model=model
+                )
+            else:
+                with self.endpoint_pool.lease() as endpoint:
+                    extracted_json_str = self._query_llm(
+                        messages,
+                        grammar,
+                        record,
+                        endpoint.resolve(self.base_url),
+                        model,
+                    )
+        except Exception:
+            self._record(record, "error", start)
+            raise
+        self._record(record, "ok", start)
+        self._cache_store(cache_body, extracted_json_str, validate)
+        return extracted_json_str
+
+    async def aexecute_llm_query(
+        self,
+        messages: list[Message],
+        grammar: str | None = None,
+        model_size: ModelSize | None = None,
+        validate: typing.Callable[[str], typing.Any] | None = None,
+    ) -> str:
+        """Non-blocking variant of execute_llm_query over the pooled client"""
+        model = self.model_for(model_size)
+        tier = self._tier(model_size)
+        cache_body = self._request_body(messages, grammar=grammar, model=model)
+        if self.response_cache is not None:
+            cached = self.response_cache.lookup(cache_body)
+            if cached is not None:
+                self._record(LLMCallRecord(current_caller(), model, tier), "cached")
+                return cached
+
+        record = LLMCallRecord(current_caller(), model, tier)
+        start = time.perf_counter()
+        try:
+            extracted_json_str = await self._aroute(messages, grammar, record, model)
+        except httpx.HTTPStatusError as e:
+            self._record(record, "error", start)
+            if e.response.status_code in OVERLOAD_STATUS_CODES:
+                raise RateLimitError(
+                    f"Local LLM overloaded ({e.response.status_code})"
+                ) from e
+            raise
+        except Exception:
+            self._record(record, "error", start)
+            raise
+        self._record(record, "ok", start)
+        self._cache_store(cache_body, extracted_json_str, validate)
+        return extracted_json_str
+
+    def _cache_store(
+        self,
+        cache_body: dict,
+        response: str,
+        validate: typing.Callable[[str], typing.Any] | None,
+    ):
+        """Cache a response only if ``validate`` (default: JSON parsing) accepts it"""
+        if self.response_cache is None:
+            return
+        try:
+            (validate or json.loads)(response)
+        except (json.JSONDecodeError, ValidationError):
+            return
+        self.response_cache.store(cache_body, response)
+
+    async def _aroute(
+        self,
+        messages: list[Message],
+        grammar: str | None,
+        record: LLMCallRecord,
+        model: str,
+    ) -> str:
+        async def query(url: str) -> str:
+            async with self.scheduler.slot(url, model) as queue_time:
+                record.queue_time = queue_time
+                return await self._aquery_llm(messages, grammar, record, url, model)
+
+        if self.endpoint_pool is None:
+            return await query(self.base_url)
+        return await self.endpoint_pool.arequest(
+            lambda endpoint: query(endpoint.resolve(self.base_url))
+        )
+
+    async def astream_llm_query(
+        self,
+        messages: list[Message],
+        grammar: str | None = None,
+        url: str | None = None,
+        model: str | None = None,
+        metrics: StreamMetrics | None = None,
+    ) -> typing.AsyncGenerator[str, None]:
+        """Async variant of stream_llm_query"""
+        if metrics is None:
+            metrics = StreamMetrics()
+        lines = self.http.stream_lines(
+            url or self.base_url, self._request_body(messages, True, grammar, model)
+        )
+        # Close both generators explicitly so stopping early releases the
+        # connection right away instead of at garbage collection
+        try:
+            async with aclosing(lines), aclosing(
+                aiter_stream_text(lines, chat_text, metrics)
+            ) as fragments:
+                async for fragment in fragments:
+                    yield fragment
+        finally:
+            self.last_stream_metrics = metrics
+
+    def _record(self, record: LLMCallRecord, status: str, start: float | None = None):
+        record.status = status
+        if start is not None:
+            record.wall_time = time.perf_counter() - start
+        self.metrics.record(record)
+        if logger.isEnabledFor(logging.DEBUG):
+            details = record.as_dict()
+            logger.debug("LLM call %s", details, extra={"llm": details})
+
+    @staticmethod
+    def _record_stream_usage(record: LLMCallRecord | None, metrics: StreamMetrics):
+        if record is None:
+            return
+        record.prompt_tokens = metrics.prompt_eval_count
+        record.completion_tokens = metrics.eval_count or metrics.token_count
+        record.eval_duration_ns = metrics.eval_duration_ns
+
+    def _stop_early(
+        self, scanner: JsonObjectScanner, fragment: str, metrics: StreamMetrics
+    ) -> bool:
+        if not self.stop_at_json or scanner.feed(fragment) is None:
+            return False
+        # Leaving the stream closes the connection, which stops generation
+        metrics.stopped_early = True
+        metrics.finish()
+        return True
+
+    def _scanned_json(self, scanner: JsonObjectScanner, fragments: list[str]) -> str:
+        if scanner.result is not None:
+            return scanner.result
+        return extract_json_from_string("".join(fragments))
+
+    async def _aquery_llm(
+        self,
+        messages: list[Message],
+        grammar: str | None = None,
+        record: LLMCallRecord | None = None,
+        url: str | None = None,
+        model: str | None = None,
+    ) -> str:
+        if self.stream:
+            scanner = JsonObjectScanner()
+            fragments = []
+            metrics = StreamMetrics()
+            stream = self.astream_llm_query(messages, grammar, url, model, metrics)
+            try:
+                async for fragment in stream:
+                    fragments.append(fragment)
+                    if self._stop_early(scanner, fragment, metrics):
+                        break
+            finally:
+                await stream.aclose()
+            self._record_stream_usage(record, metrics)
+            return self._scanned_json(scanner, fragments)
+
+        resp_json = await self.http.post_json(
+            url or self.base_url,
+            self._request_body(messages, grammar=grammar, model=model),
+        )
+        if record is not None:
+            record.update_usage(resp_json)
+        return extract_json_from_string(extract_message_content(resp_json))
+
+    async def close(self):
+        """Close the pooled HTTP connections"""
+        await self.http.aclose()
+
+    def _query_llm(
+        self,
+        messages: list[Message],
+        grammar: str | None = None,
+        record: LLMCallRecord | None = None,
+        url: str | None = None,
+        model: str | None = None,
+    ) -> str:
+        if self.stream:
+            scanner = JsonObjectScanner()
+            fragments = []
+            metrics = StreamMetrics()
+            stream = self.stream_llm_query(messages, grammar, url, model, metrics)
+            try:
+                for fragment in stream:
+                    fragments.append(fragment)
+                    if self._stop_early(scanner, fragment, metrics):
+                        break
+            finally:
+                stream.close()
+            self._record_stream_usage(record, metrics)
+            return self._scanned_json(scanner, fragments)
+
+        request_body = self._request_body(messages, grammar=grammar, model=model)
+        logger.debug("Sending messages payload: %s", request_body["messages"])
+
+        response = requests.post(url or self.base_url, json=request_body)
+        response.raise_for_status()
+        logger.debug("Raw response text from Ollama: %s", response.text)
 
         resp_json = response.json()
+        if record is not None:
+            record.update_usage(resp_json)
         # Extract the content from the first choice
-        response_message = (
-            resp_json.get("choices", [{}])[0].get("message", {}).get("content", "")
-        )
-        print(f"Response message content:\n{response_message}")
+        response_message = extract_message_content(resp_json)
 
         # Extract JSON substring from the response text
         extracted_json_str = extract_json_from_string(response_message)
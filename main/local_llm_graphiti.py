@@ -4,6 +4,8 @@ from graphiti_core.llm_client.config import LLMConfig
 from datetime import datetime
 from main.llm_embedder import HuggingFaceEmbedder
 from main.local_ai_client import LocalAiClient
+from main.llm_metrics import llm_caller
+from main.llm_scheduler import Priority, llm_priority
 import asyncio
 import os
 
@@ -31,16 +33,18 @@ async def doSearch():
         "As AG, Harris was in office from January 3, 2011 – January 3, 2017",
     ]
     print("embbed episodes")
-    for i, episode in enumerate(episodes):
-        await graphiti.add_episode(
-            name=f"Freakonomics Radio {i}",
-            episode_body=episode,
-            source=EpisodeType.text,
-            source_description="podcast",
-            reference_time=datetime.now(),
-        )
-
-    results = await graphiti.search("Who was the California Attorney General?")
+    with llm_priority(Priority.BACKGROUND), llm_caller("local_llm_graphiti.ingest"):
+        for i, episode in enumerate(episodes):
+            await graphiti.add_episode(
+                name=f"Freakonomics Radio {i}",
+                episode_body=episode,
+                source=EpisodeType.text,
+                source_description="podcast",
+                reference_time=datetime.now(),
+            )
+
+    with llm_priority(Priority.INTERACTIVE), llm_caller("local_llm_graphiti.search"):
+        results = await graphiti.search("Who was the California Attorney General?")
     await graphiti.close()
 
     print("Results: ")
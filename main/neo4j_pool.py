@@ -0,0 +1,233 @@
+import os
+import logging
+import threading
+from dataclasses import dataclass, field, replace
+from typing import Any, Dict, Optional, Tuple
+
+from neo4j import AsyncDriver, AsyncGraphDatabase, GraphDatabase
+from graphiti_core.driver.neo4j_driver import Neo4jDriver
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class Neo4jPoolConfig:
+    uri: str = "bolt://localhost:7687"
+    user: str = "neo4j"
+    password: str = "password"
+    database: str = "neo4j"
+    max_connection_pool_size: int = 100
+    # Seconds a session waits for a free connection before failing
+    connection_acquisition_timeout: float = 60.0
+    # Connections older than this are closed rather than reused, so pools
+    # recycle before load balancers or the server drop idle sockets
+    max_connection_lifetime: float = 3600.0
+    # Records pulled per round trip when streaming results
+    fetch_size: int = 1000
+
+    @classmethod
+    def from_env(cls, **overrides) -> "Neo4jPoolConfig":
+        """Read NEO4J_URI / NEO4J_USER / NEO4J_PASSWORD and NEO4J_POOL_* settings.
+
+        Keyword arguments replace individual settings, e.g. an explicit uri.
+        """
+        defaults = cls()
+        config = cls(
+            uri=os.getenv("NEO4J_URI", defaults.uri),
+            user=os.getenv("NEO4J_USER", defaults.user),
+            password=os.getenv("NEO4J_PASSWORD", defaults.password),
+            database=os.getenv("NEO4J_DATABASE", defaults.database),
+            max_connection_pool_size=int(
+                os.getenv("NEO4J_POOL_SIZE", defaults.max_connection_pool_size)
+            ),
+            connection_acquisition_timeout=float(
+                os.getenv(
+                    "NEO4J_POOL_ACQUIRE_TIMEOUT",
+                    defaults.connection_acquisition_timeout,
+                )
+            ),
+            max_connection_lifetime=float(
+                os.getenv("NEO4J_POOL_MAX_LIFETIME", defaults.max_connection_lifetime)
+            ),
+            fetch_size=int(os.getenv("NEO4J_FETCH_SIZE", defaults.fetch_size)),
+        )
+        return replace(config, **overrides)
+
+    def driver_options(self) -> dict:
+        return {
+            "auth": (self.user, self.password),
+            "max_connection_pool_size": self.max_connection_pool_size,
+            "connection_acquisition_timeout": self.connection_acquisition_timeout,
+            "max_connection_lifetime": self.max_connection_lifetime,
+            "fetch_size": self.fetch_size,
+        }
+
+
+class SharedNeo4jDriver(Neo4jDriver):
+    """graphiti Neo4jDriver running on a registry-owned neo4j driver.
+
+    Closing it (directly or through ``Graphiti.close``) leaves the shared
+    connection pool open; the registry closes that.
+    """
+
+    def __init__(self, client: AsyncDriver, config: Neo4jPoolConfig):
+        super().__init__(config.uri, config.user, config.password, config.database)
+        # Neo4jDriver always builds its own client; it opens no connections
+        # until used and is only kept so close() can release it
+        self._own_client, self.client = self.client, client
+
+    async def close(self):
+        shared, self.client = self.client, self._own_client
+        try:
+            await super().close()
+        finally:
+            self.client = shared
+
+
+@dataclass
+class _PoolEntry:
+    config: Neo4jPoolConfig
+    # neo4j AsyncDriver, or a blocking Driver for synchronous scripts
+    driver: Any
+    users: Dict[str, int] = field(default_factory=dict)
+
+
+class Neo4jDriverRegistry:
+    """One neo4j connection pool per server and user, shared in-process.
+
+    ``driver()`` hands out the raw neo4j AsyncDriver and ``graph_driver()`` a
+    graphiti driver for Graphiti / GraphitiCRUD; both reuse the same pool.
+    Blocking scripts get a synchronous driver from ``sync_driver()``, pooled
+    separately since the two driver kinds cannot share connections. The pool
+    settings of the first request for a server win.
+    """
+
+    def __init__(self, config: Optional[Neo4jPoolConfig] = None):
+        self.config = config
+        self._entries: Dict[Tuple[str, str, bool], _PoolEntry] = {}
+        self._lock = threading.Lock()
+
+    def _entry(
+        self, config: Optional[Neo4jPoolConfig], user: str, sync: bool = False
+    ) -> _PoolEntry:
+        if config is None:
+            if self.config is None:
+                self.config = Neo4jPoolConfig.from_env()
+            config = self.config
+        with self._lock:
+            key = (config.uri, config.user, sync)
+            entry = self._entries.get(key)
+            if entry is None:
+                logger.info(
+                    "Opening Neo4j pool for %s (max %d connections)",
+                    config.uri,
+                    config.max_connection_pool_size,
+                )
+                factory = GraphDatabase if sync else AsyncGraphDatabase
+                driver = factory.driver(config.uri, **config.driver_options())
+                entry = _PoolEntry(config, driver)
+                self._entries[key] = entry
+            entry.users[user] = entry.users.get(user, 0) + 1
+            return entry
+
+    def driver(
+        self, config: Optional[Neo4jPoolConfig] = None, user: str = "default"
+    ) -> AsyncDriver:
+        """Shared neo4j driver; ``user`` names the component for stats()"""
+        return self._entry(config, user).driver
+
+    def graph_driver(
+        self, config: Optional[Neo4jPoolConfig] = None, user: str = "default"
+    ) -> SharedNeo4jDriver:
+        entry = self._entry(config, user)
+        return SharedNeo4jDriver(entry.driver, entry.config)
+
+    def sync_driver(
+        self, config: Optional[Neo4jPoolConfig] = None, user: str = "default"
+    ) -> Any:
+        """Shared blocking neo4j Driver for synchronous scripts"""
+        return self._entry(config, user, sync=True).driver
+
+    def stats(self) -> Dict[str, dict]:
+        """Pool utilization per server: connections in use, idle and the limit"""
+        stats = {}
+        with self._lock:
+            entries = list(self._entries.values())
+        for entry in entries:
+            in_use = idle = 0
+            # The neo4j driver has no public pool metrics; its pool keeps
+            # the open connections per server address
+            pool = getattr(entry.driver, "_pool", None)
+            for connections in list(getattr(pool, "connections", {}).values()):
+                for connection in list(connections):
+                    if connection.in_use:
+                        in_use += 1
+                    else:
+                        idle += 1
+            size = entry.config.max_connection_pool_size
+            name = f"{entry.config.user}@{entry.config.uri}"
+            if not isinstance(entry.driver, AsyncDriver):
+                name += " (sync)"
+            stats[name] = {
+                "in_use": in_use,
+                "idle": idle,
+                "max_size": size,
+                "utilization": in_use / size if size else 0.0,
+                "users": dict(entry.users),
+            }
+        return stats
+
+    def _release(self, driver: Any, user: str) -> Optional[_PoolEntry]:
+        """Drop one hold of ``user``; returns the entry once nobody holds it"""
+        if isinstance(driver, SharedNeo4jDriver):
+            driver = driver.client
+        with self._lock:
+            for key, entry in self._entries.items():
+                if entry.driver is driver:
+                    break
+            else:
+                return None
+            count = entry.users.get(user, 0) - 1
+            if count > 0:
+                entry.users[user] = count
+            else:
+                entry.users.pop(user, None)
+            if entry.users:
+                return None
+            return self._entries.pop(key)
+
+    async def release(self, driver: Any, user: str = "default"):
+        """Give back a driver; its pool closes when its last user releases it"""
+        entry = self._release(driver, user)
+        if entry is not None:
+            await entry.driver.close()
+
+    def release_sync(self, driver: Any, user: str = "default"):
+        """Blocking variant of release() for drivers from ``sync_driver()``"""
+        entry = self._release(driver, user)
+        if entry is not None:
+            entry.driver.close()
+
+    def _take(self, sync: bool) -> list:
+        with self._lock:
+            keys = [key for key in self._entries if key[2] == sync]
+            return [self._entries.pop(key) for key in keys]
+
+    async def close(self):
+        """Close every pool, whoever still uses it; for process shutdown"""
+        self.close_sync()
+        for entry in self._take(sync=False):
+            await entry.driver.close()
+
+    def close_sync(self):
+        """Close every blocking pool; for process shutdown.
+
+        A component done with its own driver should call ``release_sync``
+        instead, which leaves pools other components still use open.
+        """
+        for entry in self._take(sync=True):
+            entry.driver.close()
+
+
+# Process-wide registry used by GraphitiCRUD, ChatMemory and the scripts
+drivers = Neo4jDriverRegistry()
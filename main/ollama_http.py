@@ -0,0 +1,137 @@
+import random
+import asyncio
+import logging
+from dataclasses import dataclass
+from typing import AsyncGenerator, Optional
+
+import httpx
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+logger = logging.getLogger(__name__)
+
+RETRY_STATUS_CODES = (429, 500, 502, 503, 504)
+
+
+@dataclass
+class HttpConfig:
+    connect_timeout: float = 5.0
+    read_timeout: float = 300.0
+    max_retries: int = 3
+    backoff_factor: float = 0.5
+    max_backoff: float = 30.0
+    max_connections: int = 10
+    max_keepalive_connections: int = 10
+
+
+def build_session(config: Optional[HttpConfig] = None) -> requests.Session:
+    """Build a keep-alive session with pooled connections and retries"""
+    config = config if config else HttpConfig()
+    retry = Retry(
+        total=config.max_retries,
+        backoff_factor=config.backoff_factor,
+        status_forcelist=RETRY_STATUS_CODES,
+        allowed_methods=frozenset(["GET", "POST"]),
+        raise_on_status=False,
+    )
+    adapter = HTTPAdapter(
+        pool_connections=config.max_connections,
+        pool_maxsize=config.max_connections,
+        max_retries=retry,
+    )
+    session = requests.Session()
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
+
+
+def backoff_delay(attempt: int, config: HttpConfig) -> float:
+    """Full-jitter exponential backoff for the given retry attempt"""
+    ceiling = min(config.max_backoff, config.backoff_factor * (2**attempt))
+    return random.uniform(0, ceiling)
+
+
+class AsyncOllamaHttp:
+    """Shared async HTTP client for Ollama with a keep-alive connection pool"""
+
+    def __init__(self, config: Optional[HttpConfig] = None):
+        self.config = config if config else HttpConfig()
+        self._client: Optional[httpx.AsyncClient] = None
+
+    @property
+    def client(self) -> httpx.AsyncClient:
+        if self._client is None or self._client.is_closed:
+            self._client = httpx.AsyncClient(
+                timeout=httpx.Timeout(
+                    self.config.read_timeout, connect=self.config.connect_timeout
+                ),
+                limits=httpx.Limits(
+                    max_connections=self.config.max_connections,
+                    max_keepalive_connections=self.config.max_keepalive_connections,
+                ),
+            )
+        return self._client
+
+    def _check_status(self, response: httpx.Response, attempt: int):
+        if (
+            response.status_code in RETRY_STATUS_CODES
+            and attempt < self.config.max_retries
+        ):
+            raise httpx.HTTPStatusError(
+                f"Retryable status {response.status_code}",
+                request=response.request,
+                response=response,
+            )
+        response.raise_for_status()
+
+    async def _backoff_or_raise(self, url: str, error: Exception, attempt: int):
+        retryable = isinstance(error, httpx.TransportError) or (
+            isinstance(error, httpx.HTTPStatusError)
+            and error.response.status_code in RETRY_STATUS_CODES
+        )
+        if not retryable or attempt >= self.config.max_retries:
+            raise error
+        delay = backoff_delay(attempt, self.config)
+        logger.warning(
+            "Retrying %s after %s (attempt %d, %.2fs)", url, error, attempt + 1, delay
+        )
+        await asyncio.sleep(delay)
+
+    async def post_json(self, url: str, body: dict) -> dict:
+        """POST a JSON body, retrying transport errors and retryable statuses"""
+        attempt = 0
+        while True:
+            try:
+                response = await self.client.post(url, json=body)
+                self._check_status(response, attempt)
+                return response.json()
+            except (httpx.TransportError, httpx.HTTPStatusError) as e:
+                await self._backoff_or_raise(url, e, attempt)
+                attempt += 1
+
+    async def stream_lines(self, url: str, body: dict) -> AsyncGenerator[str, None]:
+        """POST a JSON body and yield response lines as they arrive.
+
+        Only failures before the first line is received are retried.
+        """
+        attempt = 0
+        while True:
+            started = False
+            try:
+                async with self.client.stream("POST", url, json=body) as response:
+                    self._check_status(response, attempt)
+                    async for line in response.aiter_lines():
+                        started = True
+                        yield line
+                return
+            except (httpx.TransportError, httpx.HTTPStatusError) as e:
+                if started:
+                    raise
+                await self._backoff_or_raise(url, e, attempt)
+                attempt += 1
+
+    async def aclose(self):
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
@@ -0,0 +1,217 @@
+import json
+import time
+from dataclasses import dataclass, field
+from typing import AsyncGenerator, AsyncIterable, Callable, Generator, Iterable
+from typing import Optional, Union
+
+_DONE = object()
+
+
+@dataclass
+class StreamMetrics:
+    started_at: float = field(default_factory=time.perf_counter)
+    first_token_at: Optional[float] = None
+    finished_at: Optional[float] = None
+    token_count: int = 0
+    # Reported by Ollama in the final ``done`` message when available
+    eval_count: Optional[int] = None
+    eval_duration_ns: Optional[int] = None
+    prompt_eval_count: Optional[int] = None
+    # Set when the consumer cancelled generation before the model finished
+    stopped_early: bool = False
+
+    def mark_token(self):
+        if self.first_token_at is None:
+            self.first_token_at = time.perf_counter()
+        self.token_count += 1
+
+    def finish(self, final: Optional[dict] = None):
+        self.finished_at = time.perf_counter()
+        if final:
+            self.eval_count = final.get("eval_count", self.eval_count)
+            self.eval_duration_ns = final.get("eval_duration", self.eval_duration_ns)
+            self.prompt_eval_count = final.get(
+                "prompt_eval_count", self.prompt_eval_count
+            )
+
+    @property
+    def time_to_first_token(self) -> Optional[float]:
+        if self.first_token_at is None:
+            return None
+        return self.first_token_at - self.started_at
+
+    @property
+    def total_time(self) -> Optional[float]:
+        if self.finished_at is None:
+            return None
+        return self.finished_at - self.started_at
+
+    @property
+    def tokens_per_second(self) -> Optional[float]:
+        if self.eval_count and self.eval_duration_ns:
+            return self.eval_count / (self.eval_duration_ns / 1e9)
+        if self.first_token_at is None or self.finished_at is None:
+            return None
+        elapsed = self.finished_at - self.first_token_at
+        return self.token_count / elapsed if elapsed > 0 else None
+
+    def as_dict(self) -> dict:
+        return {
+            "time_to_first_token": self.time_to_first_token,
+            "total_time": self.total_time,
+            "tokens": self.eval_count or self.token_count,
+            "tokens_per_second": self.tokens_per_second,
+            "stopped_early": self.stopped_early,
+        }
+
+
+def generate_text(message: dict) -> str:
+    """Text fragment of an /api/generate stream message"""
+    return message.get("response", "")
+
+
+def chat_text(message: dict) -> str:
+    """Text fragment of an /api/chat (or OpenAI-compatible) stream message"""
+    if "message" in message:
+        return message["message"].get("content", "")
+    choices = message.get("choices") or [{}]
+    return choices[0].get("delta", {}).get("content", "") or ""
+
+
+def parse_stream_line(line: Union[str, bytes]) -> Optional[dict]:
+    """Decode one stream line; None for keep-alives, _DONE for ``[DONE]``.
+
+    Also accepts OpenAI-style ``data: ...`` server-sent event lines.
+    """
+    if isinstance(line, bytes):
+        line = line.decode("utf-8")
+    line = line.strip()
+    if line.startswith("data:"):
+        line = line[len("data:") :].strip()
+    if not line:
+        return None
+    if line == "[DONE]":
+        return _DONE
+    message = json.loads(line)
+    if message.get("error"):
+        raise RuntimeError(f"Ollama stream error: {message['error']}")
+    return message
+
+
+def iter_stream_text(
+    lines: Iterable[Union[str, bytes]],
+    extract: Callable[[dict], str],
+    metrics: Optional[StreamMetrics] = None,
+) -> Generator[str, None, None]:
+    """Yield text fragments from a newline-delimited JSON stream as they arrive"""
+    metrics = metrics if metrics else StreamMetrics()
+    final = None
+    for line in lines:
+        message = parse_stream_line(line)
+        if message is None:
+            continue
+        if message is _DONE:
+            break
+        fragment = extract(message)
+        if fragment:
+            metrics.mark_token()
+            yield fragment
+        if message.get("done"):
+            final = message
+            break
+    metrics.finish(final)
+
+
+async def aiter_stream_text(
+    lines: AsyncIterable[Union[str, bytes]],
+    extract: Callable[[dict], str],
+    metrics: Optional[StreamMetrics] = None,
+) -> AsyncGenerator[str, None]:
+    """Async variant of iter_stream_text"""
+    metrics = metrics if metrics else StreamMetrics()
+    final = None
+    async for line in lines:
+        message = parse_stream_line(line)
+        if message is None:
+            continue
+        if message is _DONE:
+            break
+        fragment = extract(message)
+        if fragment:
+            metrics.mark_token()
+            yield fragment
+        if message.get("done"):
+            final = message
+            break
+    metrics.finish(final)
+
+
+def split_stream(
+    fragments: Iterable[str], delimiter: str = "|||"
+) -> Generator[str, None, None]:
+    """Yield delimiter-separated segments as soon as each delimiter arrives"""
+    buffer = ""
+    for fragment in fragments:
+        buffer += fragment
+        while delimiter in buffer:
+            segment, buffer = buffer.split(delimiter, 1)
+            if segment.strip():
+                yield segment.strip()
+    if buffer.strip():
+        yield buffer.strip()
+
+
+class JsonObjectScanner:
+    """Incrementally finds the first complete top-level JSON object in a stream.
+
+    Tracks brace depth and string/escape state over the fed fragments so the
+    caller can stop reading as soon as the object closes, instead of waiting
+    for whatever the model generates after it.
+    """
+
+    def __init__(self):
+        self.buffer = ""
+        self.result: Optional[str] = None
+        self._pos = 0
+        self._start: Optional[int] = None
+        self._depth = 0
+        self._in_string = False
+        self._escape = False
+
+    def feed(self, fragment: str) -> Optional[str]:
+        """Add a fragment; return the object text once it is complete and valid"""
+        if self.result is not None:
+            return self.result
+        self.buffer += fragment
+        for i in range(self._pos, len(self.buffer)):
+            char = self.buffer[i]
+            if self._start is None:
+                if char == "{":
+                    self._start, self._depth = i, 1
+                continue
+            if self._in_string:
+                if self._escape:
+                    self._escape = False
+                elif char == "\\":
+                    self._escape = True
+                elif char == '"':
+                    self._in_string = False
+            elif char == '"':
+                self._in_string = True
+            elif char == "{":
+                self._depth += 1
+            elif char == "}":
+                self._depth -= 1
+                if self._depth == 0:
+                    candidate = self.buffer[self._start : i + 1]
+                    try:
+                        json.loads(candidate)
+                    except ValueError:
+                        # Balanced but not JSON; look for the next object
+                        self._start = None
+                        continue
+                    self._pos = i + 1
+                    self.result = candidate
+                    return candidate
+        self._pos = len(self.buffer)
+        return None
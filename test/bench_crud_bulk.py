@@ -0,0 +1,207 @@
+"""
+This script compares one-query-per-node writes with the batched `UNWIND` paths
+of `GraphitiCRUD` against a live Neo4j instance.
+
+Functionality:
+- Creates N entity and episodic nodes one at a time, then again through
+  `create_entity_nodes_bulk` / `create_episodic_nodes_bulk`, and prints
+  nodes/s for each.
+- Creates edges between those nodes the old way (check source, check target,
+  create: three round trips), with the single-statement `create_entity_edge`,
+  and with `create_entity_edges_bulk`, and prints edges/s for each.
+- Refreshes node summaries by read-modify-write (get, then save the whole
+  node), with the single `SET n += $props` update, and with
+  `update_entity_nodes_bulk`, and prints updates/s for each.
+- Creates nodes with name embeddings one at a time (`create_node_with_embedding`)
+  and in bulk with batched embedding (`create_entity_nodes_bulk(embed=True)`)
+  using an embedder that simulates per-call and per-text model cost.
+- Tags every node with a throwaway group id and deletes it afterwards.
+
+Requirements:
+- graphiti_core, neo4j
+- A running Neo4j reachable through NEO4J_URI / NEO4J_USER / NEO4J_PASSWORD
+- Custom modules: main.crud_graphiti, main.neo4j_pool
+
+Use Case:
+Run `python test/bench_crud_bulk.py --nodes 10000 --batch-size 1000` to size
+batches for large entity loads.
+"""
+
+import os
+import sys
+import time
+import uuid
+import asyncio
+import argparse
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from main.crud_graphiti import (
+    GraphitiCRUD,
+    ENTITY_EDGE_SAVE,
+    ENTITY_NODE_SAVE,
+    entity_edge_properties,
+    entity_properties,
+)
+from main.neo4j_pool import drivers
+
+
+class SimulatedEmbedder:
+    """Embedder with a fixed cost per call plus a cost per text"""
+
+    def __init__(self, call_seconds: float, text_seconds: float):
+        self.call_seconds = call_seconds
+        self.text_seconds = text_seconds
+
+    async def create_batch(self, texts):
+        await asyncio.sleep(self.call_seconds + self.text_seconds * len(texts))
+        return [[float(len(text)), 1.0, 0.0] for text in texts]
+
+
+async def one_at_a_time(crud: GraphitiCRUD, count: int) -> float:
+    start = time.perf_counter()
+    for i in range(count):
+        await crud.create_entity_node(f"Entity {i}", "benchmark")
+    return count / (time.perf_counter() - start)
+
+
+async def three_round_trip_edge(crud: GraphitiCRUD, source: str, target: str):
+    """The previous edge path: check both endpoints, then create"""
+    for uuid_ in (source, target):
+        await crud.driver.execute_query(
+            "MATCH (n:Entity {uuid: $uuid}) RETURN n.uuid AS uuid", uuid=uuid_
+        )
+    edge = crud._entity_edge(
+        {"source_node_uuid": source, "target_node_uuid": target, "name": "BENCH"}
+    )
+    await crud.driver.execute_query(
+        ENTITY_EDGE_SAVE,
+        source_uuid=source,
+        target_uuid=target,
+        edge=entity_edge_properties(edge),
+    )
+
+
+async def read_modify_write(crud: GraphitiCRUD, uuid_: str, summary: str):
+    """The previous update path: fetch the node, change it, save it whole"""
+    node = await crud.get_entity_node(uuid_)
+    node = node.model_copy(update={"summary": summary})
+    await crud.driver.execute_query(ENTITY_NODE_SAVE, node=entity_properties(node))
+
+
+async def edges_per_second(create, pairs) -> float:
+    start = time.perf_counter()
+    for source, target in pairs:
+        await create(source, target)
+    return len(pairs) / (time.perf_counter() - start)
+
+
+async def updates_per_second(update, uuids) -> float:
+    start = time.perf_counter()
+    for i, uuid_ in enumerate(uuids):
+        await update(uuid_, f"summary {i}")
+    return len(uuids) / (time.perf_counter() - start)
+
+
+async def run(args):
+    driver = drivers.graph_driver(user="bench_crud_bulk")
+    group_id = f"bench-{uuid.uuid4().hex[:8]}"
+    crud = GraphitiCRUD(driver, group_id=group_id, batch_size=args.batch_size)
+    try:
+        single = await one_at_a_time(crud, min(args.nodes, args.single_nodes))
+        print(f"[single] {single:.0f} entity nodes/s")
+
+        entities = [
+            {"name": f"Entity {i}", "summary": "bench"} for i in range(args.nodes)
+        ]
+        result = await crud.create_entity_nodes_bulk(entities)
+        uuids = [node.uuid for node in result.items]
+        print(
+            f"[bulk] {result.per_second:.0f} entity nodes/s "
+            f"({result.count} in {result.batches} batches, "
+            f"{result.per_second / single:.1f}x)"
+        )
+
+        episodes = [
+            {"name": f"Episode {i}", "content": "bench"} for i in range(args.nodes)
+        ]
+        result = await crud.create_episodic_nodes_bulk(episodes)
+        print(f"[bulk] {result.per_second:.0f} episodic nodes/s")
+
+        pairs = [
+            (uuids[i], uuids[(i + 1) % len(uuids)])
+            for i in range(min(len(uuids), args.single_nodes))
+        ]
+        legacy = await edges_per_second(
+            lambda s, t: three_round_trip_edge(crud, s, t), pairs
+        )
+        one_statement = await edges_per_second(
+            lambda s, t: crud.create_entity_edge(s, t, "BENCH"), pairs
+        )
+        print(f"[edges] three round trips: {legacy:.0f} edges/s")
+        print(
+            f"[edges] one statement: {one_statement:.0f} edges/s "
+            f"({one_statement / legacy:.1f}x)"
+        )
+        result = await crud.create_entity_edges_bulk(
+            {"source_node_uuid": s, "target_node_uuid": t, "name": "BENCH"}
+            for s, t in zip(uuids, uuids[1:] + uuids[:1])
+        )
+        print(
+            f"[edges] bulk: {result.per_second:.0f} edges/s "
+            f"({result.per_second / legacy:.1f}x), {len(result.failed)} failed"
+        )
+
+        sample = uuids[: args.single_nodes]
+        legacy = await updates_per_second(
+            lambda u, summary: read_modify_write(crud, u, summary), sample
+        )
+        partial = await updates_per_second(
+            lambda u, summary: crud.update_entity_node(u, summary=summary), sample
+        )
+        print(f"[updates] read-modify-write: {legacy:.0f} updates/s")
+        print(
+            f"[updates] SET n += $props: {partial:.0f} updates/s "
+            f"({partial / legacy:.1f}x)"
+        )
+        result = await crud.update_entity_nodes_bulk(
+            {u: {"summary": "refreshed"} for u in uuids}
+        )
+        print(
+            f"[updates] bulk: {result.per_second:.0f} updates/s "
+            f"({result.per_second / legacy:.1f}x), {len(result.failed)} failed"
+        )
+
+        crud.embedder = SimulatedEmbedder(
+            args.embed_call_ms / 1000, args.embed_text_ms / 1000
+        )
+        count = min(args.nodes, args.single_nodes)
+        start = time.perf_counter()
+        for i in range(count):
+            await crud.create_node_with_embedding(f"Embedded {i}")
+        per_node = count / (time.perf_counter() - start)
+        start = time.perf_counter()
+        result = await crud.create_entity_nodes_bulk(
+            ({"name": f"Embedded {i}"} for i in range(args.nodes)), embed=True
+        )
+        batched = result.count / (time.perf_counter() - start)
+        print(f"[embed] per node: {per_node:.0f} nodes/s")
+        print(f"[embed] batched: {batched:.0f} nodes/s ({batched / per_node:.1f}x)")
+        print(f"[pool] {drivers.stats()}")
+    finally:
+        await crud.delete_nodes_matching(group_id=group_id)
+        await drivers.close()
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--nodes", type=int, default=10000)
+    parser.add_argument("--single-nodes", type=int, default=1000)
+    parser.add_argument("--batch-size", type=int, default=1000)
+    parser.add_argument("--embed-call-ms", type=float, default=20.0)
+    parser.add_argument("--embed-text-ms", type=float, default=0.5)
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
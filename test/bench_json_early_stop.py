@@ -0,0 +1,88 @@
+"""
+This script measures the tokens and latency saved by stopping generation as
+soon as the JSON object of a graphiti extraction response is complete.
+
+Functionality:
+- Starts an in-process mock Ollama server that streams an extraction-style JSON
+  object followed by the free-text commentary models often append.
+- Runs the same prompts through a streaming `LocalAiClient` with and without
+  `stop_at_json` and prints tokens read and wall time per call.
+
+Requirements:
+- graphiti_core, httpx
+- Custom modules: main.local_ai_client, test/mock_ollama.py
+
+Use Case:
+Run `python test/bench_json_early_stop.py --trailing-tokens 80` to see how much
+generation is saved on chatty models.
+"""
+
+import os
+import sys
+import time
+import json
+import asyncio
+import argparse
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from graphiti_core.prompts import Message
+from graphiti_core.llm_client.config import LLMConfig
+from mock_ollama import MockOllamaServer
+from main.local_ai_client import LocalAiClient
+
+EXTRACTION = {
+    "extracted_entities": [
+        {"name": "Kamala Harris", "entity_type_id": 0},
+        {"name": "California", "entity_type_id": 0},
+        {"name": "San Francisco", "entity_type_id": 0},
+    ]
+}
+
+
+async def run(client: LocalAiClient, calls: int):
+    tokens = 0
+    start = time.perf_counter()
+    try:
+        for i in range(calls):
+            await client._generate_response([Message(role="user", content=str(i))])
+            tokens += client.last_stream_metrics.token_count
+    finally:
+        await client.close()
+    return tokens / calls, (time.perf_counter() - start) / calls
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--calls", type=int, default=5)
+    parser.add_argument("--trailing-tokens", type=int, default=60)
+    parser.add_argument("--token-delay", type=float, default=0.01)
+    args = parser.parse_args()
+
+    response = (
+        json.dumps(EXTRACTION) + " Note:" + " explanation" * (args.trailing_tokens - 1)
+    )
+    with MockOllamaServer(
+        responder=lambda body: response, token_delay=args.token_delay
+    ) as ollama:
+        config = LLMConfig(base_url=f"{ollama.url}/api/chat", temperature=0)
+        results = {}
+        for name, stop_at_json in (("full", False), ("early-stop", True)):
+            client = LocalAiClient(
+                config=config, stream=True, stop_at_json=stop_at_json
+            )
+            results[name] = asyncio.run(run(client, args.calls))
+            tokens, latency = results[name]
+            print(f"[{name}] {tokens:.0f} tokens/call, {latency * 1000:.0f} ms/call")
+
+    full_tokens, full_latency = results["full"]
+    early_tokens, early_latency = results["early-stop"]
+    print(
+        f"Saved {full_tokens - early_tokens:.0f} tokens "
+        f"({1 - early_tokens / full_tokens:.0%}) and "
+        f"{(full_latency - early_latency) * 1000:.0f} ms per call"
+    )
+
+
+if __name__ == "__main__":
+    main()
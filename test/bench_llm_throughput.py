@@ -0,0 +1,181 @@
+"""
+This script measures LLM client throughput and tail latency against the local
+mock Ollama server, so client performance work can be compared reproducibly.
+
+Functionality:
+- Starts an in-process mock Ollama server with configurable latency, jitter,
+  token rate, error rate and server-side parallelism/queue limits.
+- Drives one client path with a fixed number of concurrent workers (closed
+  loop): `LocalAiClient` buffered or streaming, or `MistralChunker` async or
+  blocking (the blocking path runs in worker threads).
+- Prints requests/s, completion tokens/s, p50/p95/p99/max latency and errors
+  by type; `--json` prints the same report as JSON for comparing runs.
+
+Requirements:
+- graphiti_core, httpx, requests
+- Custom modules: main.local_ai_client, main.llm_chunker, test/mock_ollama.py
+
+Use Case:
+Run `python test/bench_llm_throughput.py --target client --concurrency 16
+--max-parallel 4 --tokens-per-second 200` before and after a client change.
+"""
+
+import os
+import sys
+import json
+import time
+import asyncio
+import argparse
+from collections import Counter
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from graphiti_core.prompts import Message
+from graphiti_core.llm_client.config import LLMConfig as GraphitiLLMConfig
+from mock_ollama import MockOllamaServer
+from main.llm_chunker import MistralChunker, LLMConfig, ChunkingConfig
+from main.local_ai_client import LocalAiClient
+
+TARGETS = ("client", "client-stream", "chunker", "chunker-sync")
+
+
+def json_response(tokens: int) -> str:
+    """A JSON object of roughly ``tokens`` whitespace-separated tokens"""
+    words = ", ".join(f'"entity {i}"' for i in range(max(1, tokens // 2)))
+    return '{"extracted_entities": [' + words + "]}"
+
+
+def percentile(values, pct: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(pct / 100 * len(ordered)))]
+
+
+def make_call(target: str, url: str):
+    """Return (call(i) coroutine function, async close function) for a target"""
+    if target.startswith("client"):
+        client = LocalAiClient(
+            config=GraphitiLLMConfig(base_url=f"{url}/api/chat", temperature=0),
+            stream=target == "client-stream",
+        )
+
+        async def call(i: int):
+            await client._generate_response([Message(role="user", content=str(i))])
+
+        return call, client.close
+
+    chunker = MistralChunker(
+        LLMConfig(base_url=f"{url}/api/generate"), ChunkingConfig()
+    )
+    if target == "chunker":
+
+        async def call(i: int):
+            await chunker._acall_mistral(f"Request {i}")
+
+    else:
+
+        async def call(i: int):
+            await asyncio.to_thread(chunker._call_mistral, f"Request {i}")
+
+    return call, chunker.aclose
+
+
+async def run(target: str, url: str, requests: int, concurrency: int) -> dict:
+    call, close = make_call(target, url)
+    latencies, errors = [], Counter()
+    remaining = iter(range(requests))
+
+    async def worker():
+        for i in remaining:
+            start = time.perf_counter()
+            try:
+                await call(i)
+            except Exception as e:
+                errors[type(e).__name__] += 1
+            else:
+                latencies.append(time.perf_counter() - start)
+
+    start = time.perf_counter()
+    try:
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+    finally:
+        await close()
+    return {
+        "elapsed": time.perf_counter() - start,
+        "latencies": latencies,
+        "errors": errors,
+    }
+
+
+def report(target: str, result: dict, tokens: int) -> dict:
+    elapsed, latencies = result["elapsed"], result["latencies"]
+    return {
+        "target": target,
+        "requests": len(latencies) + sum(result["errors"].values()),
+        "ok": len(latencies),
+        "elapsed_s": round(elapsed, 3),
+        "requests_per_s": round(len(latencies) / elapsed, 2),
+        "tokens_per_s": round(tokens / elapsed, 1),
+        "latency_ms": {
+            name: round(percentile(latencies, pct) * 1000, 1)
+            for name, pct in (("p50", 50), ("p95", 95), ("p99", 99), ("max", 100))
+        },
+        "errors": dict(result["errors"]),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--target", choices=TARGETS + ("all",), default="all")
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--latency", type=float, default=0.02)
+    parser.add_argument("--latency-jitter", type=float, default=0.0)
+    parser.add_argument("--tokens-per-second", type=float, default=None)
+    parser.add_argument("--response-tokens", type=int, default=40)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--max-parallel", type=int, default=None)
+    parser.add_argument("--max-queue", type=int, default=None)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--json", action="store_true", help="Print JSON reports")
+    args = parser.parse_args()
+
+    response = json_response(args.response_tokens)
+    targets = TARGETS if args.target == "all" else (args.target,)
+    reports = []
+    for target in targets:
+        # A fresh server per target so counters and queues start empty
+        with MockOllamaServer(
+            latency=args.latency,
+            responder=lambda body: response,
+            tokens_per_second=args.tokens_per_second,
+            latency_jitter=args.latency_jitter,
+            error_rate=args.error_rate,
+            max_parallel=args.max_parallel,
+            max_queue=args.max_queue,
+            seed=args.seed,
+        ) as ollama:
+            result = asyncio.run(
+                run(target, ollama.url, args.requests, args.concurrency)
+            )
+            reports.append(report(target, result, ollama.tokens_generated))
+            reports[-1]["server_max_in_flight"] = ollama.max_in_flight
+            reports[-1]["server_rejected"] = ollama.rejected
+
+    if args.json:
+        print(json.dumps(reports, indent=2))
+        return
+    for r in reports:
+        latency = r["latency_ms"]
+        print(
+            f"[{r['target']}] {r['ok']}/{r['requests']} ok in {r['elapsed_s']:.2f}s: "
+            f"{r['requests_per_s']:.1f} req/s, {r['tokens_per_s']:.0f} tokens/s, "
+            f"p50 {latency['p50']:.0f} ms, p95 {latency['p95']:.0f} ms, "
+            f"p99 {latency['p99']:.0f} ms, max {latency['max']:.0f} ms"
+            + (f", errors {r['errors']}" if r["errors"] else "")
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,85 @@
+"""
+This script benchmarks concurrent `add_episode`-style LLM load through
+`LocalAiClient` against a local mock Ollama server.
+
+Functionality:
+- Starts an in-process mock Ollama server with a fixed per-request latency.
+- Simulates the LLM fan-out of graphiti's `add_episode` (node extraction,
+  parallel dedup calls, edge extraction) for several episodes at once.
+- Compares the old blocking transport (synchronous `requests.post` inside the
+  event loop) with the pooled async transport and prints episodes/s.
+
+Requirements:
+- graphiti_core, httpx, requests
+- Custom modules: main.local_ai_client, test/mock_ollama.py
+
+Use Case:
+Run `python test/bench_local_ai_client.py` to see the throughput gained by
+not blocking the event loop on LLM calls.
+"""
+
+import os
+import sys
+import time
+import asyncio
+import argparse
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from graphiti_core.prompts import Message
+from graphiti_core.llm_client.config import LLMConfig
+from mock_ollama import MockOllamaServer
+from main.local_ai_client import LocalAiClient
+
+
+class BlockingLocalAiClient(LocalAiClient):
+    """The previous behaviour: a blocking HTTP call inside the coroutine"""
+
+    async def _generate_response(self, messages, *args, **kwargs):
+        return self.execute_llm_query(messages)
+
+
+async def add_episode_load(client: LocalAiClient, episode: int, fan_out: int):
+    """LLM calls issued by one add_episode: extract, dedup in parallel, extract"""
+    prompt = [Message(role="user", content=f"Episode {episode}")]
+    await client._generate_response(prompt)
+    await asyncio.gather(*(client._generate_response(prompt) for _ in range(fan_out)))
+    await client._generate_response(prompt)
+
+
+async def run(client: LocalAiClient, episodes: int, fan_out: int) -> float:
+    start = time.perf_counter()
+    try:
+        await asyncio.gather(
+            *(add_episode_load(client, episode, fan_out) for episode in range(episodes))
+        )
+    finally:
+        await client.close()
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--episodes", type=int, default=8)
+    parser.add_argument("--fan-out", type=int, default=4)
+    parser.add_argument("--latency", type=float, default=0.05)
+    args = parser.parse_args()
+
+    with MockOllamaServer(
+        latency=args.latency, responder=lambda body: '{"entities": []}'
+    ) as ollama:
+        config = LLMConfig(base_url=f"{ollama.url}/api/chat", temperature=0)
+        for name, client_class in (
+            ("blocking", BlockingLocalAiClient),
+            ("async", LocalAiClient),
+        ):
+            client = client_class(config=config)
+            elapsed = asyncio.run(run(client, args.episodes, args.fan_out))
+            print(
+                f"[{name}] {args.episodes} episodes in {elapsed:.2f}s "
+                f"({args.episodes / elapsed:.2f} episodes/s)"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,184 @@
+"""
+This script compares vector-index similarity search in `GraphitiCRUD` with
+brute-force scanning on a large synthetic entity graph in a live Neo4j.
+
+Functionality:
+- Loads N entities with clustered random name embeddings under a throwaway
+  group id and creates (or reuses) the entity vector index.
+- Answers Q nearest-neighbour queries four ways: scanning all embeddings in
+  Python after fetching them once, an exact Cypher scan with
+  `vector.similarity.cosine`, `find_similar_entities` one query at a time,
+  and `find_similar_entities_batch`.
+- Prints queries/s for each and the recall@k of the index against the exact
+  Python scan.
+- Deletes the synthetic entities afterwards, and the index if it created it.
+
+Requirements:
+- graphiti_core, neo4j
+- A running Neo4j 5.18+ reachable through NEO4J_URI / NEO4J_USER / NEO4J_PASSWORD
+- Custom modules: main.crud_graphiti, main.neo4j_pool
+
+Use Case:
+Run `python test/bench_vector_search.py --nodes 100000 --queries 200` to see
+what the vector index buys over scanning for entity deduplication lookups.
+"""
+
+import os
+import sys
+import time
+import uuid
+import heapq
+import random
+import asyncio
+import argparse
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from main.crud_graphiti import GraphitiCRUD, VectorIndexConfig
+from main.neo4j_pool import drivers
+
+EXACT_SEARCH = """
+MATCH (n:Entity {group_id: $group_id})
+WITH n, vector.similarity.cosine(n.name_embedding, $vector) AS score
+ORDER BY score DESC
+LIMIT $k
+RETURN n.uuid AS uuid
+"""
+
+FETCH_EMBEDDINGS = """
+MATCH (n:Entity {group_id: $group_id})
+RETURN n.uuid AS uuid, n.name_embedding AS embedding
+"""
+
+
+def unit(vector):
+    norm = sum(x * x for x in vector) ** 0.5
+    return [x / norm for x in vector]
+
+
+def synthetic_vectors(rng, count, dims, clusters, noise=0.3):
+    """Clustered unit vectors, so neighbours are meaningful"""
+    centers = [[rng.gauss(0, 1) for _ in range(dims)] for _ in range(clusters)]
+    return [
+        unit([c + rng.gauss(0, noise) for c in rng.choice(centers)])
+        for _ in range(count)
+    ]
+
+
+def python_scan(embeddings, vector, k):
+    return [
+        uuid_
+        for _, uuid_ in heapq.nlargest(
+            k,
+            (
+                (sum(a * b for a, b in zip(embedding, vector)), uuid_)
+                for uuid_, embedding in embeddings
+            ),
+        )
+    ]
+
+
+def recall(found, exact):
+    hits = sum(len(set(f) & set(e)) for f, e in zip(found, exact))
+    return hits / sum(len(e) for e in exact)
+
+
+async def run(args):
+    rng = random.Random(args.seed)
+    group_id = f"bench-{uuid.uuid4().hex[:8]}"
+    driver = drivers.graph_driver(user="bench_vector_search")
+    crud = GraphitiCRUD(
+        driver,
+        group_id=group_id,
+        batch_size=args.batch_size,
+        vector_index=VectorIndexConfig(dimensions=args.dims),
+    )
+    status = await crud.vector_index_status()
+    if status is not None:
+        # Reuse the existing index; vectors must match its dimensions
+        crud.vector_index.dimensions = int(
+            status["options"]["indexConfig"]["vector.dimensions"]
+        )
+        print(f"[index] reusing {status['name']} ({crud.vector_index.dimensions}d)")
+    dims = crud.vector_index.dimensions
+    try:
+        start = time.perf_counter()
+        vectors = synthetic_vectors(rng, args.nodes, dims, args.clusters)
+        result = await crud.create_entity_nodes_bulk(
+            {"name": f"Entity {i}", "name_embedding": vector}
+            for i, vector in enumerate(vectors)
+        )
+        del vectors
+        print(f"[load] {result.count} entities in {time.perf_counter() - start:.1f}s")
+
+        start = time.perf_counter()
+        await crud.create_vector_index(wait=True)
+        print(f"[index] ready in {time.perf_counter() - start:.1f}s")
+
+        queries = synthetic_vectors(rng, args.queries, dims, args.clusters)
+        filters = {"group_id": group_id}
+
+        start = time.perf_counter()
+        records = (
+            await driver.execute_query(FETCH_EMBEDDINGS, group_id=group_id)
+        ).records
+        embeddings = [(r["uuid"], r["embedding"]) for r in records]
+        fetch = time.perf_counter() - start
+        start = time.perf_counter()
+        exact = [python_scan(embeddings, q, args.k) for q in queries]
+        scan = time.perf_counter() - start
+        del embeddings, records
+        print(
+            f"[python scan] {len(queries) / scan:.1f} queries/s "
+            f"(+{fetch:.1f}s to fetch all embeddings)"
+        )
+
+        start = time.perf_counter()
+        for q in queries:
+            await driver.execute_query(
+                EXACT_SEARCH, group_id=group_id, vector=q, k=args.k
+            )
+        cypher = len(queries) / (time.perf_counter() - start)
+        print(f"[cypher scan] {cypher:.1f} queries/s")
+
+        start = time.perf_counter()
+        single = [await crud.find_similar_entities(q, args.k, filters) for q in queries]
+        per_query = len(queries) / (time.perf_counter() - start)
+        found = [[node.uuid for node, _ in hits] for hits in single]
+        print(
+            f"[index] {per_query:.1f} queries/s ({per_query / cypher:.1f}x cypher "
+            f"scan), recall@{args.k} {recall(found, exact):.3f}"
+        )
+
+        crud.batch_size = args.query_batch
+        start = time.perf_counter()
+        batched = await crud.find_similar_entities_batch(queries, args.k, filters)
+        per_batch = len(queries) / (time.perf_counter() - start)
+        found = [[node.uuid for node, _ in hits] for hits in batched]
+        print(
+            f"[index batch] {per_batch:.1f} queries/s ({per_batch / cypher:.1f}x "
+            f"cypher scan), recall@{args.k} {recall(found, exact):.3f}"
+        )
+    finally:
+        crud.batch_size = args.batch_size
+        await crud.delete_nodes_matching(label="Entity", group_id=group_id)
+        if status is None:
+            await crud.drop_vector_index()
+        await drivers.close()
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--nodes", type=int, default=50000)
+    parser.add_argument("--dims", type=int, default=1024)
+    parser.add_argument("--clusters", type=int, default=100)
+    parser.add_argument("--queries", type=int, default=100)
+    parser.add_argument("--k", type=int, default=10)
+    parser.add_argument("--batch-size", type=int, default=1000)
+    parser.add_argument("--query-batch", type=int, default=50)
+    parser.add_argument("--seed", type=int, default=7)
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,76 @@
+"""
+An in-memory stand-in for the graphiti / neo4j async driver used by the
+`GraphitiCRUD` and `GraphTransfer` tests.
+
+Functionality:
+- Records every `execute_query` call in `queries` and every statement run in
+  an explicit transaction in `runs`, with its parameters.
+- Answers both from a `respond(query, params)` callable returning result rows.
+- Counts commits and rollbacks, and fails chosen transaction runs (by their
+  1-based position in `runs`) or every `execute_query` once `error` is set.
+
+Use Case:
+Used to test Cypher batching, transactions and result handling without a
+running Neo4j instance.
+"""
+
+
+class FakeResult:
+    def __init__(self, rows):
+        self.rows = rows
+
+    async def data(self):
+        return self.rows
+
+
+class FakeTransaction:
+    def __init__(self, driver):
+        self.driver = driver
+
+    async def run(self, query, **params):
+        self.driver.runs.append((query, params))
+        if len(self.driver.runs) in self.driver.failing_runs:
+            raise ConnectionError("connection lost")
+        return FakeResult(self.driver.respond(query, params))
+
+    async def commit(self):
+        self.driver.commits += 1
+
+    async def rollback(self):
+        self.driver.rollbacks += 1
+
+
+class FakeSession:
+    def __init__(self, driver):
+        self.driver = driver
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+    async def begin_transaction(self):
+        return FakeTransaction(self.driver)
+
+
+class FakeDriver:
+    """Records queries; ``respond(query, params)`` supplies result rows"""
+
+    def __init__(self, respond=lambda query, params: [], failing_runs=()):
+        self.respond = respond
+        self.failing_runs = set(failing_runs)
+        self.queries = []
+        self.runs = []
+        self.commits = 0
+        self.rollbacks = 0
+        self.error = None
+
+    async def execute_query(self, query, **params):
+        self.queries.append((query, params))
+        if self.error is not None:
+            raise self.error
+        return self.respond(query, params)
+
+    def session(self):
+        return FakeSession(self)
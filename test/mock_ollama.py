@@ -0,0 +1,311 @@
+"""
+An in-process mock of the Ollama HTTP API for tests and benchmarks.
+
+Functionality:
+- Serves `POST /api/generate` and `POST /api/chat` from a background thread on a
+  free local port, either as one JSON body or as a newline-delimited JSON stream,
+  plus deterministic vectors from `POST /api/embed`.
+- Simulates inference time with a fixed per-request latency (optionally with
+  random jitter) and a per-token delay or token rate; final messages report
+  `prompt_eval_count`, `eval_count` and `eval_duration` like Ollama does.
+- Injects error statuses for the next requests, at a random error rate, or for
+  every request while `unavailable` is set.
+- Limits concurrency like `OLLAMA_NUM_PARALLEL` / `OLLAMA_MAX_QUEUE`: requests
+  beyond `max_parallel` wait, and beyond `max_queue` waiting ones get a 503.
+- Serves `GET /api/version` for health checks.
+- Records requests, concurrent in-flight requests and opened TCP connections
+  so tests can assert on concurrency limits and connection reuse.
+
+Use Case:
+Used by the LLM client and chunker tests and by the `bench_*.py` scripts to
+exercise HTTP code paths reproducibly without a live Ollama instance. Run
+`python test/mock_ollama.py --port 11434` to point the scripts under `main/` at
+it instead of a real server.
+"""
+
+import json
+import re
+import time
+import random
+import hashlib
+import argparse
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+def split_sentences_responder(body: dict) -> str:
+    """Answer a chunking prompt by splitting its text on sentence boundaries"""
+    text = body.get("prompt", "").rsplit("Text:", 1)[-1]
+    sentences = re.split(r"(?<=[.!?])\s+", text.strip())
+    return " ||| ".join(s for s in sentences if s)
+
+
+def fake_embedding(text: str, dimensions: int = 8) -> list:
+    """Deterministic unit-length vector derived from the text"""
+    digest = hashlib.sha256(text.encode("utf-8")).digest()
+    vector = [b - 127.5 for b in digest[:dimensions]]
+    norm = sum(v * v for v in vector) ** 0.5 or 1.0
+    return [v / norm for v in vector]
+
+
+class MockOllamaServer:
+    def __init__(
+        self,
+        latency: float = 0.0,
+        responder=split_sentences_responder,
+        token_delay: float = 0.0,
+        errors=(),
+        tokens_per_second: float = None,
+        latency_jitter: float = 0.0,
+        error_rate: float = 0.0,
+        error_status: int = 503,
+        max_parallel: int = None,
+        max_queue: int = None,
+        seed: int = None,
+        port: int = 0,
+    ):
+        self.latency = latency
+        self.latency_jitter = latency_jitter
+        # Status codes returned, in order, by the next requests
+        self.errors = list(errors)
+        self.error_rate = error_rate
+        self.error_status = error_status
+        self.token_delay = 1.0 / tokens_per_second if tokens_per_second else token_delay
+        self.responder = responder
+        self.max_queue = max_queue
+        self.requests = []
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.queued = 0
+        self.rejected = 0
+        self.tokens_generated = 0
+        self.connections = 0
+        # While set, every request (including health checks) gets a 503
+        self.unavailable = False
+        self._random = random.Random(seed)
+        self._slots = threading.Semaphore(max_parallel) if max_parallel else None
+        self._lock = threading.Lock()
+        self._server = ThreadingHTTPServer(("127.0.0.1", port), self._handler_class())
+        self._server.daemon_threads = True
+        self._thread = None
+
+    @property
+    def url(self) -> str:
+        host, port = self._server.server_address
+        return f"http://{host}:{port}"
+
+    def _injected_error(self):
+        with self._lock:
+            if self.errors:
+                return self.errors.pop(0)
+            if self.unavailable:
+                return 503
+            if self.error_rate and self._random.random() < self.error_rate:
+                return self.error_status
+        return None
+
+    def _acquire_slot(self) -> bool:
+        """Wait for a parallel slot; False when the wait queue is full"""
+        if self._slots is None:
+            return True
+        if self._slots.acquire(blocking=False):
+            return True
+        with self._lock:
+            if self.max_queue is not None and self.queued >= self.max_queue:
+                self.rejected += 1
+                return False
+            self.queued += 1
+        self._slots.acquire()
+        with self._lock:
+            self.queued -= 1
+        return True
+
+    def _release_slot(self):
+        if self._slots is not None:
+            self._slots.release()
+
+    def _simulated_latency(self) -> float:
+        with self._lock:
+            jitter = self._random.uniform(0, self.latency_jitter)
+        return self.latency + jitter
+
+    def _handler_class(self):
+        mock = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def setup(self):
+                super().setup()
+                with mock._lock:
+                    mock.connections += 1
+
+            def log_message(self, format, *args):
+                pass
+
+            def do_GET(self):
+                if mock.unavailable:
+                    self._send_json({"error": "unavailable"}, status=503)
+                elif self.path == "/api/version":
+                    self._send_json({"version": "mock"})
+                else:
+                    self._send_json({"error": "not found"}, status=404)
+
+            def do_POST(self):
+                length = int(self.headers.get("Content-Length", 0))
+                body = json.loads(self.rfile.read(length) or b"{}")
+                with mock._lock:
+                    mock.requests.append((self.path, body))
+                error = mock._injected_error()
+                if error is not None:
+                    self._send_json({"error": "injected error"}, status=error)
+                    return
+                if self.path == "/api/embed":
+                    self._embed(body)
+                    return
+                if not mock._acquire_slot():
+                    self._send_json(
+                        {"error": "server busy, maximum pending requests exceeded"},
+                        status=503,
+                    )
+                    return
+                with mock._lock:
+                    mock.in_flight += 1
+                    mock.max_in_flight = max(mock.max_in_flight, mock.in_flight)
+                try:
+                    time.sleep(mock._simulated_latency())
+                    text = mock.responder(body)
+                    if body.get("stream", True):
+                        self._stream(body, text)
+                    else:
+                        time.sleep(mock.token_delay * len(self._tokens(text)))
+                        self._send_json(self._message(body, text, done=True))
+                finally:
+                    with mock._lock:
+                        mock.in_flight -= 1
+                    mock._release_slot()
+
+            @staticmethod
+            def _tokens(text):
+                return re.findall(r"\S+\s*", text)
+
+            def _embed(self, body):
+                inputs = body.get("input", [])
+                if isinstance(inputs, str):
+                    inputs = [inputs]
+                self._send_json(
+                    {
+                        "model": body.get("model"),
+                        "embeddings": [fake_embedding(t) for t in inputs],
+                    }
+                )
+
+            def _message(self, body, text, done, completion=None):
+                message = {"model": body.get("model"), "done": done}
+                if self.path.endswith("/chat"):
+                    message["message"] = {"role": "assistant", "content": text}
+                else:
+                    message["response"] = text
+                if done:
+                    # The final stream message carries the counts for the whole
+                    # completion rather than for its own (empty) text
+                    completion = text if completion is None else completion
+                    prompt = body.get("prompt") or " ".join(
+                        m.get("content", "") for m in body.get("messages", [])
+                    )
+                    tokens = len(completion.split())
+                    with mock._lock:
+                        mock.tokens_generated += tokens
+                    message["prompt_eval_count"] = len(prompt.split())
+                    message["eval_count"] = tokens
+                    if mock.token_delay:
+                        message["eval_duration"] = int(tokens * mock.token_delay * 1e9)
+                return message
+
+            def _send_json(self, payload, status=200):
+                data = json.dumps(payload).encode()
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def _write_chunk(self, data: bytes):
+                self.wfile.write(f"{len(data):x}\r\n".encode() + data + b"\r\n")
+                self.wfile.flush()
+
+            def _stream(self, body, text):
+                self.send_response(200)
+                self.send_header("Content-Type", "application/x-ndjson")
+                self.send_header("Transfer-Encoding", "chunked")
+                self.end_headers()
+                try:
+                    for token in self._tokens(text):
+                        time.sleep(mock.token_delay)
+                        line = json.dumps(self._message(body, token, done=False))
+                        self._write_chunk(line.encode() + b"\n")
+                    final = self._message(body, "", done=True, completion=text)
+                    self._write_chunk(json.dumps(final).encode() + b"\n")
+                    self._write_chunk(b"")
+                except (BrokenPipeError, ConnectionResetError):
+                    # The client stopped reading early
+                    self.close_connection = True
+
+        return Handler
+
+    def start(self):
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc, tb):
+        self.stop()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve a mock Ollama API")
+    parser.add_argument("--port", type=int, default=11434)
+    parser.add_argument("--latency", type=float, default=0.2)
+    parser.add_argument("--latency-jitter", type=float, default=0.0)
+    parser.add_argument("--tokens-per-second", type=float, default=None)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--max-parallel", type=int, default=None)
+    parser.add_argument("--max-queue", type=int, default=None)
+    parser.add_argument(
+        "--response",
+        default=None,
+        help="Fixed completion text; by default chunking prompts are split",
+    )
+    args = parser.parse_args()
+
+    responder = split_sentences_responder
+    if args.response is not None:
+        responder = lambda body: args.response
+    server = MockOllamaServer(
+        latency=args.latency,
+        responder=responder,
+        tokens_per_second=args.tokens_per_second,
+        latency_jitter=args.latency_jitter,
+        error_rate=args.error_rate,
+        max_parallel=args.max_parallel,
+        max_queue=args.max_queue,
+        port=args.port,
+    )
+    print(f"Mock Ollama listening on {server.url}")
+    try:
+        server._server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server._server.server_close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,203 @@
+"""
+This test suite validates checkpointed, resumable chunking jobs.
+
+Functionality:
+- Verifies that finished documents and their chunks are recorded in the
+  checkpoint and skipped when the job is restarted.
+- Checks that a failed document is retried on the next run.
+- Confirms that changing the chunking config invalidates previous checkpoints.
+- Runs two workers against the same manifest and asserts no document is
+  chunked twice.
+- Checks that a worker whose expired lease was taken over does not record
+  its chunks, while a slow worker nobody took over still finishes.
+- Verifies that a restarted worker resumes the document it had leased when
+  it crashed.
+- Checks that identical texts under different document ids are checkpointed
+  apart.
+
+Requirements:
+- pytest
+- Custom modules: main.chunking_job, main.llm_chunker
+
+Use Case:
+Used to make long chunking runs over large document sets survive crashes and
+endpoint timeouts.
+"""
+
+import time
+import threading
+import pytest
+from main.chunking_job import ChunkingJob
+from main.llm_chunker import MistralChunker, LLMConfig, ChunkingConfig
+
+DOCUMENTS = [
+    (f"doc-{i}", f"Document {i} first paragraph.\nDocument {i} second paragraph.")
+    for i in range(6)
+]
+
+
+class CountingChunker(MistralChunker):
+    """Chunker that records calls and can fail on chosen documents"""
+
+    def __init__(self, config=None, fail_on=()):
+        super().__init__(LLMConfig(), config or ChunkingConfig(min_tokens=1))
+        self.fail_on = set(fail_on)
+        self.calls = []
+        self._lock = threading.Lock()
+
+    def chunk_document(self, text):
+        with self._lock:
+            self.calls.append(text)
+        for marker in self.fail_on:
+            if marker in text:
+                raise RuntimeError("LLM endpoint timed out")
+        return super().chunk_document(text)
+
+
+@pytest.fixture
+def checkpoint(tmp_path):
+    return str(tmp_path / "job.sqlite")
+
+
+def test_restart_skips_finished_documents(checkpoint):
+    first = ChunkingJob(CountingChunker(), checkpoint)
+    assert first.run(DOCUMENTS[:3])["done"] == 3
+    first.close()
+
+    chunker = CountingChunker()
+    job = ChunkingJob(chunker, checkpoint)
+    summary = job.run(DOCUMENTS)
+
+    assert summary == {"done": 3, "skipped": 3, "busy": 0, "failed": 0, "lost": 0}
+    assert len(chunker.calls) == 3
+    chunks = job.chunks_for(*DOCUMENTS[0])
+    assert [c["text"] for c in chunks] == [
+        "Document 0 first paragraph. Document 0 second paragraph."
+    ]
+    assert chunks[0]["doc_id"] == "doc-0"
+    assert job.progress() == {"done": 6}
+
+
+def test_failed_documents_are_retried(checkpoint):
+    job = ChunkingJob(CountingChunker(fail_on=["Document 2 "]), checkpoint)
+    assert job.run(DOCUMENTS)["failed"] == 1
+    assert job.chunks_for(*DOCUMENTS[2]) is None
+    assert job.progress() == {"done": 5, "failed": 1}
+
+    chunker = CountingChunker()
+    summary = ChunkingJob(chunker, checkpoint).run(DOCUMENTS)
+
+    assert summary["done"] == 1 and summary["skipped"] == 5
+    assert chunker.calls == [DOCUMENTS[2][1]]
+
+
+def test_config_change_invalidates_checkpoint(checkpoint):
+    ChunkingJob(CountingChunker(), checkpoint).run(DOCUMENTS)
+
+    chunker = CountingChunker(ChunkingConfig(min_tokens=1, max_tokens=4))
+    summary = ChunkingJob(chunker, checkpoint).run(DOCUMENTS)
+
+    assert summary["done"] == len(DOCUMENTS)
+
+
+def test_workers_share_manifest_without_duplicates(checkpoint, tmp_path):
+    paths = []
+    for doc_id, text in DOCUMENTS:
+        path = tmp_path / f"{doc_id}.txt"
+        path.write_text(text, encoding="utf-8")
+        paths.append(str(path))
+    manifest = tmp_path / "manifest.txt"
+    manifest.write_text("\n".join(paths), encoding="utf-8")
+
+    chunker = CountingChunker()
+    jobs = [ChunkingJob(chunker, checkpoint, worker_id=f"w{i}") for i in range(2)]
+    summaries = []
+    threads = [
+        threading.Thread(target=lambda j=j: summaries.append(j.run_manifest(manifest)))
+        for j in jobs
+    ]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert sorted(chunker.calls) == sorted(text for _, text in DOCUMENTS)
+    assert sum(s["done"] for s in summaries) == len(DOCUMENTS)
+
+
+class LeaseStealingChunker(CountingChunker):
+    """Lets another worker take over the document while it is being chunked"""
+
+    def __init__(self, thief):
+        super().__init__()
+        self.thief = thief
+
+    def chunk_document(self, text):
+        records = super().chunk_document(text)
+        self.thief.run([("doc-0", text)])
+        return records
+
+
+def test_expired_lease_discards_the_result(checkpoint):
+    thief = ChunkingJob(CountingChunker(), checkpoint, worker_id="thief")
+    job = ChunkingJob(
+        LeaseStealingChunker(thief), checkpoint, lease_seconds=0, worker_id="slow"
+    )
+
+    summary = job.run(DOCUMENTS[:1])
+
+    assert summary["lost"] == 1 and summary["done"] == 0
+    assert job.progress() == {"done": 1}
+    row = job._conn.execute("SELECT worker FROM documents").fetchone()
+    assert row == ("thief",)
+    assert len(job.chunks_for(*DOCUMENTS[0])) == 1
+
+
+class SlowChunker(CountingChunker):
+    def chunk_document(self, text):
+        time.sleep(0.3)
+        return super().chunk_document(text)
+
+
+def test_slow_document_finishes_after_its_lease_expires(checkpoint):
+    job = ChunkingJob(SlowChunker(), checkpoint, lease_seconds=0.2)
+
+    summary = job.run(DOCUMENTS[:1])
+
+    assert summary["done"] == 1 and summary["lost"] == 0
+    assert job.progress() == {"done": 1}
+
+
+class CrashingChunker(CountingChunker):
+    def chunk_document(self, text):
+        raise KeyboardInterrupt
+
+
+def test_restart_resumes_the_document_leased_before_a_crash(checkpoint):
+    crashed = ChunkingJob(CrashingChunker(), checkpoint)
+    with pytest.raises(KeyboardInterrupt):
+        crashed.run(DOCUMENTS[:1])
+    crashed.close()
+    assert (
+        ChunkingJob(CountingChunker(), checkpoint, worker_id="other").run(
+            DOCUMENTS[:1]
+        )["busy"]
+        == 1
+    )
+
+    chunker = CountingChunker()
+    summary = ChunkingJob(chunker, checkpoint).run(DOCUMENTS[:1])
+
+    assert summary["done"] == 1 and chunker.calls == [DOCUMENTS[0][1]]
+
+
+def test_identical_texts_are_checkpointed_per_document(checkpoint):
+    text = DOCUMENTS[0][1]
+    chunker = CountingChunker()
+    job = ChunkingJob(chunker, checkpoint)
+
+    summary = job.run([("a.txt", text), ("b.txt", text)])
+
+    assert summary["done"] == 2 and len(chunker.calls) == 2
+    assert job.chunks_for("a.txt", text)[0]["doc_id"] == "a.txt"
+    assert job.chunks_for("b.txt", text)[0]["doc_id"] == "b.txt"
@@ -17,10 +17,14 @@ Useful as a simple connectivity check to ensure that your application can
 connect to a Neo4j instance before running more complex queries or transactions.
 """
 
-from neo4j import GraphDatabase
 import os
+import sys
 from dotenv import load_dotenv
 
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from main.neo4j_pool import Neo4jPoolConfig, drivers
+
 load_dotenv()
 
 NEO4J_URI = os.getenv("NEO4J_URI", "bolt://localhost:7687")
@@ -32,7 +36,10 @@ def test_connection():
     uri = os.getenv("NEO4J_URI", "bolt://localhost:7687")
     user = os.getenv("NEO4J_USER", "neo4j")
     password = os.getenv("NEO4J_PASSWORD", "password")
-    driver = GraphDatabase.driver(uri, auth=(user, password))
+    driver = drivers.sync_driver(
+        Neo4jPoolConfig.from_env(uri=uri, user=user, password=password),
+        user="test_connection",
+    )
     try:
         with driver.session() as session:
             result = session.run("RETURN 1 AS test")
@@ -41,7 +48,7 @@ def test_connection():
     except Exception as e:
         print("Failed to connect to Neo4j:", e)
     finally:
-        driver.close()
+        drivers.release_sync(driver, user="test_connection")
 
 
 if __name__ == "__main__":
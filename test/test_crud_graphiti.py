@@ -0,0 +1,645 @@
+"""
+This test suite validates the batched write paths of `GraphitiCRUD` against a
+recording in-memory driver, without a running Neo4j instance.
+
+Functionality:
+- Checks that bulk node creation sends parameter lists through a single
+  `UNWIND` query per batch, each batch in its own committed transaction.
+- Verifies that dict inputs are expanded into graphiti_core node fields.
+- Confirms that a failing batch is rolled back, earlier batches stay
+  committed, and the error reports how far the load got.
+- Checks that single-node creation is one round trip and wraps driver errors.
+- Verifies that edges are created in one statement that reports missing
+  endpoints, and that bulk edge creation returns the edges that failed.
+- Checks that updates are a single `SET n += $props` round trip returning the
+  new state, with version compare-and-set for single and bulk updates that
+  takes the node's write lock before reading its version.
+- Verifies that entity reads go through the cache, `get_many` fetches all
+  misses in one query, and updates, deletes and bulk writes keep it coherent.
+- Checks that the cache hands out copies, and that deletes report what the
+  database removed rather than what the cache holds.
+- Checks that a buffered unit of work sends its writes grouped by kind in one
+  transaction, rolls everything back on error and flushes early at its limit.
+- Verifies that similarity search sends all query vectors (texts embedded in
+  one batch) through a single vector index statement with filters, and that
+  index creation renders the configured dimensions and similarity.
+- Checks that bulk deletes detach relationships in bounded statements before
+  deleting each batch of nodes, report progress and honour the rate limit.
+- Checks that bulk creation with embeddings embeds names in batches (off the
+  event loop for blocking embedders, one call per name for embedders without
+  `create_batch`) and writes the vectors with the nodes.
+
+Requirements:
+- pytest, pytest-asyncio, graphiti_core
+- Custom modules: main.crud_graphiti
+
+Use Case:
+Used to guard the bulk ingestion paths that load large entity sets into the
+knowledge graph.
+"""
+
+import threading
+from datetime import datetime, timezone
+
+import pytest
+from graphiti_core.embedder.client import EmbedderClient
+from graphiti_core.nodes import EntityNode, EpisodicNode
+from main.crud_graphiti import (
+    BulkDeleteConfig,
+    ENTITY_EDGES_BULK_SAVE,
+    ENTITY_NODES_BULK_SAVE,
+    ENTITY_NODE_UPDATE,
+    ENTITY_NODES_BULK_UPDATE,
+    EPISODIC_NODES_BULK_SAVE,
+    GraphitiCRUD,
+    VectorIndexConfig,
+    VersionConflictError,
+)
+from main.entity_cache import EntityCache
+from fake_neo4j import FakeDriver
+
+
+@pytest.mark.asyncio
+async def test_entity_nodes_bulk_uses_one_unwind_per_batch():
+    driver = FakeDriver()
+    crud = GraphitiCRUD(driver, group_id="docs", batch_size=1000)
+    entities = [{"name": f"Entity {i}", "summary": "bulk"} for i in range(2500)]
+
+    result = await crud.create_entity_nodes_bulk(entities)
+
+    assert driver.queries == []
+    assert [len(params["rows"]) for _, params in driver.runs] == [1000, 1000, 500]
+    assert all("UNWIND $rows" in query for query, _ in driver.runs)
+    assert driver.commits == 3
+    assert result.count == 2500 and result.batches == 3
+    assert result.per_second > 0
+    row = driver.runs[0][1]["rows"][0]
+    assert row["name"] == "Entity 0" and row["group_id"] == "docs"
+    assert row["uuid"] == result.items[0].uuid
+
+
+@pytest.mark.asyncio
+async def test_episodic_nodes_bulk_accepts_nodes_and_dicts():
+    driver = FakeDriver()
+    crud = GraphitiCRUD(driver)
+    timestamp = datetime(2024, 1, 1, tzinfo=timezone.utc)
+    existing = EpisodicNode(
+        name="Existing",
+        group_id="",
+        source="message",
+        source_description="chat",
+        content="hello",
+        valid_at=timestamp,
+    )
+
+    result = await crud.create_episodic_nodes_bulk(
+        [existing, {"name": "New", "content": "text", "valid_at": timestamp}],
+        batch_size=10,
+    )
+
+    rows = driver.runs[0][1]["rows"]
+    assert result.items[0] is existing
+    assert [row["source"] for row in rows] == ["message", "text"]
+    assert rows[1]["valid_at"] == timestamp
+    assert driver.commits == 1
+
+
+@pytest.mark.asyncio
+async def test_failed_batch_rolls_back_and_reports_progress():
+    driver = FakeDriver(failing_runs={2})
+    crud = GraphitiCRUD(driver, batch_size=2)
+
+    with pytest.raises(RuntimeError, match="after 2 of 5"):
+        await crud.create_entity_nodes_bulk([{"name": str(i)} for i in range(5)])
+
+    assert driver.commits == 1
+    assert driver.rollbacks == 1
+
+
+@pytest.mark.asyncio
+async def test_create_entity_node_is_one_round_trip():
+    driver = FakeDriver()
+    crud = GraphitiCRUD(driver)
+
+    node = await crud.create_entity_node("Test Node", "Test summary")
+
+    assert isinstance(node, EntityNode)
+    assert len(driver.queries) == 1
+    assert driver.queries[0][1]["node"]["summary"] == "Test summary"
+
+    driver.error = Exception("DB error")
+    with pytest.raises(RuntimeError, match="Failed to create entity node"):
+        await crud.create_entity_node("Fail Node")
+
+
+def endpoint_flags(known):
+    """Respond like the edge queries for a graph holding the ``known`` uuids"""
+
+    def respond(query, params):
+        rows = params.get("rows") or [params]
+        return [
+            {
+                "uuid": row["edge"]["uuid"],
+                "source_found": row["source_uuid"] in known,
+                "target_found": row["target_uuid"] in known,
+            }
+            for row in rows
+        ]
+
+    return respond
+
+
+@pytest.mark.asyncio
+async def test_create_entity_edge_is_one_statement():
+    driver = FakeDriver(endpoint_flags({"a", "b"}))
+    crud = GraphitiCRUD(driver)
+
+    edge = await crud.create_entity_edge("a", "b", "WORKS_WITH")
+
+    assert edge.name == "WORKS_WITH"
+    assert len(driver.queries) == 1
+    assert "OPTIONAL MATCH" in driver.queries[0][0]
+
+    with pytest.raises(ValueError, match="missing target Entity node c"):
+        await crud.create_entity_edge("a", "c", "WORKS_WITH")
+    with pytest.raises(ValueError, match="missing source Episodic node ep"):
+        await crud.create_episodic_edge("ep", "b")
+
+
+@pytest.mark.asyncio
+async def test_entity_edges_bulk_returns_failed_edges():
+    driver = FakeDriver(endpoint_flags({"a", "b", "c"}))
+    crud = GraphitiCRUD(driver, batch_size=2)
+    edges = [
+        {"source_node_uuid": "a", "target_node_uuid": "b", "name": "KNOWS"},
+        {"source_node_uuid": "a", "target_node_uuid": "x", "name": "KNOWS"},
+        {"source_node_uuid": "y", "target_node_uuid": "c", "name": "KNOWS"},
+    ]
+
+    result = await crud.create_entity_edges_bulk(edges)
+
+    assert len(driver.runs) == 2 and driver.queries == []
+    assert [edge.target_node_uuid for edge in result.items] == ["b"]
+    assert [(edge.target_node_uuid, reason) for edge, reason in result.failed] == [
+        ("x", "missing target Entity node x"),
+        ("c", "missing source Entity node y"),
+    ]
+    assert result.as_dict()["failed"] == 2
+
+
+def unit_rows(query, params):
+    """Respond to unit-of-work batches: every update and endpoint is found"""
+    rows = params["rows"]
+    if "edge" in rows[0]:
+        return endpoint_flags({"a", "b"})(query, params)
+    if "props" in rows[0]:
+        return [
+            {"uuid": row["uuid"], "found": True, "version": 2, "previous_version": 1}
+            for row in rows
+        ]
+    return []
+
+
+@pytest.mark.asyncio
+async def test_unit_of_work_groups_writes_in_one_transaction():
+    driver = FakeDriver(unit_rows)
+    crud = GraphitiCRUD(driver, batch_size=2)
+    timestamp = datetime(2024, 1, 1, tzinfo=timezone.utc)
+
+    async with crud.transaction(buffered=True) as unit:
+        await unit.create_entity_edge("a", "b", "KNOWS")
+        await unit.create_entity_edge("a", "x", "KNOWS")
+        for i in range(3):
+            await unit.create_entity_node(f"Entity {i}")
+        await unit.update_entity_node("a", summary="updated")
+        node = await unit.create_episodic_node("Episode", timestamp, "text")
+        assert driver.runs == [] and len(unit) == 7
+
+    assert [query for query, _ in driver.runs] == [
+        ENTITY_NODES_BULK_SAVE,
+        ENTITY_NODES_BULK_SAVE,
+        EPISODIC_NODES_BULK_SAVE,
+        ENTITY_NODES_BULK_UPDATE,
+        ENTITY_EDGES_BULK_SAVE,
+    ]
+    assert [len(params["rows"]) for _, params in driver.runs] == [2, 1, 1, 1, 2]
+    assert driver.runs[4][1]["rows"][0]["source_uuid"] == "a"
+    assert driver.commits == 1 and driver.queries == []
+    assert driver.runs[2][1]["rows"][0]["uuid"] == node.uuid
+    assert unit.statements == 5 and unit.flushes == 1
+    assert [(edge.target_node_uuid, reason) for edge, reason in unit.failed] == [
+        ("x", "missing target Entity node x")
+    ]
+    assert unit.written["entity edges"] == 1
+
+
+@pytest.mark.asyncio
+async def test_unit_of_work_rolls_back_on_error():
+    driver = FakeDriver(unit_rows, failing_runs={2})
+    crud = GraphitiCRUD(driver)
+
+    with pytest.raises(ConnectionError):
+        async with crud.transaction(buffered=True) as unit:
+            await unit.create_entity_node("Entity")
+            await unit.create_entity_edge("a", "b", "KNOWS")
+    assert (driver.commits, driver.rollbacks) == (0, 1)
+
+    with pytest.raises(KeyError):
+        async with crud.transaction(buffered=True) as unit:
+            await unit.create_entity_node("Never sent")
+            raise KeyError("caller error")
+    assert len(driver.runs) == 2
+    assert (driver.commits, driver.rollbacks) == (0, 2)
+
+
+@pytest.mark.asyncio
+async def test_unit_of_work_auto_flushes_at_limit():
+    driver = FakeDriver(unit_rows)
+    crud = GraphitiCRUD(driver, batch_size=100)
+
+    async with crud.transaction(buffered=True, max_pending=4) as unit:
+        for i in range(10):
+            await unit.create_entity_node(f"Entity {i}")
+        assert len(driver.runs) == 2 and len(unit) == 2
+
+    assert [len(params["rows"]) for _, params in driver.runs] == [4, 4, 2]
+    assert unit.flushes == 3 and driver.commits == 1
+    assert unit.written["entity nodes"] == 10
+
+
+def node_store(nodes):
+    """Respond like the update queries for ``{uuid: properties}`` nodes"""
+
+    def respond(query, params):
+        rows = params.get("rows") or [params]
+        result = []
+        for row in rows:
+            node = nodes.get(row["uuid"])
+            if node is None:
+                # The single-node query MATCHes, so a missing node has no row
+                if "rows" in params:
+                    result.append({"uuid": row["uuid"], "found": False})
+                continue
+            previous = node.get("version", 0)
+            if row["expected_version"] in (None, previous):
+                node.update(row["props"], version=previous + 1)
+            result.append({**node, "found": True, "previous_version": previous})
+        return result
+
+    return respond
+
+
+def stored_node(uuid, **properties):
+    return {
+        "uuid": uuid,
+        "name": uuid.title(),
+        "summary": "old",
+        "created_at": datetime(2024, 1, 1, tzinfo=timezone.utc),
+        **properties,
+    }
+
+
+@pytest.mark.asyncio
+async def test_update_entity_node_is_one_round_trip_with_version_check():
+    nodes = {"a": stored_node("a")}
+    driver = FakeDriver(node_store(nodes))
+    crud = GraphitiCRUD(driver)
+
+    node = await crud.update_entity_node("a", summary="new")
+
+    assert len(driver.queries) == 1
+    assert "SET n += $props" in driver.queries[0][0]
+    assert node.summary == "new" and node.attributes["version"] == 1
+
+    node = await crud.update_entity_node("a", expected_version=1, summary="newer")
+    assert node.summary == "newer" and node.attributes["version"] == 2
+
+    with pytest.raises(VersionConflictError, match="at version 2, expected 1"):
+        await crud.update_entity_node("a", expected_version=1, summary="stale")
+    assert nodes["a"]["summary"] == "newer"
+
+    assert await crud.update_entity_node("missing", summary="x") is None
+    with pytest.raises(ValueError, match="version cannot be updated"):
+        await crud.update_entity_node("a", version=7)
+
+
+@pytest.mark.asyncio
+async def test_update_entity_nodes_bulk_reports_missing_and_conflicts():
+    nodes = {
+        "a": stored_node("a"),
+        "b": stored_node("b", version=3),
+        "c": stored_node("c", version=1),
+    }
+    driver = FakeDriver(node_store(nodes))
+    crud = GraphitiCRUD(driver, batch_size=3)
+
+    result = await crud.update_entity_nodes_bulk(
+        {uuid: {"summary": f"refreshed {uuid}"} for uuid in ("a", "b", "c", "x")},
+        expected_versions={"b": 2, "c": 1},
+    )
+
+    assert len(driver.runs) == 2 and driver.queries == []
+    assert result.items == ["a", "c"]
+    assert result.failed == [
+        ("b", "version conflict: expected 2, found 3"),
+        ("x", "not found"),
+    ]
+    assert nodes["a"]["summary"] == "refreshed a" and nodes["c"]["version"] == 2
+    assert nodes["b"]["summary"] == "old"
+
+
+@pytest.mark.parametrize("query", [ENTITY_NODE_UPDATE, ENTITY_NODES_BULK_UPDATE])
+def test_updates_lock_the_node_before_reading_its_version(query):
+    lock = query.index("SET n._lock = true")
+    assert lock < query.index("n.version")
+    assert query.index("REMOVE n._lock") > query.index("n.version = ")
+
+
+def graph_reads(nodes):
+    """Respond to entity reads and updates from ``{uuid: properties}`` nodes"""
+    update = node_store(nodes)
+
+    def respond(query, params):
+        if "uuids" in params:
+            return [nodes[u] for u in params["uuids"] if u in nodes]
+        if "props" in params or "rows" in params:
+            return update(query, params)
+        if "DELETE" in query:
+            return [{"deleted": int(nodes.pop(params["uuid"], None) is not None)}]
+        return [nodes[params["uuid"]]] if params["uuid"] in nodes else []
+
+    return respond
+
+
+@pytest.mark.asyncio
+async def test_entity_reads_go_through_the_cache():
+    nodes = {uuid: stored_node(uuid) for uuid in ("a", "b", "c")}
+    driver = FakeDriver(graph_reads(nodes))
+    crud = GraphitiCRUD(driver, cache=EntityCache())
+
+    first = await crud.get_entity_node("a")
+    assert await crud.get_entity_node("a") == first
+    assert len(driver.queries) == 1
+
+    found = await crud.get_many(["c", "a", "b", "missing", "a"])
+
+    assert list(found) == ["c", "a", "b"]
+    assert len(driver.queries) == 2
+    assert driver.queries[1][1]["uuids"] == ["c", "b", "missing"]
+    assert crud.cache.stats()["hits"] == 2
+
+
+@pytest.mark.asyncio
+async def test_writes_keep_the_cache_coherent():
+    nodes = {uuid: stored_node(uuid) for uuid in ("a", "b")}
+    driver = FakeDriver(graph_reads(nodes))
+    crud = GraphitiCRUD(driver, cache=EntityCache())
+    await crud.get_many(["a", "b"])
+
+    await crud.update_entity_node("a", summary="new")
+    assert (await crud.get_entity_node("a")).summary == "new"
+
+    nodes["b"]["version"] = 5
+    with pytest.raises(VersionConflictError):
+        await crud.update_entity_node("b", expected_version=1, summary="stale")
+    assert (await crud.get_entity_node("b")).attributes["version"] == 5
+
+    await crud.update_entity_nodes_bulk({"a": {"summary": "bulk"}})
+    assert (await crud.get_entity_node("a")).summary == "bulk"
+
+    assert await crud.delete_entity_node("a")
+    assert await crud.get_entity_node("a") is None
+
+
+@pytest.mark.asyncio
+async def test_cached_nodes_are_copies_and_deletes_skip_the_cache():
+    nodes = {uuid: stored_node(uuid) for uuid in ("a", "b")}
+    driver = FakeDriver(graph_reads(nodes))
+    crud = GraphitiCRUD(driver, cache=EntityCache())
+
+    fetched = await crud.get_entity_node("a")
+    fetched.summary = "edited locally"
+    (await crud.get_many(["a"]))["a"].name_embedding = [9.0]
+    cached = await crud.get_entity_node("a")
+    assert cached.summary == "old" and cached.name_embedding is None
+    assert len(driver.queries) == 1
+
+    # Deleted by another process while still cached here
+    await crud.get_entity_node("b")
+    del nodes["b"]
+    assert await crud.delete_entity_node("b") is False
+    assert "DETACH DELETE" in driver.queries[-1][0]
+
+
+class BatchEmbedder:
+    """graphiti-style embedder that records the size of each batch"""
+
+    def __init__(self):
+        self.batches = []
+
+    async def create_batch(self, texts):
+        self.batches.append(len(texts))
+        return [[float(len(text)), 1.0] for text in texts]
+
+
+class BlockingEmbedder:
+    """Embedder with a blocking ``embed(texts)`` like MxbaiEmbedder"""
+
+    def __init__(self):
+        self.threads = set()
+
+    def embed(self, texts):
+        self.threads.add(threading.get_ident())
+        return [[1.0, 0.0] for _ in texts]
+
+
+@pytest.mark.asyncio
+async def test_bulk_creation_embeds_names_in_batches():
+    driver = FakeDriver()
+    embedder = BatchEmbedder()
+    crud = GraphitiCRUD(driver, embedder=embedder, embedding_batch_size=2)
+    nodes = [{"name": "x" * i} for i in range(1, 6)]
+    nodes.append({"name": "given", "name_embedding": [0.0, 0.0]})
+
+    result = await crud.create_entity_nodes_bulk(nodes, embed=True)
+
+    assert sorted(embedder.batches) == [1, 2, 2]
+    rows = driver.runs[0][1]["rows"]
+    assert len(driver.runs) == 1
+    assert [row["name_embedding"][0] for row in rows[:5]] == [1.0, 2.0, 3.0, 4.0, 5.0]
+    assert rows[5]["name_embedding"] == [0.0, 0.0]
+    assert result.items[0].name_embedding == [1.0, 1.0]
+
+
+class SingleEmbedder(EmbedderClient):
+    """graphiti embedder implementing only ``create`` (one text, one vector)"""
+
+    def __init__(self):
+        self.inputs = []
+
+    async def create(self, input_data):
+        self.inputs.append(input_data)
+        return [float(len(input_data)), 0.5]
+
+
+@pytest.mark.asyncio
+async def test_embedders_without_create_batch_embed_each_text():
+    driver = FakeDriver()
+    embedder = SingleEmbedder()
+    crud = GraphitiCRUD(driver, embedder=embedder, embedding_batch_size=2)
+
+    result = await crud.create_entity_nodes_bulk(
+        [{"name": "a"}, {"name": "bb"}, {"name": "ccc"}], embed=True
+    )
+
+    assert sorted(embedder.inputs) == ["a", "bb", "ccc"]
+    assert [node.name_embedding for node in result.items] == [
+        [1.0, 0.5],
+        [2.0, 0.5],
+        [3.0, 0.5],
+    ]
+
+
+@pytest.mark.asyncio
+async def test_blocking_embedders_run_off_the_event_loop():
+    embedder = BlockingEmbedder()
+    crud = GraphitiCRUD(FakeDriver(), embedder=embedder)
+
+    node = await crud.create_node_with_embedding("Test Node")
+
+    assert node.name_embedding == [1.0, 0.0]
+    assert threading.get_ident() not in embedder.threads
+
+
+def nearest(query, params):
+    """Respond to similarity searches with two hits per query vector"""
+    if "vectors" not in params:
+        return []
+    return [
+        {**stored_node(f"n{i}{rank}"), "i": i, "score": score}
+        for i, _ in enumerate(params["vectors"])
+        for rank, score in ((1, 0.5), (0, 0.9))
+    ]
+
+
+@pytest.mark.asyncio
+async def test_similarity_search_batches_queries_in_one_statement():
+    driver = FakeDriver(nearest)
+    embedder = BatchEmbedder()
+    crud = GraphitiCRUD(
+        driver, embedder=embedder, vector_index=VectorIndexConfig(dimensions=2)
+    )
+
+    results = await crud.find_similar_entities_batch(
+        ["Alice", [0.1, 0.2], "Bob"], k=3, filters={"group_id": "docs"}
+    )
+
+    assert embedder.batches == [2] and len(driver.queries) == 1
+    query, params = driver.queries[0]
+    assert "db.index.vector.queryNodes" in query
+    assert params["vectors"] == [[5.0, 1.0], [0.1, 0.2], [3.0, 1.0]]
+    assert params["index"] == "entity_name_embedding"
+    assert (params["k"], params["candidates"]) == (3, 12)
+    assert params["filters"] == {"group_id": "docs"}
+    assert [[(node.uuid, score) for node, score in hits] for hits in results] == [
+        [("n00", 0.9), ("n01", 0.5)],
+        [("n10", 0.9), ("n11", 0.5)],
+        [("n20", 0.9), ("n21", 0.5)],
+    ]
+
+    hits = await crud.find_similar_entities([1.0, 0.0], k=1)
+    assert hits[0][0].uuid == "n00" and driver.queries[1][1]["filters"] == {}
+    with pytest.raises(ValueError, match="expects 2"):
+        await crud.find_similar_entities([1.0, 0.0, 0.0])
+
+
+@pytest.mark.asyncio
+async def test_vector_index_creation_uses_configured_options():
+    driver = FakeDriver()
+    crud = GraphitiCRUD(
+        driver, vector_index=VectorIndexConfig(dimensions=384, similarity="euclidean")
+    )
+
+    await crud.create_vector_index(timeout=30)
+
+    create, wait = driver.queries
+    assert "CREATE VECTOR INDEX entity_name_embedding IF NOT EXISTS" in create[0]
+    assert "`vector.dimensions`: 384" in create[0]
+    assert "'euclidean'" in create[0]
+    assert wait[1] == {"name": "entity_name_embedding", "timeout": 30}
+    with pytest.raises(ValueError, match="similarity"):
+        VectorIndexConfig(similarity="dot").create_query()
+    with pytest.raises(ValueError, match="index name"):
+        VectorIndexConfig(name="bad name").create_query()
+
+
+def deletable(graph):
+    """Respond to bulk deletes for ``{uuid: relationship count}`` nodes"""
+
+    def respond(query, params):
+        if "RETURN n.uuid AS uuid" in query:
+            return [{"uuid": uuid} for uuid in list(graph)[: params["limit"]]]
+        if "DELETE r" in query:
+            deleted = 0
+            for uuid in params["uuids"]:
+                taken = min(graph.get(uuid, 0), params["limit"] - deleted)
+                if taken:
+                    graph[uuid] -= taken
+                    deleted += taken
+            return [{"deleted": deleted}]
+        return [
+            {"deleted": sum(graph.pop(u, None) is not None for u in params["uuids"])}
+        ]
+
+    return respond
+
+
+@pytest.mark.asyncio
+async def test_bulk_delete_detaches_relationships_in_bounded_batches():
+    graph = {"hub": 25, "a": 1, "b": 0}
+    driver = FakeDriver(deletable(graph))
+    cache = EntityCache()
+    cache.put(EntityNode(uuid="hub", name="Hub", group_id=""))
+    crud = GraphitiCRUD(driver, cache=cache)
+    reports = []
+
+    result = await crud.delete_nodes_bulk(
+        ["hub", "a", "b", "hub"],
+        config=BulkDeleteConfig(batch_size=2, relationship_batch_size=10),
+        progress=lambda r: reports.append(r.nodes),
+    )
+
+    assert graph == {} and len(cache) == 0
+    assert (result.nodes, result.relationships, result.batches) == (3, 26, 2)
+    detach = [p for q, p in driver.queries if "DELETE r" in q]
+    assert [p["uuids"] for p in detach] == [["hub", "a"]] * 3 + [["b"]]
+    assert all(p["limit"] == 10 for p in detach)
+    assert all("(n:Entity)" in q for q, _ in driver.queries)
+    assert reports == [2, 3] and result.statements == 6
+
+
+@pytest.mark.asyncio
+async def test_delete_nodes_matching_purges_a_group_at_a_limited_rate(monkeypatch):
+    sleeps = []
+
+    async def sleep(seconds):
+        sleeps.append(seconds)
+
+    monkeypatch.setattr("main.crud_graphiti.asyncio.sleep", sleep)
+    graph = {f"n{i}": 1 for i in range(5)}
+    driver = FakeDriver(deletable(graph))
+    crud = GraphitiCRUD(driver)
+
+    result = await crud.delete_nodes_matching(
+        group_id="docs", config=BulkDeleteConfig(batch_size=2, max_per_second=100)
+    )
+
+    assert graph == {} and result.nodes == 5 and result.batches == 3
+    selects = [p for q, p in driver.queries if "RETURN n.uuid AS uuid" in q]
+    assert selects[0] == {"group_id": "docs", "limit": 2}
+    assert "MATCH (n)" in driver.queries[0][0]
+    # The fake sleep does not advance time, so the last one covers the whole
+    # 0.1 s that 10 deletes take at 100/s
+    assert 0.05 < max(sleeps) <= 0.1 and sleeps == sorted(sleeps)
+    with pytest.raises(ValueError, match="label or a group_id"):
+        await crud.delete_nodes_matching()
@@ -21,7 +21,12 @@ Useful for testing basic graph creation, relationship management, and querying i
 or as a template for building social or professional network graphs in applications.
 """
 
-from neo4j import GraphDatabase, basic_auth
+import os
+import sys
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from main.neo4j_pool import Neo4jPoolConfig, drivers
 
 # Set your Neo4j connection details
 NEO4J_URI = "bolt://localhost:7687"
@@ -79,7 +84,10 @@ QUERIES = [
 
 
 def run_test_queries(uri, user, password):
-    driver = GraphDatabase.driver(uri, auth=basic_auth(user, password))
+    driver = drivers.sync_driver(
+        Neo4jPoolConfig.from_env(uri=uri, user=user, password=password),
+        user="test_cypher",
+    )
     try:
         with driver.session() as session:
             for name, query in QUERIES:
@@ -90,7 +98,7 @@ def run_test_queries(uri, user, password):
     except Exception as e:
         print(f"Failed to run test queries: {e}")
     finally:
-        driver.close()
+        drivers.release_sync(driver, user="test_cypher")
 
 
 if __name__ == "__main__":
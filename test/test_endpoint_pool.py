@@ -0,0 +1,156 @@
+"""
+This test suite validates load balancing across several Ollama instances.
+
+Functionality:
+- Runs `LocalAiClient` and `MistralChunker` against several mock Ollama servers
+  and checks that least-outstanding-requests routing spreads the load.
+- Verifies that failing nodes are ejected after consecutive failures or a
+  failed health check, and re-admitted once a health check succeeds.
+- Checks that a slow call is hedged to a second node and the loser cancelled.
+
+Requirements:
+- pytest
+- pytest-asyncio
+- Custom modules: main.endpoint_pool, main.local_ai_client, main.llm_chunker
+
+Use Case:
+Used to make sure extraction and chunking traffic can be spread over several
+Ollama boxes and keeps flowing when one of them goes down.
+"""
+
+import time
+import asyncio
+import pytest
+from contextlib import ExitStack
+from graphiti_core.prompts import Message
+from graphiti_core.llm_client.config import LLMConfig as GraphitiLLMConfig
+from mock_ollama import MockOllamaServer
+from main.endpoint_pool import Endpoint, EndpointPool, PoolConfig
+from main.llm_chunker import MistralChunker, LLMConfig, ChunkingConfig
+from main.local_ai_client import LocalAiClient
+from main.ollama_http import HttpConfig
+
+
+def json_responder(body):
+    return '{"entities": []}'
+
+
+def start_servers(stack, count, **kwargs):
+    return [stack.enter_context(MockOllamaServer(**kwargs)) for _ in range(count)]
+
+
+def test_resolve_keeps_configured_path():
+    endpoint = Endpoint("http://gpu-2:11434/")
+
+    assert endpoint.resolve("http://127.0.0.1:11434/api/chat") == (
+        "http://gpu-2:11434/api/chat"
+    )
+
+
+@pytest.mark.asyncio
+async def test_least_outstanding_routing_spreads_concurrent_calls():
+    with ExitStack() as stack:
+        servers = start_servers(stack, 3, latency=0.1, responder=json_responder)
+        pool = EndpointPool([s.url for s in servers])
+        config = GraphitiLLMConfig(base_url="http://unused/api/chat", temperature=0)
+        client = LocalAiClient(config=config, endpoint_pool=pool)
+
+        results = await asyncio.gather(
+            *(
+                client._generate_response([Message(role="user", content="Hi")])
+                for _ in range(9)
+            )
+        )
+        await client.close()
+
+    assert results == [{"entities": []}] * 9
+    assert [len(s.requests) for s in servers] == [3, 3, 3]
+    assert all(s.requests[0][0] == "/api/chat" for s in servers)
+    assert all(e.outstanding == 0 for e in pool.endpoints)
+
+
+def test_failing_node_is_ejected_and_readmitted():
+    with ExitStack() as stack:
+        bad, good = start_servers(stack, 2)
+        bad.unavailable = True
+        pool = EndpointPool(
+            [bad.url, good.url], PoolConfig(failure_threshold=2, eject_seconds=60)
+        )
+        chunker = MistralChunker(
+            LLMConfig(base_url="http://unused/api/generate"),
+            ChunkingConfig(min_tokens=1),
+            http_config=HttpConfig(max_retries=0),
+            endpoint_pool=pool,
+        )
+
+        failures = 0
+        for _ in range(8):
+            try:
+                chunker._call_mistral("Text: One. Two.")
+            except RuntimeError:
+                failures += 1
+
+        assert failures == 2
+        assert not pool.endpoints[0].available
+        assert len(bad.requests) == 2
+
+        pool.check_health()
+        assert not pool.endpoints[0].available
+        bad.unavailable = False
+        pool.check_health()
+        assert pool.endpoints[0].available
+
+        for _ in range(4):
+            chunker._call_mistral("Text: One. Two.")
+
+    assert len(bad.requests) == 4
+    assert pool.stats()["endpoints"][bad.url]["ejections"] == 1
+
+
+@pytest.mark.asyncio
+async def test_background_health_checks_eject_unhealthy_nodes():
+    with ExitStack() as stack:
+        down, up = start_servers(stack, 2)
+        down.unavailable = True
+        pool = EndpointPool(
+            [down.url, up.url], PoolConfig(health_interval=0.01, eject_seconds=60)
+        )
+
+        pool.start_health_checks()
+        for _ in range(100):
+            await asyncio.sleep(0.01)
+            if not pool.endpoints[0].available:
+                break
+        await pool.aclose()
+
+    assert not pool.endpoints[0].available
+    assert pool.endpoints[1].available
+    assert all(pool.choose() is pool.endpoints[1] for _ in range(4))
+
+
+@pytest.mark.asyncio
+async def test_slow_calls_are_hedged_to_another_node():
+    pool = EndpointPool(
+        ["http://slow", "http://fast"],
+        PoolConfig(hedge_percentile=0.9, hedge_min_samples=5),
+    )
+    pool.latencies.extend([0.02] * 5)
+    cancelled = []
+
+    async def call(endpoint):
+        try:
+            await asyncio.sleep(1.0 if endpoint.url == "http://slow" else 0.01)
+        except asyncio.CancelledError:
+            cancelled.append(endpoint.url)
+            raise
+        return endpoint.url
+
+    start = time.perf_counter()
+    results = [await pool.arequest(call) for _ in range(2)]
+    elapsed = time.perf_counter() - start
+
+    assert results == ["http://fast", "http://fast"]
+    assert elapsed < 0.5
+    assert pool.hedges == 1 and pool.hedge_wins == 1
+    assert cancelled == ["http://slow"]
+    assert all(e.outstanding == 0 for e in pool.endpoints)
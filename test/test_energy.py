@@ -20,7 +20,12 @@ applications like smart grid management, IoT energy monitoring, or company data
 Can also serve as a test dataset for development or demos.
 """
 
-from neo4j import GraphDatabase
+import os
+import sys
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from main.neo4j_pool import Neo4jPoolConfig, drivers
 
 NEO4J_URI = "bolt://localhost:7687"
 NEO4J_USER = "neo4j"
@@ -96,14 +101,17 @@ CREATE (s)-[:HAS_ENERGY_CONSUMPTION]->(ec);
 
 
 def run_cypher_script(uri, user, password, script):
-    driver = GraphDatabase.driver(uri, auth=(user, password))
+    driver = drivers.sync_driver(
+        Neo4jPoolConfig.from_env(uri=uri, user=user, password=password),
+        user="test_energy",
+    )
     with driver.session() as session:
         # Neo4j driver does not support multiple statements separated by semicolons directly,
         # so we split the script and run statements one by one.
         for statement in script.strip().split(";"):
             if statement.strip():
                 session.run(statement)
-    driver.close()
+    drivers.release_sync(driver, user="test_energy")
     print("Data setup completed.")
 
 
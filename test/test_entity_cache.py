@@ -0,0 +1,77 @@
+"""
+This test suite validates the in-memory `EntityCache` that sits in front of
+`GraphitiCRUD` entity reads.
+
+Functionality:
+- Checks least-recently-used eviction once `max_entries` is exceeded.
+- Verifies that entries expire after `ttl_seconds` using an injected clock.
+- Confirms that hit, miss, expiration and invalidation counts feed the
+  reported hit rate.
+
+Requirements:
+- pytest, graphiti_core
+- Custom modules: main.entity_cache
+
+Use Case:
+Used to keep hot entity lookups during prompt building and edge creation from
+going to Neo4j on every call.
+"""
+
+from graphiti_core.nodes import EntityNode
+from main.entity_cache import EntityCache, EntityCacheConfig
+
+
+class Clock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def node(uuid):
+    return EntityNode(uuid=uuid, name=uuid.title(), group_id="")
+
+
+def test_least_recently_used_entries_are_evicted():
+    cache = EntityCache(EntityCacheConfig(max_entries=2, ttl_seconds=None))
+    cache.put(node("a"))
+    cache.put(node("b"))
+    assert cache.get("a") is not None
+
+    cache.put(node("c"))
+
+    assert cache.get("b") is None
+    assert set(cache.get_many(["a", "b", "c"])) == {"a", "c"}
+    assert cache.stats()["evictions"] == 1
+
+
+def test_entries_expire_after_ttl():
+    clock = Clock()
+    cache = EntityCache(EntityCacheConfig(ttl_seconds=10), clock=clock)
+    cache.put(node("a"))
+
+    clock.now = 5
+    assert cache.get("a") is not None
+    clock.now = 11
+    assert cache.get("a") is None
+
+    assert len(cache) == 0
+    assert cache.stats()["expirations"] == 1
+
+
+def test_stats_report_hit_rate_and_invalidations():
+    cache = EntityCache()
+    cache.put(node("a"))
+
+    cache.get("a")
+    cache.get("a")
+    cache.get("b")
+    cache.invalidate(["a", "missing"])
+    cache.get("a")
+
+    stats = cache.stats()
+    assert (stats["hits"], stats["misses"]) == (2, 2)
+    assert stats["hit_rate"] == 0.5
+    assert stats["invalidations"] == 1
+    assert stats["entries"] == 0
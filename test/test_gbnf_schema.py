@@ -0,0 +1,127 @@
+"""
+This test suite validates GBNF grammars generated from pydantic response
+models and their use by `LocalAiClient`.
+
+Functionality:
+- Checks that object keys, enums, nullable fields, arrays and nested models are
+  translated into grammar rules and that every referenced rule is defined.
+- Verifies that grammars and validation adapters are built once per class.
+- Runs `LocalAiClient` against a mock Ollama server, asserting the schema
+  grammar is sent and that invalid responses are re-prompted and counted.
+
+Requirements:
+- pytest
+- pytest-asyncio
+- Custom modules: main.gbnf_schema, main.local_ai_client
+
+Use Case:
+Used to keep local model output in the exact shape graphiti's response models
+expect, instead of any JSON.
+"""
+
+import re
+import pytest
+from typing import Literal, Optional
+from pydantic import BaseModel, ValidationError
+from graphiti_core.prompts import Message
+from graphiti_core.llm_client.config import LLMConfig
+from mock_ollama import MockOllamaServer
+from main.gbnf_schema import grammar_for_model, schema_to_gbnf, type_adapter
+from main.local_ai_client import LocalAiClient
+
+
+class ExtractedEntity(BaseModel):
+    name: str
+    entity_type_id: int
+    kind: Literal["person", "place"]
+    summary: Optional[str] = None
+
+
+class ExtractedEntities(BaseModel):
+    extracted_entities: list[ExtractedEntity]
+
+
+def rules(grammar):
+    return dict(line.split(" ::= ", 1) for line in grammar.strip().splitlines())
+
+
+def referenced_names(body):
+    # Drop string literals and character classes, keep bare rule names
+    body = re.sub(r'"(\\.|[^"\\])*"', " ", body)
+    body = re.sub(r"\[(\\.|[^\]\\])*\]", " ", body)
+    body = re.sub(r"\{\d+(,\d*)?\}", " ", body)
+    return set(re.findall(r"[a-zA-Z][a-zA-Z0-9-]*", body))
+
+
+def test_grammar_follows_schema():
+    grammar = rules(grammar_for_model(ExtractedEntities))
+
+    assert grammar["root"].startswith('"{" ws "\\"extracted_entities\\"" ws ":" ws')
+    entity = grammar["ExtractedEntity"]
+    assert '"\\"name\\"" ws ":" ws string' in entity
+    assert '"\\"entity_type_id\\"" ws ":" ws integer' in entity
+    assert '("\\"person\\"" | "\\"place\\"") ws' in entity
+    assert "( string | null )" in entity
+    for name, body in grammar.items():
+        assert referenced_names(body) <= set(grammar), name
+
+
+def test_recursive_and_free_form_schemas():
+    class Tree(BaseModel):
+        label: str
+        children: list["Tree"] = []
+        attributes: dict = {}
+
+    grammar = rules(grammar_for_model(Tree))
+
+    assert "Tree" in grammar["Tree-children"]
+    assert '"\\"attributes\\"" ws ":" ws object' in grammar["Tree"]
+    assert rules(schema_to_gbnf({}))["root"] == "value"
+
+
+def test_grammars_and_adapters_are_cached_per_class():
+    assert grammar_for_model(ExtractedEntities) is grammar_for_model(ExtractedEntities)
+    assert type_adapter(ExtractedEntities) is type_adapter(ExtractedEntities)
+
+
+def sequence_responder(*responses):
+    remaining = list(responses)
+    return lambda body: remaining.pop(0) if len(remaining) > 1 else remaining[0]
+
+
+@pytest.mark.asyncio
+async def test_client_sends_schema_grammar_and_retries_invalid_output():
+    valid = '{"extracted_entities": [{"name": "Alice", "entity_type_id": 0, "kind": "person", "summary": null}]}'
+    responder = sequence_responder('{"extracted_entities": [{"name": 1}]}', valid)
+    with MockOllamaServer(responder=responder) as ollama:
+        config = LLMConfig(base_url=f"{ollama.url}/api/chat", temperature=0)
+        client = LocalAiClient(config=config)
+
+        result = await client._generate_response(
+            [Message(role="user", content="Extract")], ExtractedEntities
+        )
+        await client.close()
+
+    assert result["extracted_entities"][0]["name"] == "Alice"
+    bodies = [body for _, body in ollama.requests]
+    assert bodies[0]["grammar"] == grammar_for_model(ExtractedEntities)
+    assert "previous response was invalid" in bodies[1]["messages"][-1]["content"]
+    rates = client.validation_rates()
+    assert rates["failure_rate"] == 0.5
+    assert rates["retry_rate"] == 1.0
+
+
+@pytest.mark.asyncio
+async def test_client_gives_up_after_max_retries():
+    with MockOllamaServer(responder=lambda body: '{"wrong": true}') as ollama:
+        config = LLMConfig(base_url=f"{ollama.url}/api/chat", temperature=0)
+        client = LocalAiClient(config=config, schema_grammars=False)
+
+        with pytest.raises(ValidationError):
+            await client._generate_response(
+                [Message(role="user", content="Extract")], ExtractedEntities
+            )
+        await client.close()
+
+    assert len(ollama.requests) == LocalAiClient.MAX_RETRIES + 1
+    assert "grammar" not in ollama.requests[0][1]
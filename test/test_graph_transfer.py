@@ -0,0 +1,179 @@
+"""
+This test suite validates the Parquet export and import of `GraphTransfer`
+against recording in-memory drivers, without a running Neo4j instance.
+
+Functionality:
+- Checks that export pages every table by uuid, writing one row group per
+  page, with embeddings as fixed-size float32 lists.
+- Verifies that extra labels, timestamps and custom properties survive the
+  export.
+- Confirms that import writes one page of rows per batched UNWIND statement,
+  restores labels and properties, and counts edges whose endpoints are
+  missing as failed.
+
+Requirements:
+- pytest, pytest-asyncio, pyarrow, graphiti_core
+- Custom modules: main.graph_transfer, main.crud_graphiti
+
+Use Case:
+Used to move a knowledge graph between environments without replaying
+episodes through the LLM.
+"""
+
+from datetime import datetime, timezone
+
+import pyarrow as pa
+import pyarrow.parquet as pq
+import pytest
+from main.crud_graphiti import GraphitiCRUD, VectorIndexConfig
+from main.graph_transfer import GraphTransfer, TransferConfig
+from fake_neo4j import FakeDriver
+
+CREATED = datetime(2024, 1, 1, tzinfo=timezone.utc)
+
+
+def graph():
+    entities = [
+        {
+            "props": {
+                "uuid": f"e{i}",
+                "name": f"Entity {i}",
+                "group_id": "docs",
+                "summary": "",
+                "created_at": CREATED,
+                "name_embedding": [float(i), 0.5, 0.25],
+                "role": "engineer",
+            },
+            "labels": ["Entity", "Person"] if i % 2 else ["Entity"],
+        }
+        for i in range(5)
+    ]
+    episodes = [
+        {
+            "props": {
+                "uuid": "ep0",
+                "name": "Episode",
+                "group_id": "docs",
+                "source": "text",
+                "source_description": "chat",
+                "content": "hello",
+                "entity_edges": ["r0"],
+                "created_at": CREATED,
+                "valid_at": CREATED,
+            }
+        }
+    ]
+    relates = [
+        {
+            "props": {
+                "uuid": f"r{i}",
+                "name": "KNOWS",
+                "fact": "they know each other",
+                "group_id": "docs",
+                "episodes": ["ep0"],
+                "created_at": CREATED,
+            },
+            "source_node_uuid": "e0",
+            "target_node_uuid": target,
+        }
+        for i, target in enumerate(["e1", "gone"])
+    ]
+    mentions = [
+        {
+            "props": {"uuid": "m0", "group_id": "docs", "created_at": CREATED},
+            "source_node_uuid": "ep0",
+            "target_node_uuid": "e0",
+        }
+    ]
+    return {
+        "MATCH (n:Entity)": entities,
+        "MATCH (n:Episodic)": episodes,
+        "RELATES_TO": relates,
+        "MENTIONS": mentions,
+    }
+
+
+def pages(tables):
+    """Respond to the export queries from ``{query marker: records}``"""
+
+    def respond(query, params):
+        if "size(" in query:
+            return [{"dimensions": 3}] if "name_embedding" in query else []
+        records = next(rows for marker, rows in tables.items() if marker in query)
+        after = [r for r in records if r["props"]["uuid"] > params["after"]]
+        return sorted(after, key=lambda r: r["props"]["uuid"])[: params["limit"]]
+
+    return respond
+
+
+def writes(query, params):
+    """Respond to import batches; the ``gone`` entity does not exist"""
+    rows = params["rows"]
+    if "edge" not in rows[0]:
+        return []
+    return [
+        {
+            "uuid": row["edge"]["uuid"],
+            "source_found": True,
+            "target_found": row["target_uuid"] != "gone",
+        }
+        for row in rows
+    ]
+
+
+async def export(tmp_path):
+    driver = FakeDriver(pages(graph()))
+    crud = GraphitiCRUD(driver, vector_index=VectorIndexConfig(dimensions=3))
+    transfer = GraphTransfer(crud, TransferConfig(page_size=2))
+    return driver, await transfer.export_graph(tmp_path)
+
+
+@pytest.mark.asyncio
+async def test_export_pages_tables_into_parquet(tmp_path):
+    driver, results = await export(tmp_path)
+
+    assert results["entity_nodes"]["rows"] == 5
+    assert results["entity_nodes"]["pages"] == 3
+    assert [r["rows"] for r in results.values()] == [5, 1, 2, 1]
+    afters = [p["after"] for q, p in driver.queries if "labels(n)" in q]
+    assert afters == ["", "e1", "e3"]
+
+    entities = pq.ParquetFile(tmp_path / "entity_nodes.parquet")
+    assert entities.metadata.num_row_groups == 3
+    assert entities.schema_arrow.field("name_embedding").type == pa.list_(
+        pa.float32(), 3
+    )
+    edges = pq.read_table(tmp_path / "entity_edges.parquet")
+    assert edges.schema.field("fact_embedding").type == pa.list_(pa.float32(), 3)
+
+    rows = pq.read_table(tmp_path / "entity_nodes.parquet").to_pylist()
+    assert rows[1]["labels"] == ["Person"] and rows[0]["labels"] == []
+    assert rows[1]["created_at"] == CREATED
+    assert rows[1]["name_embedding"] == [1.0, 0.5, 0.25]
+    assert rows[1]["attributes"] == '{"role": "engineer"}'
+
+
+@pytest.mark.asyncio
+async def test_import_writes_one_page_per_statement(tmp_path):
+    await export(tmp_path)
+    driver = FakeDriver(writes)
+    transfer = GraphTransfer(GraphitiCRUD(driver), TransferConfig(page_size=2))
+
+    results = await transfer.import_graph(tmp_path)
+
+    assert [r["rows"] for r in results.values()] == [5, 1, 2, 1]
+    assert results["entity_edges"]["failed"] == 1
+    assert max(len(params["rows"]) for _, params in driver.runs) <= 2
+    assert driver.commits == len(driver.runs) and driver.queries == []
+
+    entity_runs = [(q, p) for q, p in driver.runs if "MERGE (n:Entity" in q]
+    labeled = [p["rows"] for q, p in entity_runs if "SET n:Person" in q]
+    assert sorted(row["uuid"] for rows in labeled for row in rows) == ["e1", "e3"]
+    node = entity_runs[0][1]["rows"][0]
+    assert node["role"] == "engineer" and node["created_at"] == CREATED
+    assert node["name_embedding"] == [0.0, 0.5, 0.25]
+    assert "labels" not in node and "attributes" not in node
+
+    edge = next(p["rows"][0] for q, p in driver.runs if "RELATES_TO" in q)
+    assert edge["source_uuid"] == "e0" and edge["edge"]["episodes"] == ["ep0"]
+    assert "fact_embedding" not in edge["edge"]
@@ -16,7 +16,8 @@ insights from knowledge graphs using an agentic LLM interface.
 
 Requirements:
 - Neo4j running locally with a graph populated with `Person` nodes and relationships.
-- Ollama with the Mistral model running locally at http://localhost:11434.
+- Ollama with the Mistral model running locally at http://localhost:11434, or
+  several instances listed comma-separated in OLLAMA_URLS to spread the load.
 - Python packages: neo4j, requests, json
 
 Example:
@@ -24,16 +25,23 @@ Run this script to get a human-readable summary of a social graph stored in Neo4
 generated by a local AI model.
 """
 
-from neo4j import GraphDatabase, basic_auth
+import os
+import sys
 import requests
 import json
 
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from main.endpoint_pool import EndpointPool
+from main.neo4j_pool import Neo4jPoolConfig, drivers
+
 NEO4J_URI = "bolt://localhost:7687"
 NEO4J_USER = "neo4j"
 NEO4J_PASSWORD = "password"
 
 OLLAMA_URL = "http://localhost:11434/api/chat"
 MODEL = "mistral"
+OLLAMA_POOL = EndpointPool.from_env()
 
 
 def get_people_profiles(driver):
@@ -84,16 +92,22 @@ def ask_mistral(prompt):
         "stream": False,
     }
 
-    response = requests.post(OLLAMA_URL, json=payload)
-    if response.status_code == 200:
-        return response.json()["message"]["content"]
-    else:
-        raise Exception(f"Ollama error: {response.status_code} - {response.text}")
+    with OLLAMA_POOL.lease() as endpoint:
+        response = requests.post(endpoint.resolve(OLLAMA_URL), json=payload)
+        if response.status_code != 200:
+            raise requests.HTTPError(
+                f"Ollama error: {response.status_code} - {response.text}",
+                response=response,
+            )
+    return response.json()["message"]["content"]
 
 
 def main():
-    driver = GraphDatabase.driver(
-        NEO4J_URI, auth=basic_auth(NEO4J_USER, NEO4J_PASSWORD)
+    driver = drivers.sync_driver(
+        Neo4jPoolConfig.from_env(
+            uri=NEO4J_URI, user=NEO4J_USER, password=NEO4J_PASSWORD
+        ),
+        user="test_llm",
     )
     try:
         people = get_people_profiles(driver)
@@ -115,7 +129,7 @@ def main():
         print(summary)
 
     finally:
-        driver.close()
+        drivers.release_sync(driver, user="test_llm")
 
 
 if __name__ == "__main__":
@@ -0,0 +1,171 @@
+"""
+This test suite validates the SQLite-backed `LLMResponseCache`.
+
+Functionality:
+- Verifies that cache keys depend on model, prompt/messages, temperature,
+  grammar and max_tokens, but not on transport flags such as `stream`.
+- Checks that requests with a temperature above zero bypass the cache unless
+  explicitly allowed.
+- Tests TTL expiry, least-recently-used eviction and hit-rate statistics.
+- Replays a chunking run against a mock Ollama server and asserts that the
+  second run is served entirely from the cache, for both the chunker and
+  `LocalAiClient`.
+- Checks that `LocalAiClient` only caches responses that pass JSON and
+  schema validation.
+
+Requirements:
+- pytest
+- Custom modules: main.llm_cache, main.llm_chunker, main.local_ai_client
+
+Use Case:
+Used to make sure re-running ingestion does not pay for identical inference twice.
+"""
+
+import time
+import pytest
+from pydantic import BaseModel
+from mock_ollama import MockOllamaServer
+from main.llm_cache import LLMResponseCache, CacheConfig
+from main.llm_chunker import MistralChunker, LLMConfig, ChunkingConfig
+from main.local_ai_client import LocalAiClient
+from graphiti_core.prompts import Message
+from graphiti_core.llm_client.config import LLMConfig as GraphitiLLMConfig
+
+
+@pytest.fixture
+def cache(tmp_path):
+    cache = LLMResponseCache(CacheConfig(path=str(tmp_path / "cache.sqlite")))
+    yield cache
+    cache.close()
+
+
+def body(**overrides):
+    request = {"model": "mistral", "prompt": "Hello", "temperature": 0}
+    request.update(overrides)
+    return request
+
+
+def test_key_covers_output_determining_fields():
+    key = LLMResponseCache.make_key(body())
+
+    assert key == LLMResponseCache.make_key(body(stream=True))
+    assert key != LLMResponseCache.make_key(body(model="llama3"))
+    assert key != LLMResponseCache.make_key(body(prompt="Hi"))
+    assert key != LLMResponseCache.make_key(body(grammar="root ::= object"))
+    assert key != LLMResponseCache.make_key(body(max_tokens=10))
+    assert key != LLMResponseCache.make_key(body(temperature=0.7))
+
+
+def test_lookup_and_store_round_trip(cache):
+    assert cache.lookup(body()) is None
+    cache.store(body(), "World")
+
+    assert cache.lookup(body()) == "World"
+    assert cache.stats() == {
+        "hits": 1,
+        "misses": 1,
+        "bypassed": 0,
+        "hit_rate": 0.5,
+        "entries": 1,
+    }
+
+
+def test_nonzero_temperature_bypasses_cache(cache, tmp_path):
+    cache.store(body(temperature=0.5), "World")
+
+    assert cache.lookup(body(temperature=0.5)) is None
+    assert len(cache) == 0
+    assert cache.stats()["bypassed"] == 1
+
+    allowing = LLMResponseCache(
+        CacheConfig(path=str(tmp_path / "allow.sqlite"), allow_nondeterministic=True)
+    )
+    allowing.store(body(temperature=0.5), "World")
+    assert allowing.lookup(body(temperature=0.5)) == "World"
+    allowing.close()
+
+
+def test_entries_expire_after_ttl(tmp_path):
+    cache = LLMResponseCache(
+        CacheConfig(path=str(tmp_path / "ttl.sqlite"), ttl_seconds=0.05)
+    )
+    cache.store(body(), "World")
+    time.sleep(0.1)
+
+    assert cache.lookup(body()) is None
+    assert len(cache) == 0
+    cache.close()
+
+
+def test_least_recently_used_entries_are_evicted(tmp_path):
+    cache = LLMResponseCache(
+        CacheConfig(path=str(tmp_path / "lru.sqlite"), max_entries=2)
+    )
+    cache.store(body(prompt="a"), "A")
+    time.sleep(0.01)
+    cache.store(body(prompt="b"), "B")
+    time.sleep(0.01)
+    cache.lookup(body(prompt="a"))
+    time.sleep(0.01)
+    cache.store(body(prompt="c"), "C")
+
+    assert len(cache) == 2
+    assert cache.lookup(body(prompt="b")) is None
+    assert cache.lookup(body(prompt="a")) == "A"
+    cache.close()
+
+
+def test_chunker_replay_is_served_from_cache(cache):
+    text = "One is first. Two is second.\nThree is third. Four is fourth."
+    with MockOllamaServer() as ollama:
+        llm_config = LLMConfig(base_url=f"{ollama.url}/api/generate", temperature=0)
+        config = ChunkingConfig(max_tokens=4, min_tokens=1)
+
+        first = MistralChunker(llm_config, config, cache=cache).chunk_document(text)
+        replay_chunker = MistralChunker(llm_config, config, cache=cache)
+        replay = replay_chunker.chunk_document(text)
+
+    assert replay == first
+    assert len(ollama.requests) == 2
+    assert replay_chunker.stats["llm_calls"] == 0
+    assert cache.stats()["hit_rate"] == 0.5
+
+
+def test_local_ai_client_replay_is_served_from_cache(cache):
+    messages = [Message(role="user", content="Who is Alice?")]
+    with MockOllamaServer(responder=lambda body: '{"name": "Alice"}') as ollama:
+        config = GraphitiLLMConfig(base_url=f"{ollama.url}/api/chat", temperature=0)
+        client = LocalAiClient(config=config, response_cache=cache)
+
+        first = client.execute_llm_query(messages)
+        replay = client.execute_llm_query(messages)
+
+    assert first == replay == '{"name": "Alice"}'
+    assert len(ollama.requests) == 1
+    assert cache.stats()["hits"] == 1
+
+
+class Person(BaseModel):
+    name: str
+
+
+@pytest.mark.asyncio
+async def test_local_ai_client_caches_only_valid_responses(tmp_path):
+    cache = LLMResponseCache(
+        CacheConfig(path=str(tmp_path / "cache.sqlite"), allow_nondeterministic=True)
+    )
+    replies = iter(['{"name": 1}', '{"name": "Alice"}', '{"name": "Bob"}'])
+    messages = [Message(role="user", content="Who is it?")]
+    with MockOllamaServer(responder=lambda body: next(replies)) as ollama:
+        config = GraphitiLLMConfig(base_url=f"{ollama.url}/api/chat", temperature=0.7)
+        client = LocalAiClient(config=config, response_cache=cache)
+
+        first = await client._generate_response(messages, Person)
+        second = await client._generate_response(messages, Person)
+        await client.close()
+
+    # The invalid first answer was not cached, so the same messages sample again
+    assert first == {"name": "Alice"} and second == {"name": "Bob"}
+    assert len(ollama.requests) == 3
+    assert len(cache) == 2
+    cache.close()
@@ -0,0 +1,222 @@
+"""
+This test suite validates the `MistralChunker` chunking pipeline without a running
+Ollama instance.
+
+Functionality:
+- Checks that the embedding mode places breakpoints where the topic changes.
+- Verifies that embedding mode respects the min/max token budgets, cutting
+  oversized sentences by token count rather than word count.
+- Confirms that embedding mode embeds all sentences in a single call and makes
+  no LLM calls.
+- Checks that token counting is local, memoized, and carried into chunk metadata.
+- Runs the async path against a mock Ollama server to verify concurrent, pooled
+  semantic_split calls that reassemble in document order.
+- Checks that async embedding mode embeds off the event loop thread, and that
+  the Ollama embed endpoint is called through the pooled, retrying session.
+
+Requirements:
+- pytest
+- Custom modules: main.llm_chunker
+
+Use Case:
+Used to guard the chunking behaviour that feeds documents into the knowledge graph.
+"""
+
+import threading
+import pytest
+from mock_ollama import MockOllamaServer
+from main.llm_chunker import MistralChunker, LLMConfig, ChunkingConfig
+
+
+class TopicEmbedder:
+    """Maps each sentence to a one-hot vector for the topic word it contains"""
+
+    TOPICS = ["hole", "cat", "tax"]
+
+    def __init__(self):
+        self.calls = 0
+        self.threads = []
+
+    def embed(self, texts):
+        self.calls += 1
+        self.threads.append(threading.get_ident())
+        return [
+            [1.0 if topic in text else 0.0 for topic in self.TOPICS] for text in texts
+        ]
+
+
+DOCUMENT = (
+    "A black hole bends light. The hole has an event horizon. Nothing leaves the hole. "
+    "My cat sleeps all day. The cat chases mice. A cat likes milk. "
+    "The tax is due in April. Every tax form is long. Nobody enjoys tax season."
+)
+
+
+@pytest.fixture
+def embedder():
+    return TopicEmbedder()
+
+
+def make_chunker(embedder, **overrides):
+    config = ChunkingConfig(
+        max_tokens=overrides.get("max_tokens", 100),
+        min_tokens=overrides.get("min_tokens", 1),
+        semantic_mode="embedding",
+        window_size=1,
+    )
+    return MistralChunker(LLMConfig(), config, embedder=embedder)
+
+
+def test_embedding_mode_splits_on_topic_change(embedder):
+    chunker = make_chunker(embedder)
+
+    chunks = list(chunker.chunk_text(DOCUMENT))
+
+    assert len(chunks) == 3
+    assert "hole" in chunks[0] and "cat" not in chunks[0]
+    assert "cat" in chunks[1] and "hole" not in chunks[1]
+    assert "tax" in chunks[2] and "cat" not in chunks[2]
+
+
+def test_embedding_mode_single_batched_call_no_llm(embedder):
+    chunker = make_chunker(embedder)
+
+    list(chunker.chunk_text(DOCUMENT))
+
+    assert embedder.calls == 1
+    assert chunker.stats == {"llm_calls": 0, "embed_calls": 1}
+
+
+def test_embedding_mode_respects_max_tokens(embedder):
+    chunker = make_chunker(embedder, max_tokens=8)
+
+    chunks = list(chunker.chunk_text(DOCUMENT))
+
+    assert all(len(c.split()) <= 8 for c in chunks)
+
+
+def test_embedding_mode_respects_min_tokens(embedder):
+    chunker = make_chunker(embedder, min_tokens=30)
+
+    chunks = list(chunker.chunk_text(DOCUMENT))
+
+    # Breakpoints are ignored until a chunk reaches the minimum size
+    assert len(chunks) == 1
+
+
+def test_oversized_sentences_are_cut_by_token_count(embedder):
+    chunker = make_chunker(embedder, max_tokens=5)
+    # Stand-in for a subword tokenizer: long words encode to two tokens
+    chunker.token_counter._encode = lambda text: [
+        piece for word in text.split() for piece in ([word] * (1 + (len(word) > 4)))
+    ]
+    sentence = "an extraordinarily long sentence with several lengthy words in it."
+
+    chunks = chunker.chunk_document(sentence)
+
+    assert " ".join(c["text"] for c in chunks) == sentence
+    assert all(0 < c["token_count"] <= 5 for c in chunks)
+    assert [c["token_count"] for c in chunks] == [
+        chunker.get_token_count(c["text"]) for c in chunks
+    ]
+
+
+@pytest.mark.asyncio
+async def test_async_embedding_mode_runs_off_the_event_loop(embedder):
+    chunker = make_chunker(embedder)
+
+    chunks = await chunker.achunk_document(DOCUMENT)
+
+    assert chunks == chunker.chunk_document(DOCUMENT)
+    assert embedder.threads[0] != threading.get_ident()
+
+
+def test_embed_endpoint_uses_the_pooled_session():
+    with MockOllamaServer(errors=[503]) as ollama:
+        llm_config = LLMConfig(embed_url=f"{ollama.url}/api/embed")
+        config = ChunkingConfig(min_tokens=1, semantic_mode="embedding")
+        chunker = MistralChunker(llm_config, config)
+
+        chunks = chunker.chunk_document(DOCUMENT)
+        chunker.chunk_document(DOCUMENT)
+        chunker.session.close()
+
+    assert chunks and chunker.stats["embed_calls"] == 2
+    # The 503 was retried, and both runs shared one keep-alive connection
+    assert len(ollama.requests) == 3
+    assert ollama.connections == 1
+
+
+def test_token_count_is_local_and_memoized():
+    chunker = MistralChunker(LLMConfig(), ChunkingConfig())
+
+    assert chunker.get_token_count("one two three") == 3
+    assert chunker.get_token_count("one two three") == 3
+
+    assert not chunker.token_counter.is_exact
+    assert chunker.token_counter.count.cache_info().hits == 1
+    assert chunker.stats["llm_calls"] == 0
+
+
+def test_chunk_document_reuses_chunk_counts():
+    config = ChunkingConfig(max_tokens=6, min_tokens=1, clean_text=False)
+    chunker = MistralChunker(LLMConfig(), config)
+    text = "alpha beta gamma\ndelta epsilon\nzeta eta theta iota"
+
+    chunks = chunker.chunk_document(text)
+
+    assert [c["token_count"] for c in chunks] == [5, 4]
+    assert [c["text"] for c in chunks] == [
+        "alpha beta gamma delta epsilon",
+        "zeta eta theta iota",
+    ]
+    # Paragraphs are counted once; the chunks themselves are never re-counted
+    assert chunker.token_counter.count.cache_info().currsize == 3
+    assert chunker.stats["llm_calls"] == 0
+
+
+PARAGRAPHS = "\n".join(
+    f"Paragraph {p} sentence one is here. Paragraph {p} sentence two is here."
+    for p in range(4)
+)
+
+
+@pytest.fixture
+def ollama():
+    with MockOllamaServer(latency=0.2) as server:
+        yield server
+
+
+def make_llm_chunker(ollama, max_concurrency=2):
+    llm_config = LLMConfig(base_url=f"{ollama.url}/api/generate")
+    config = ChunkingConfig(max_tokens=8, min_tokens=1, max_concurrency=max_concurrency)
+    return MistralChunker(llm_config, config)
+
+
+@pytest.mark.asyncio
+async def test_async_chunking_is_concurrent_and_ordered(ollama):
+    chunker = make_llm_chunker(ollama, max_concurrency=2)
+
+    chunks = await chunker.achunk_document(PARAGRAPHS)
+    await chunker.aclose()
+
+    assert [c["text"] for c in chunks] == [
+        f"Paragraph {p} sentence {n} is here." for p in range(4) for n in ("one", "two")
+    ]
+    assert [c["chunk_id"] for c in chunks] == list(range(8))
+    # Four calls, two at a time, over at most two pooled connections
+    assert len(ollama.requests) == 4
+    assert ollama.max_in_flight == 2
+    assert ollama.connections <= 2
+
+
+@pytest.mark.asyncio
+async def test_async_chunking_matches_sync_path(ollama):
+    chunker = make_llm_chunker(ollama)
+
+    async_chunks = await chunker.achunk_document(PARAGRAPHS)
+    await chunker.aclose()
+    sync_chunks = chunker.chunk_document(PARAGRAPHS)
+
+    assert async_chunks == sync_chunks
+    assert chunker.stats["llm_calls"] == 8
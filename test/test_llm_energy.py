@@ -31,7 +31,12 @@ This test suite helps validate the correctness of graph migrations, seed data, o
 before using the graph data in production dashboards or analytical tools.
 """
 
-from neo4j import GraphDatabase
+import os
+import sys
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from main.neo4j_pool import Neo4jPoolConfig, drivers
 
 NEO4J_URI = "bolt://localhost:7687"
 NEO4J_USER = "neo4j"
@@ -42,11 +47,16 @@ class TestEnergyDashboard:
 
     @classmethod
     def setup_class(cls):
-        cls.driver = GraphDatabase.driver(NEO4J_URI, auth=(NEO4J_USER, NEO4J_PASSWORD))
+        cls.driver = drivers.sync_driver(
+            Neo4jPoolConfig.from_env(
+                uri=NEO4J_URI, user=NEO4J_USER, password=NEO4J_PASSWORD
+            ),
+            user="test_llm_energy",
+        )
 
     @classmethod
     def teardown_class(cls):
-        cls.driver.close()
+        drivers.release_sync(cls.driver, user="test_llm_energy")
 
     def run_query(self, query, parameters=None):
         with self.driver.session() as session:
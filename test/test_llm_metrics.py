@@ -0,0 +1,169 @@
+"""
+This test suite validates the LLM call metrics recorded by `LocalAiClient`.
+
+Functionality:
+- Checks histogram bucketing and the Prometheus text and JSON exports.
+- Verifies that token usage is read from Ollama and OpenAI-style responses.
+- Runs `LocalAiClient` against a mock Ollama server and asserts that wall time,
+  queue time, prompt/completion tokens and tokens/s are recorded per caller,
+  for both buffered and streamed calls, and that failures are counted.
+- Checks that concurrent streamed calls each record their own token usage.
+
+Requirements:
+- pytest
+- pytest-asyncio
+- Custom modules: main.llm_metrics, main.local_ai_client
+
+Use Case:
+Used to monitor local LLM latency and throughput per graphiti workload without
+logging full payloads.
+"""
+
+import json
+import asyncio
+import pytest
+from graphiti_core.prompts import Message
+from graphiti_core.llm_client.config import LLMConfig
+from mock_ollama import MockOllamaServer
+from main.llm_metrics import Histogram, LLMCallRecord, LLMMetrics, llm_caller
+from main.local_ai_client import LocalAiClient
+
+
+def test_histogram_buckets_are_cumulative():
+    hist = Histogram((1, 5))
+    for value in (0.5, 1, 3, 10):
+        hist.observe(value)
+
+    assert hist.cumulative() == [(1, 2), (5, 3), (float("inf"), 4)]
+    assert hist.as_dict()["mean"] == pytest.approx(3.625)
+
+
+def test_usage_from_ollama_and_openai_responses():
+    record = LLMCallRecord("test", "mistral", wall_time=3.0, queue_time=1.0)
+    record.update_usage({"usage": {"prompt_tokens": 12, "completion_tokens": 8}})
+    assert (record.prompt_tokens, record.completion_tokens) == (12, 8)
+    assert record.tokens_per_second == pytest.approx(4.0)
+
+    record.update_usage(
+        {"prompt_eval_count": 20, "eval_count": 10, "eval_duration": 5 * 10**8}
+    )
+    assert record.prompt_tokens == 20
+    assert record.tokens_per_second == pytest.approx(20.0)
+
+
+def test_prometheus_and_json_export():
+    metrics = LLMMetrics()
+    metrics.record(
+        LLMCallRecord("chat", "mistral", wall_time=0.2, completion_tokens=40)
+    )
+    metrics.record(LLMCallRecord('odd"name', "mistral", status="error"))
+
+    text = metrics.to_prometheus()
+
+    assert "# TYPE llm_wall_time_seconds histogram" in text
+    assert (
+        'llm_wall_time_seconds_bucket{caller="chat",model="mistral",tier="medium",le="0.25"} 1'
+        in text
+    )
+    assert (
+        'llm_wall_time_seconds_count{caller="chat",model="mistral",tier="medium"} 1'
+        in text
+    )
+    assert (
+        'llm_calls_total{caller="odd\\"name",model="mistral",status="error",tier="medium"} 1'
+        in text
+    )
+    exported = json.loads(metrics.to_json())
+    assert {h["name"] for h in exported["histograms"]} >= {
+        "llm_wall_time_seconds",
+        "llm_completion_tokens",
+    }
+
+
+def reply(body):
+    return '{"entities": ["Alice"]} trailing words here'
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("stream", [False, True])
+async def test_client_records_metrics_per_caller(stream):
+    with MockOllamaServer(latency=0.05, responder=reply) as ollama:
+        config = LLMConfig(base_url=f"{ollama.url}/api/chat", temperature=0)
+        client = LocalAiClient(config=config, stream=stream, stop_at_json=False)
+        messages = [Message(role="user", content="Extract these entities")]
+
+        with llm_caller("ingest"):
+            await client._generate_response(messages)
+            await client._generate_response(messages)
+        await client._generate_response(messages)
+        await client.close()
+
+    metrics = client.metrics
+    labels = {"caller": "ingest", "model": "mistral"}
+    assert metrics.counter("llm_calls_total", **labels, status="ok") == 2
+    assert metrics.histogram("llm_wall_time_seconds", **labels).sum >= 0.1
+    assert metrics.histogram("llm_queue_time_seconds", **labels).count == 2
+    assert metrics.histogram("llm_prompt_tokens", **labels).sum == 2 * 3
+    assert metrics.histogram("llm_completion_tokens", **labels).sum == 2 * 5
+    assert metrics.histogram("llm_tokens_per_second", **labels).count == 2
+    assert (
+        metrics.counter(
+            "llm_calls_total", caller="unknown", model="mistral", status="ok"
+        )
+        == 1
+    )
+
+
+def sized_reply(body):
+    words = len(body["messages"][-1]["content"].split())
+    return '{"entities": ["Alice"]} ' + "word " * words
+
+
+@pytest.mark.asyncio
+async def test_concurrent_streamed_calls_record_their_own_usage():
+    with MockOllamaServer(responder=sized_reply, token_delay=0.005) as ollama:
+        config = LLMConfig(base_url=f"{ollama.url}/api/chat", temperature=0)
+        client = LocalAiClient(config=config, stream=True, stop_at_json=False)
+
+        async def call(caller, words):
+            with llm_caller(caller):
+                content = " ".join(["word"] * words)
+                await client._generate_response([Message(role="user", content=content)])
+
+        await asyncio.gather(call("large", 30), call("small", 2), call("large", 30))
+        await client.close()
+
+    for caller, words, calls in (("large", 30, 2), ("small", 2, 1)):
+        labels = {"caller": caller, "model": "mistral"}
+        prompt = client.metrics.histogram("llm_prompt_tokens", **labels)
+        completion = client.metrics.histogram("llm_completion_tokens", **labels)
+        assert (
+            client.metrics.histogram("llm_queue_time_seconds", **labels).count == calls
+        )
+        assert completion.sum == calls * (words + 2)
+        assert prompt.count == calls and prompt.sum == calls * words
+    assert not hasattr(client, "last_queue_time")
+
+
+@pytest.mark.asyncio
+async def test_client_counts_failed_calls():
+    with MockOllamaServer(responder=reply, errors=[400]) as ollama:
+        config = LLMConfig(base_url=f"{ollama.url}/api/chat", temperature=0)
+        client = LocalAiClient(config=config)
+
+        with pytest.raises(Exception):
+            await client._generate_response([Message(role="user", content="Hi")])
+        await client.close()
+
+    assert (
+        client.metrics.counter(
+            "llm_calls_total", caller="unknown", model="mistral", status="error"
+        )
+        == 1
+    )
+    assert (
+        client.metrics.histogram(
+            "llm_wall_time_seconds", caller="unknown", model="mistral"
+        )
+        is None
+    )
@@ -0,0 +1,206 @@
+"""
+This test suite validates the adaptive concurrency limiter used by
+`LocalAiClient`.
+
+Functionality:
+- Verifies that in-flight requests never exceed the current limit.
+- Checks AIMD behaviour: additive increase on fast successes, multiplicative
+  decrease on slow calls and overload errors.
+- Tests the bounded wait queue and queue timeouts, which surface as
+  `RateLimitError`.
+- Confirms per-endpoint limiter configuration.
+- Checks that interactive requests are dispatched ahead of queued background
+  requests, that background requests are not starved, and that queue wait is
+  reported per lane.
+
+Requirements:
+- pytest
+- pytest-asyncio
+- Custom modules: main.llm_scheduler
+
+Use Case:
+Used to keep a local Ollama instance busy without overloading it when graphiti
+fans out many extraction prompts.
+"""
+
+import asyncio
+import httpx
+import pytest
+from graphiti_core.llm_client.errors import RateLimitError
+from main.llm_scheduler import (
+    AdaptiveLimiter,
+    LimiterConfig,
+    LLMScheduler,
+    Priority,
+    SchedulerConfig,
+    llm_priority,
+)
+
+
+async def hold(limiter, seconds, observed):
+    async with limiter.slot():
+        observed.append(limiter.in_flight)
+        await asyncio.sleep(seconds)
+
+
+@pytest.mark.asyncio
+async def test_in_flight_never_exceeds_limit():
+    limiter = AdaptiveLimiter(LimiterConfig(initial_limit=3, max_limit=3))
+    observed = []
+
+    await asyncio.gather(*(hold(limiter, 0.01, observed) for _ in range(10)))
+
+    assert max(observed) == 3
+    assert limiter.in_flight == 0
+    assert limiter.stats()["completed"] == 10
+
+
+def test_additive_increase_and_multiplicative_decrease():
+    limiter = AdaptiveLimiter(LimiterConfig(initial_limit=2, max_limit=8))
+
+    limiter.in_flight = 2
+    limiter.release(0.1)
+    limiter.release(0.1)
+    assert limiter.limit == pytest.approx(2.5 + 1 / 2.5)
+
+    limiter.in_flight = 1
+    limiter.release(0.1, overloaded=True)
+    assert limiter.limit == pytest.approx((2.5 + 1 / 2.5) / 2)
+    assert limiter.errors == 1
+
+
+def test_slow_calls_shrink_the_limit_to_minimum():
+    limiter = AdaptiveLimiter(
+        LimiterConfig(initial_limit=4, min_limit=1, latency_target=1.0)
+    )
+    for _ in range(5):
+        limiter.in_flight = 1
+        limiter.release(2.0)
+
+    assert limiter.limit == 1.0
+    assert limiter.capacity == 1
+
+
+@pytest.mark.asyncio
+async def test_overload_errors_inside_slot_decrease_limit():
+    limiter = AdaptiveLimiter(LimiterConfig(initial_limit=4))
+    request = httpx.Request("POST", "http://ollama")
+    response = httpx.Response(503, request=request)
+
+    with pytest.raises(httpx.HTTPStatusError):
+        async with limiter.slot():
+            raise httpx.HTTPStatusError("busy", request=request, response=response)
+    with pytest.raises(ValueError):
+        async with limiter.slot():
+            raise ValueError("bad json")
+
+    assert limiter.limit == 2.0
+    assert limiter.errors == 1
+
+
+@pytest.mark.asyncio
+async def test_full_queue_and_queue_timeout_raise_rate_limit_error():
+    limiter = AdaptiveLimiter(
+        LimiterConfig(initial_limit=1, max_limit=1, max_queue=1, queue_timeout=0.05)
+    )
+    await limiter.acquire()
+    waiting = asyncio.create_task(limiter.acquire())
+    await asyncio.sleep(0)
+
+    with pytest.raises(RateLimitError, match="queue is full"):
+        await limiter.acquire()
+    with pytest.raises(RateLimitError, match="Timed out"):
+        await waiting
+
+    assert limiter.rejected == 2
+    assert limiter.queued == 0
+
+
+@pytest.mark.asyncio
+async def test_queue_time_is_recorded():
+    limiter = AdaptiveLimiter(LimiterConfig(initial_limit=1, max_limit=1))
+    observed = []
+
+    await asyncio.gather(*(hold(limiter, 0.05, observed) for _ in range(3)))
+
+    stats = limiter.stats()
+    assert stats["queue_time_max"] >= 0.09
+    assert stats["queue_time_avg"] > 0
+
+
+def test_limits_are_configurable_per_endpoint():
+    small = LimiterConfig(initial_limit=1, max_limit=1)
+    scheduler = LLMScheduler(SchedulerConfig(endpoints={"http://gpu-small": small}))
+
+    assert scheduler.limiter("http://gpu-small", "mistral").config is small
+    assert scheduler.limiter("http://gpu-big", "mistral").config is not small
+    assert scheduler.limiter("http://gpu-small", "phi3") is not scheduler.limiter(
+        "http://gpu-small", "mistral"
+    )
+
+
+async def tagged(limiter, lane, order, seconds=0.01):
+    with llm_priority(lane):
+        async with limiter.slot():
+            order.append(lane)
+            await asyncio.sleep(seconds)
+
+
+@pytest.mark.asyncio
+async def test_interactive_requests_jump_the_background_queue():
+    limiter = AdaptiveLimiter(LimiterConfig(initial_limit=1, max_limit=1))
+    order = []
+    await limiter.acquire()
+
+    tasks = [
+        asyncio.create_task(tagged(limiter, Priority.BACKGROUND, order))
+        for _ in range(3)
+    ]
+    await asyncio.sleep(0)
+    tasks.append(asyncio.create_task(tagged(limiter, Priority.INTERACTIVE, order)))
+    await asyncio.sleep(0)
+    limiter.release(0.01)
+    await asyncio.gather(*tasks)
+
+    assert order[0] == Priority.INTERACTIVE
+    lanes = limiter.stats()["lanes"]
+    assert (
+        lanes["background"]["queue_time_max"] > lanes["interactive"]["queue_time_max"]
+    )
+
+
+@pytest.mark.asyncio
+async def test_background_requests_are_not_starved():
+    limiter = AdaptiveLimiter(
+        LimiterConfig(initial_limit=1, max_limit=1, starvation_after=0.05)
+    )
+    order = []
+    await limiter.acquire()
+
+    background = asyncio.create_task(tagged(limiter, Priority.BACKGROUND, order))
+    await asyncio.sleep(0.06)
+    interactive = [
+        asyncio.create_task(tagged(limiter, Priority.INTERACTIVE, order))
+        for _ in range(3)
+    ]
+    await asyncio.sleep(0)
+    limiter.release(0.01)
+    await asyncio.gather(background, *interactive)
+
+    assert order[0] == Priority.BACKGROUND
+
+
+@pytest.mark.asyncio
+async def test_explicit_priority_overrides_context():
+    limiter = AdaptiveLimiter()
+
+    with llm_priority(Priority.BACKGROUND):
+        async with limiter.slot(Priority.INTERACTIVE):
+            pass
+        async with limiter.slot():
+            pass
+
+    lanes = limiter.stats()["lanes"]
+    assert len(limiter.queue_times[Priority.INTERACTIVE]) == 1
+    assert len(limiter.queue_times[Priority.BACKGROUND]) == 1
+    assert lanes["interactive"]["queued"] == 0
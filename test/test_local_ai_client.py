@@ -0,0 +1,154 @@
+"""
+This test suite validates the async transport of `LocalAiClient` against a mock
+Ollama server.
+
+Functionality:
+- Verifies that concurrent `_generate_response` calls run in parallel over a
+  shared keep-alive connection pool instead of blocking the event loop.
+- Checks that transient overload statuses are retried with backoff.
+- Confirms that persistent overload surfaces as graphiti's `RateLimitError`.
+- Verifies that the per-endpoint scheduler caps in-flight requests and records
+  queue time.
+- Checks that graphiti's small model tier is routed to `config.small_model`
+  and that latency is reported per tier.
+
+Requirements:
+- pytest
+- pytest-asyncio
+- Custom modules: main.local_ai_client
+
+Use Case:
+Used to make sure graphiti's parallel extraction calls are actually parallel
+when backed by a local model.
+"""
+
+import time
+import asyncio
+import pytest
+from graphiti_core.prompts import Message
+from graphiti_core.llm_client.config import LLMConfig, ModelSize
+from graphiti_core.llm_client.errors import RateLimitError
+from mock_ollama import MockOllamaServer
+from main.local_ai_client import LocalAiClient
+from main.ollama_http import HttpConfig
+from main.llm_scheduler import LLMScheduler, SchedulerConfig, LimiterConfig
+
+
+def json_responder(body):
+    return 'Here you go: {"entities": []}'
+
+
+def make_client(ollama, scheduler=None, **http):
+    config = LLMConfig(base_url=f"{ollama.url}/api/chat", temperature=0)
+    http_config = HttpConfig(backoff_factor=0.01, **http)
+    if scheduler is None:
+        # A fixed, generous cap so only the transport limits concurrency
+        fixed = LimiterConfig(initial_limit=16, min_limit=16, max_limit=16)
+        scheduler = LLMScheduler(SchedulerConfig(default=fixed))
+    return LocalAiClient(config=config, http_config=http_config, scheduler=scheduler)
+
+
+def messages():
+    return [Message(role="user", content="Extract entities")]
+
+
+@pytest.mark.asyncio
+async def test_concurrent_calls_do_not_block_event_loop():
+    with MockOllamaServer(latency=0.2, responder=json_responder) as ollama:
+        client = make_client(ollama, max_connections=4)
+
+        start = time.perf_counter()
+        results = await asyncio.gather(
+            *(client._generate_response(messages()) for _ in range(8))
+        )
+        elapsed = time.perf_counter() - start
+        await client.close()
+
+    assert results == [{"entities": []}] * 8
+    # Eight 0.2s calls, four at a time
+    assert elapsed < 1.0
+    assert ollama.max_in_flight == 4
+    assert ollama.connections <= 4
+
+
+@pytest.mark.asyncio
+async def test_transient_overload_is_retried():
+    with MockOllamaServer(responder=json_responder, errors=[503, 502]) as ollama:
+        client = make_client(ollama, max_retries=2)
+
+        result = await client._generate_response(messages())
+        await client.close()
+
+    assert result == {"entities": []}
+    assert len(ollama.requests) == 3
+
+
+@pytest.mark.asyncio
+async def test_persistent_overload_raises_rate_limit_error():
+    with MockOllamaServer(responder=json_responder, errors=[429] * 3) as ollama:
+        client = make_client(ollama, max_retries=2)
+
+        with pytest.raises(RateLimitError):
+            await client._generate_response(messages())
+        await client.close()
+
+    assert len(ollama.requests) == 3
+
+
+@pytest.mark.asyncio
+async def test_scheduler_caps_in_flight_requests_per_endpoint():
+    with MockOllamaServer(latency=0.1, responder=json_responder) as ollama:
+        endpoint = f"{ollama.url}/api/chat"
+        capped = LimiterConfig(initial_limit=2, min_limit=1, max_limit=2)
+        scheduler = LLMScheduler(SchedulerConfig(endpoints={endpoint: capped}))
+        client = make_client(ollama, scheduler=scheduler)
+
+        await asyncio.gather(*(client._generate_response(messages()) for _ in range(6)))
+        await client.close()
+
+    assert ollama.max_in_flight == 2
+    stats = scheduler.stats()[f"{endpoint}#mistral"]
+    assert stats["completed"] == 6
+    assert stats["queue_time_max"] > 0.1
+
+
+def per_model_responder(body):
+    # A big model is slower than the small one
+    time.sleep(0.15 if body["model"] == "mistral" else 0.01)
+    return '{"duplicate": false}'
+
+
+@pytest.mark.asyncio
+async def test_model_size_routes_small_tier_to_small_model():
+    with MockOllamaServer(responder=per_model_responder) as ollama:
+        config = LLMConfig(
+            base_url=f"{ollama.url}/api/chat",
+            temperature=0,
+            model="mistral",
+            small_model="phi3",
+        )
+        client = LocalAiClient(config=config)
+
+        for size in (ModelSize.small, ModelSize.medium, None):
+            await client._generate_response(messages(), model_size=size)
+        await client.close()
+
+    assert [body["model"] for _, body in ollama.requests] == [
+        "phi3",
+        "mistral",
+        "mistral",
+    ]
+    latency = client.metrics.summary("llm_wall_time_seconds", by="tier")
+    assert latency["small"]["count"] == 1 and latency["medium"]["count"] == 2
+    assert latency["small"]["mean"] < latency["medium"]["mean"]
+    assert set(client.scheduler.stats()) == {
+        f"{ollama.url}/api/chat#phi3",
+        f"{ollama.url}/api/chat#mistral",
+    }
+
+
+def test_small_tier_falls_back_to_main_model():
+    client = LocalAiClient(config=LLMConfig(model="llama3"))
+
+    assert client.model_for(ModelSize.small) == "llama3"
+    assert LocalAiClient().model_for(ModelSize.medium) == "mistral"
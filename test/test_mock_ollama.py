@@ -0,0 +1,69 @@
+"""
+This test suite validates the simulation knobs of the mock Ollama server used by
+the client tests and benchmarks.
+
+Functionality:
+- Checks that `max_parallel` caps concurrent generations and that requests beyond
+  `max_queue` are rejected with a 503, like a saturated Ollama.
+- Verifies that a seeded error rate injects the same failures on every run.
+- Confirms that the token rate shapes generation time and is reported through
+  `eval_count` and `eval_duration`.
+
+Requirements:
+- pytest, requests
+- Custom modules: test/mock_ollama.py
+
+Use Case:
+Used to keep the mock's latency, error and concurrency behaviour trustworthy so
+benchmark numbers from it can be compared across changes.
+"""
+
+import time
+import requests
+from concurrent.futures import ThreadPoolExecutor
+from mock_ollama import MockOllamaServer
+
+
+def generate(url, stream=False):
+    return requests.post(
+        f"{url}/api/generate",
+        json={"model": "mistral", "prompt": "Text: One. Two.", "stream": stream},
+        timeout=10,
+    )
+
+
+def test_parallel_limit_queues_and_rejects_overflow():
+    with MockOllamaServer(latency=0.2, max_parallel=2, max_queue=2) as ollama:
+        with ThreadPoolExecutor(max_workers=6) as pool:
+            statuses = [
+                r.status_code
+                for r in pool.map(lambda _: generate(ollama.url), range(6))
+            ]
+
+    assert ollama.max_in_flight == 2
+    assert sorted(statuses) == [200, 200, 200, 200, 503, 503]
+    assert ollama.rejected == 2
+
+
+def test_seeded_error_rate_is_reproducible():
+    def failures():
+        with MockOllamaServer(error_rate=0.3, error_status=500, seed=7) as ollama:
+            return [generate(ollama.url).status_code for _ in range(20)]
+
+    first = failures()
+
+    assert first == failures()
+    assert set(first) == {200, 500}
+
+
+def test_token_rate_sets_generation_time_and_usage():
+    with MockOllamaServer(tokens_per_second=100) as ollama:
+        start = time.perf_counter()
+        body = generate(ollama.url).json()
+        elapsed = time.perf_counter() - start
+
+    assert body["response"] == "One. ||| Two."
+    assert body["eval_count"] == 3
+    assert body["eval_duration"] == 30_000_000
+    assert elapsed >= 0.03
+    assert ollama.tokens_generated == 3
@@ -0,0 +1,138 @@
+"""
+This test suite validates the shared Neo4j driver registry without a running
+Neo4j instance (drivers connect lazily).
+
+Functionality:
+- Checks that every component asking for the same server and user gets the
+  same connection pool, built with the configured pool settings.
+- Verifies that graphiti drivers handed out by the registry run on the shared
+  pool and that closing them leaves it open.
+- Confirms that pool stats report utilization and the components using each
+  pool, and that closing the registry closes every pool.
+- Checks that releasing a driver only closes its pool once no other
+  component still uses it, and that GraphitiCRUD and ChatMemory give back
+  their holds when closed.
+- Checks that pool settings are read from the environment with overrides.
+
+Requirements:
+- pytest, pytest-asyncio, neo4j, graphiti_core
+- Custom modules: main.neo4j_pool, main.crud_graphiti, chat.chat_memory
+
+Use Case:
+Used to keep GraphitiCRUD, ChatMemory, Graphiti and the scripts from opening a
+connection pool each against the same server.
+"""
+
+import asyncio
+import pytest
+from neo4j.exceptions import DriverError
+import chat.chat_memory
+import main.crud_graphiti
+from chat.chat_memory import ChatMemory
+from main.crud_graphiti import GraphitiCRUD
+from main.neo4j_pool import Neo4jDriverRegistry, Neo4jPoolConfig
+
+
+def config(**overrides):
+    return Neo4jPoolConfig(uri="bolt://localhost:7999", **overrides)
+
+
+@pytest.mark.asyncio
+async def test_components_share_one_pool_per_server():
+    registry = Neo4jDriverRegistry(config(max_connection_pool_size=7, fetch_size=50))
+
+    driver = registry.driver(user="chat_memory")
+    graph = registry.graph_driver(user="crud_graphiti")
+    other = registry.driver(config(user="admin"))
+    blocking = registry.sync_driver(user="script")
+
+    assert registry.driver() is driver and graph.client is driver
+    assert other is not driver and blocking is not driver
+    assert driver._pool.pool_config.max_connection_pool_size == 7
+    assert driver._default_workspace_config.fetch_size == 50
+
+    await graph.close()
+    async with driver.session():
+        pass
+
+    stats = registry.stats()
+    pool = stats["neo4j@bolt://localhost:7999"]
+    assert pool["users"] == {"chat_memory": 1, "crud_graphiti": 1, "default": 1}
+    assert (pool["in_use"], pool["idle"], pool["max_size"]) == (0, 0, 7)
+    assert pool["utilization"] == 0.0
+    assert set(stats) == {
+        "neo4j@bolt://localhost:7999",
+        "admin@bolt://localhost:7999",
+        "neo4j@bolt://localhost:7999 (sync)",
+    }
+
+    await registry.close()
+    assert registry.stats() == {}
+    with pytest.raises(DriverError):
+        driver.session()
+
+
+@pytest.mark.asyncio
+async def test_release_closes_a_pool_after_its_last_user():
+    registry = Neo4jDriverRegistry(config())
+    script = registry.sync_driver(user="script")
+    registry.sync_driver(user="other")
+    graph = registry.graph_driver(user="crud_graphiti")
+
+    registry.release_sync(script, user="script")
+    with script.session():
+        pass
+    assert registry.stats()["neo4j@bolt://localhost:7999 (sync)"]["users"] == {
+        "other": 1
+    }
+
+    registry.release_sync(script, user="other")
+    await graph.close()
+    await registry.release(graph, user="crud_graphiti")
+    assert registry.stats() == {}
+    with pytest.raises(DriverError):
+        script.session()
+    with pytest.raises(DriverError):
+        graph.client.session()
+
+
+class FakeGraphiti:
+    def __init__(self, driver):
+        self.driver = driver
+
+    async def close(self):
+        await self.driver.close()
+
+
+def test_components_release_their_holds_on_close(monkeypatch):
+    registry = Neo4jDriverRegistry(config())
+    monkeypatch.setattr(main.crud_graphiti, "drivers", registry)
+    monkeypatch.setattr(chat.chat_memory, "drivers", registry)
+    crud = GraphitiCRUD()
+    memory = ChatMemory("bolt://localhost:7999", "neo4j", "password")
+    memory.driver = registry.driver(config(), user="chat_memory")
+    memory.graphiti = FakeGraphiti(registry.graph_driver(config(), user="chat_memory"))
+    pool = "neo4j@bolt://localhost:7999"
+    assert registry.stats()[pool]["users"] == {"crud_graphiti": 1, "chat_memory": 2}
+
+    # Created outside an event loop, so graphiti schedules no index setup
+    asyncio.run(memory.close())
+    assert registry.stats()[pool]["users"] == {"crud_graphiti": 1}
+    asyncio.run(crud.close())
+    asyncio.run(crud.close())
+
+    assert registry.stats() == {}
+    assert memory.driver is None and memory.graphiti is None
+
+
+def test_config_reads_environment_with_overrides(monkeypatch):
+    monkeypatch.setenv("NEO4J_URI", "bolt://graph:7687")
+    monkeypatch.setenv("NEO4J_POOL_SIZE", "20")
+    monkeypatch.setenv("NEO4J_POOL_ACQUIRE_TIMEOUT", "5")
+
+    pool = Neo4jPoolConfig.from_env(user="reader")
+
+    assert (pool.uri, pool.user) == ("bolt://graph:7687", "reader")
+    assert pool.max_connection_pool_size == 20
+    assert pool.connection_acquisition_timeout == 5.0
+    assert pool.fetch_size == Neo4jPoolConfig().fetch_size
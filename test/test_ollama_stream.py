@@ -0,0 +1,211 @@
+"""
+This test suite validates incremental consumption of Ollama's newline-delimited
+JSON token stream.
+
+Functionality:
+- Parses /api/generate, /api/chat and OpenAI-style `data:` stream lines.
+- Verifies that `|||`-separated segments are emitted as soon as each delimiter
+  arrives, before the rest of the stream is read.
+- Streams chunks from `MistralChunker` and completions from `LocalAiClient`
+  against a mock Ollama server and checks time-to-first-token metrics.
+- Checks the incremental JSON scanner and that `LocalAiClient` stops reading
+  the stream once the top-level JSON object is complete, attributing each
+  stopped stream to its own call when several run at once.
+
+Requirements:
+- pytest
+- Custom modules: main.ollama_stream, main.llm_chunker, main.local_ai_client
+
+Use Case:
+Used to make sure long generations can be acted on while they are still running.
+"""
+
+import json
+import asyncio
+import pytest
+from graphiti_core.prompts import Message
+from graphiti_core.llm_client.config import LLMConfig as GraphitiLLMConfig
+from mock_ollama import MockOllamaServer
+from main.ollama_stream import (
+    JsonObjectScanner,
+    StreamMetrics,
+    chat_text,
+    generate_text,
+    iter_stream_text,
+    split_stream,
+)
+from main.llm_chunker import MistralChunker, LLMConfig, ChunkingConfig
+from main.llm_metrics import llm_caller
+from main.local_ai_client import LocalAiClient
+
+
+def ndjson(*messages):
+    return [json.dumps(m).encode() for m in messages]
+
+
+def test_iter_stream_text_generate_messages():
+    metrics = StreamMetrics()
+    lines = ndjson(
+        {"response": "Hello", "done": False},
+        {"response": " world", "done": False},
+        {"response": "", "done": True, "eval_count": 2, "eval_duration": 10**9},
+    )
+
+    fragments = list(iter_stream_text(lines, generate_text, metrics))
+
+    assert fragments == ["Hello", " world"]
+    assert metrics.token_count == 2
+    assert metrics.time_to_first_token is not None
+    assert metrics.tokens_per_second == pytest.approx(2.0)
+
+
+def test_iter_stream_text_chat_and_sse_lines():
+    lines = [
+        b'data: {"choices": [{"delta": {"content": "{\\"a\\""}}]}',
+        b"",
+        json.dumps({"message": {"content": ": 1}"}, "done": False}).encode(),
+        b"data: [DONE]",
+        b'data: {"choices": [{"delta": {"content": "ignored"}}]}',
+    ]
+
+    assert "".join(iter_stream_text(lines, chat_text)) == '{"a": 1}'
+
+
+def test_iter_stream_text_raises_on_error_message():
+    with pytest.raises(RuntimeError, match="model not found"):
+        list(iter_stream_text(ndjson({"error": "model not found"}), generate_text))
+
+
+def test_split_stream_emits_segments_as_delimiters_arrive():
+    consumed = []
+
+    def fragments():
+        for fragment in ["first |", "|| sec", "ond ||", "| third"]:
+            consumed.append(fragment)
+            yield fragment
+
+    segments = split_stream(fragments())
+
+    assert next(segments) == "first"
+    assert consumed == ["first |", "|| sec"]
+    assert list(segments) == ["second", "third"]
+
+
+def test_chunker_streams_segments():
+    text = "One is first. Two is second. Three is third. Four is fourth."
+    with MockOllamaServer(token_delay=0.01) as ollama:
+        llm_config = LLMConfig(base_url=f"{ollama.url}/api/generate", stream=True)
+        config = ChunkingConfig(max_tokens=4, min_tokens=1, clean_text=False)
+        chunker = MistralChunker(llm_config, config)
+
+        chunks = chunker.chunk_text(text)
+        first = next(chunks)
+        metrics = chunker.last_stream_metrics
+        # The first chunk is available before the stream has finished
+        assert metrics.first_token_at is not None
+        assert metrics.finished_at is None
+        rest = list(chunks)
+
+    assert [first] + rest == [
+        "One is first.",
+        "Two is second.",
+        "Three is third.",
+        "Four is fourth.",
+    ]
+    assert metrics.eval_count == len(" ||| ".join([first] + rest).split())
+    assert ollama.requests[0][1]["stream"] is True
+
+
+def test_local_ai_client_streaming_query():
+    with MockOllamaServer(responder=lambda body: 'Sure: {"name": "Alice"} done') as o:
+        config = GraphitiLLMConfig(base_url=f"{o.url}/api/chat", temperature=0)
+        client = LocalAiClient(config=config, stream=True, stop_at_json=False)
+
+        result = client.execute_llm_query([Message(role="user", content="Hi")])
+
+    assert json.loads(result) == {"name": "Alice"}
+    metrics = client.last_stream_metrics.as_dict()
+    assert metrics["tokens"] == 4
+    assert metrics["time_to_first_token"] <= metrics["total_time"]
+
+
+def scan(fragments):
+    scanner = JsonObjectScanner()
+    for i, fragment in enumerate(fragments):
+        if scanner.feed(fragment) is not None:
+            return scanner.result, i
+    return None, len(fragments)
+
+
+def test_json_scanner_completes_on_closing_brace():
+    result, index = scan(['Here: {"a": {"b"', ": 1}", "}", " and more", "}"])
+
+    assert result == '{"a": {"b": 1}}'
+    assert index == 2
+
+
+def test_json_scanner_ignores_braces_inside_strings():
+    result, _ = scan(['{"text": "a } and \\" {"', ', "n": 1}'])
+
+    assert json.loads(result) == {"text": 'a } and " {', "n": 1}
+
+
+def test_json_scanner_skips_balanced_non_json():
+    result, _ = scan(["Use {braces} like ", '{"ok": true}'])
+
+    assert result == '{"ok": true}'
+    assert scan(['{"open": 1'])[0] is None
+
+
+def chatty_responder(body):
+    return '{"entities": ["Alice", "Bob"]} ' + "Let me explain my reasoning. " * 20
+
+
+@pytest.mark.asyncio
+async def test_local_ai_client_stops_generation_after_json():
+    with MockOllamaServer(responder=chatty_responder, token_delay=0.005) as o:
+        config = GraphitiLLMConfig(base_url=f"{o.url}/api/chat", temperature=0)
+        client = LocalAiClient(config=config, stream=True)
+
+        result = await client._generate_response([Message(role="user", content="Hi")])
+        metrics = client.last_stream_metrics
+        sync_result = client.execute_llm_query([Message(role="user", content="Hi")])
+        await client.close()
+
+    assert result == {"entities": ["Alice", "Bob"]}
+    assert json.loads(sync_result) == result
+    assert metrics.stopped_early
+    assert metrics.token_count == 3
+    assert metrics.total_time < 0.1
+
+
+def sized_responder(body):
+    if "short" in body["messages"][-1]["content"]:
+        return '{"a": 1} ' + "Let me explain. " * 20
+    return '{"b": [1, 2, 3, 4, 5]} ' + "Let me explain. " * 20
+
+
+@pytest.mark.asyncio
+async def test_concurrent_streams_stop_early_independently():
+    with MockOllamaServer(responder=sized_responder, token_delay=0.01) as o:
+        config = GraphitiLLMConfig(base_url=f"{o.url}/api/chat", temperature=0)
+        client = LocalAiClient(config=config, stream=True)
+
+        async def call(caller):
+            with llm_caller(caller):
+                return await client._generate_response(
+                    [Message(role="user", content=caller)]
+                )
+
+        results = await asyncio.gather(call("long"), call("short"))
+        await client.close()
+
+    assert results == [{"b": [1, 2, 3, 4, 5]}, {"a": 1}]
+    tokens = {
+        caller: client.metrics.histogram(
+            "llm_completion_tokens", caller=caller, model="mistral"
+        ).sum
+        for caller in ("long", "short")
+    }
+    assert tokens == {"long": 6, "short": 2}
+    assert client.last_stream_metrics.stopped_early